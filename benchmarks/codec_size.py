@@ -0,0 +1,90 @@
+"""
+Encoded size and encode/decode speed of models.codec versus the JSON forms in use: the indented
+snapshot JSON (asdict + json.dump, indent=2, enums as strings) and compact JSON (as the archive used).
+
+    python -m benchmarks.codec_size --count 20000
+"""
+import argparse
+import json
+import random
+import time
+from dataclasses import asdict
+from models import Driver, Order, OrderEvent
+from models import codec
+from constants.enums import OrderStatus, DriverStatus, OrderEventType
+
+
+def _orders(rng: random.Random, count: int):
+    orders = []
+    for i in range(count):
+        status = rng.choice(list(OrderStatus))
+        created = 1.7e9 + rng.random() * 86400
+        orders.append(Order(id=f"{rng.getrandbits(32):08x}", customer_id=f"C{rng.randrange(10000)}",
+                            item_id=rng.choice(["ITEM1", "ITEM2", "ITEM3"]), quantity=rng.randint(1, 5),
+                            status=status, driver_id=None if status == OrderStatus.CREATED else f"D{rng.randrange(500)}",
+                            created_at=created, assigned_at=created + 30, version=rng.randrange(6)))
+    return orders
+
+
+def _drivers(rng: random.Random, count: int):
+    return [Driver(id=f"D{i}", name=f"Driver {i}", status=rng.choice(list(DriverStatus)), capacity=2,
+                   active_order_ids=[f"{rng.getrandbits(32):08x}"], total_rating=rng.randrange(500) / 2,
+                   ratings_count=rng.randrange(100), version=rng.randrange(1000)) for i in range(count)]
+
+
+def _events(orders):
+    return [OrderEvent(offset=i, type=OrderEventType.STATUS_CHANGED, order_id=o.id, customer_id=o.customer_id,
+                       status=o.status, driver_id=o.driver_id, previous_status=OrderStatus.CREATED,
+                       timestamp=o.created_at, version=o.version) for i, o in enumerate(orders)]
+
+
+def _json_codec(indent):
+    separators = None if indent else (",", ":")
+
+    def encode(entity):
+        return json.dumps(asdict(entity), default=lambda e: e.value, indent=indent, separators=separators).encode()
+
+    def decode(data, cls):
+        record = json.loads(data)
+        for key, enum in (("status", OrderStatus if cls is not Driver else DriverStatus),
+                          ("previous_status", OrderStatus), ("type", OrderEventType)):
+            if record.get(key) is not None and key in cls.__dataclass_fields__:
+                record[key] = enum(record[key])
+        return cls(**record)
+    return encode, decode
+
+
+def measure(name: str, entities, encode, decode):
+    cls = type(entities[0])
+    start = time.perf_counter()
+    encoded = [encode(e) for e in entities]
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for data in encoded:
+        decode(data, cls)
+    decode_s = time.perf_counter() - start
+    size = sum(len(d) for d in encoded) / len(encoded)
+    n = len(entities)
+    print(f"  {name:<14}{size:>10.1f} B{encode_s / n * 1e6:>12.2f} us{decode_s / n * 1e6:>12.2f} us")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary codec vs. JSON: size and speed per record.")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    orders = _orders(rng, args.count)
+    formats = [("json indent=2", *_json_codec(2)), ("json compact", *_json_codec(None)),
+               ("binary", codec.encode, lambda data, cls: codec.decode(data))]
+    for label, entities in (("Order", orders), ("Driver", _drivers(rng, args.count)), ("OrderEvent", _events(orders))):
+        print(f"{label}: {'size':>20}{'encode':>15}{'decode':>15}")
+        sizes = [measure(name, entities, encode, decode) for name, encode, decode in formats]
+        print(f"  binary is {sizes[0] / sizes[2]:.1f}x smaller than the snapshot JSON, "
+              f"{sizes[1] / sizes[2]:.1f}x smaller than compact JSON")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Cost of ranking every available driver for one order: DriverScoreIndex (aligned arrays, one
+vectorized pass with NumPy, a tight loop without it) against scoring Driver objects one by one.
+
+    python -m benchmarks.driver_scoring --drivers 10000 50000 100000
+"""
+import argparse
+import random
+import time
+from models import Driver
+from repositories import driver_score_index
+from repositories.driver_score_index import DriverScoreIndex
+from constants.config import DRIVER_SCORE_WEIGHTS, ITEM_VEHICLE_FIT
+from constants.enums import DriverStatus
+from utils import clock
+
+_VEHICLES = ("Two Wheeler", "Four Wheeler")
+
+
+def _drivers(count: int, seed: int):
+    rng = random.Random(seed)
+    drivers = []
+    for i in range(count):
+        busy = rng.random() < 0.3
+        ratings = rng.randrange(0, 20)
+        drivers.append(Driver(f"D{i}", f"Driver {i}", status=DriverStatus.BUSY if busy else DriverStatus.AVAILABLE,
+                              vehicle_type=rng.choice(_VEHICLES), active_order_ids=["O"] if busy else [],
+                              total_rating=sum(rng.randint(1, 5) for _ in range(ratings)), ratings_count=ratings))
+    return drivers
+
+
+def _per_object(drivers, idle_since, weights, fit, now):
+    # The straightforward version: attribute lookups and property calls per driver
+    best_id, best_score = None, float("-inf")
+    for d in drivers:
+        if d.status != DriverStatus.AVAILABLE or d.remaining_capacity <= 0:
+            continue
+        rating = d.average_rating if d.ratings_count else 4.0
+        idle = min(max((now - idle_since[d.id]) / 600.0, 0.0), 1.0) if not d.active_order_ids else 0.0
+        score = (weights["rating"] * rating / 5 + weights["idle"] * idle
+                 + weights["vehicle_fit"] * fit.get(d.vehicle_type, 0.0))
+        if score > best_score:
+            best_id, best_score = d.id, score
+    return best_id
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(sizes, repeat: int, seed: int):
+    print(f"NumPy: {'yes' if driver_score_index.np is not None else 'no (pure-Python fallback)'}")
+    print(f"{'drivers':>10}{'index build ms':>16}{'index rank ms':>15}{'per-object ms':>15}")
+    fit = ITEM_VEHICLE_FIT["ITEM1"]
+    for size in sizes:
+        drivers = _drivers(size, seed)
+        start = time.perf_counter()
+        index = DriverScoreIndex()
+        for d in drivers:
+            index.update(d)
+        build_ms = (time.perf_counter() - start) * 1000
+        now = clock.now() + 120
+        idle_since = {d.id: now - 120 for d in drivers}
+        indexed = _time(lambda: index.best(DRIVER_SCORE_WEIGHTS, fit, now=now), repeat)
+        scanned = _time(lambda: _per_object(drivers, idle_since, DRIVER_SCORE_WEIGHTS, fit, now), repeat)
+        print(f"{size:>10,}{build_ms:>16.1f}{indexed:>15.3f}{scanned:>15.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Driver ranking cost at 10k-100k drivers.")
+    parser.add_argument("--drivers", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.drivers, args.repeat, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cost of persisting one driver update: an in-place record write into MmapDriverStore versus
+rewriting the whole drivers file through JsonSnapshotStore, as the snapshot writer does.
+
+    python -m benchmarks.driver_store --drivers 5000 --updates 20000
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from models import Driver
+from repositories.json_store import JsonSnapshotStore
+from repositories.mmap_driver_store import MmapDriverStore
+from constants.enums import DriverStatus
+
+
+def _drivers(count: int):
+    return [Driver(f"D{i}", f"Driver {i}", capacity=2) for i in range(count)]
+
+
+def json_rewrite(directory: str, drivers, updates: int, seed: int) -> float:
+    store = JsonSnapshotStore(directory, *(os.path.join(directory, f"{name}.json")
+                                           for name in ("customers", "drivers", "orders")))
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(updates):
+        driver = rng.choice(drivers)
+        driver.status = DriverStatus.BUSY if driver.status == DriverStatus.AVAILABLE else DriverStatus.AVAILABLE
+        driver.version += 1
+        store.save([], drivers, [])
+    return updates / (time.perf_counter() - start)
+
+
+def mmap_put(path: str, drivers, updates: int, seed: int) -> float:
+    store = MmapDriverStore(path)
+    for driver in drivers:
+        store.put(driver)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(updates):
+        driver = rng.choice(drivers)
+        driver.status = DriverStatus.BUSY if driver.status == DriverStatus.AVAILABLE else DriverStatus.AVAILABLE
+        driver.version += 1
+        store.put(driver)
+    store.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{'store file size':>28}: {os.path.getsize(path):12,} bytes")
+    store.close()
+    return updates / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Driver persistence cost per update.")
+    parser.add_argument("--drivers", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        drivers = _drivers(args.drivers)
+        baseline = json_rewrite(directory, drivers, max(1, args.updates // 1000), args.seed)
+        print(f"{'json file rewrite':>28}: {baseline:12,.1f} updates/s")
+        rate = mmap_put(os.path.join(directory, "drivers.dat"), drivers, args.updates, args.seed)
+        print(f"{'mmap record write':>28}: {rate:12,.0f} updates/s")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Footprint of running both facades in one process: background threads started and memory held per order.
+Both facades share one DeliveryEngine, so every order is stored once and there is one timeout thread
+(previously DeliveryService kept its own dicts, catalog and monitor thread next to the controller stack).
+
+    python -m benchmarks.shared_engine --orders 5000
+"""
+import argparse
+import logging
+import threading
+import tracemalloc
+from controllers.delivery_controller import DeliveryController
+from services.delivery_service import DeliveryService
+from utils.logger import logger
+
+
+def run(num_orders: int, num_drivers: int):
+    logger.setLevel(logging.WARNING)
+    threads_before = threading.active_count()
+    tracemalloc.start()
+
+    controller = DeliveryController()
+    service = DeliveryService()
+    service._save_data = lambda: None # Measure the store, not the JSON writer
+    for i in range(num_drivers):
+        controller.onboard_driver(f"D{i}", f"Driver {i}")
+    controller.onboard_customer("C1", "Alice")
+
+    baseline, _ = tracemalloc.get_traced_memory()
+    half = num_orders // 2
+    for _ in range(half):
+        controller.create_order("C1", "ITEM1")
+    for _ in range(num_orders - half):
+        service.create_order("C1", "ITEM2")
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{'orders created':>28}: {num_orders:,} ({half:,} via controller, {num_orders - half:,} via service)")
+    print(f"{'orders seen by controller':>28}: {len(controller.order_service.orders_snapshot()):,}")
+    print(f"{'orders seen by service':>28}: {len(service.orders):,}")
+    print(f"{'background threads added':>28}: {threading.active_count() - threads_before}")
+    print(f"{'bytes per order':>28}: {(current - baseline) / max(num_orders, 1):,.0f}")
+    print(f"{'peak traced MiB':>28}: {peak / 2**20:,.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory/thread footprint of DeliveryController + DeliveryService.")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--drivers", type=int, default=50)
+    args = parser.parse_args()
+    run(args.orders, args.drivers)
+
+
+if __name__ == "__main__":
+    main()
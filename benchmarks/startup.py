@@ -0,0 +1,63 @@
+"""
+Import and startup cost of the delivery stack, measured in fresh interpreters (CLI / test-run scenario):
+module import time, facade construction time, threads alive after construction and after the first order.
+Construction is expected to start no threads and touch no disk; background work starts on first use.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_PROBE = r"""
+import json, logging, threading, time
+t0 = time.perf_counter()
+from controllers.delivery_controller import DeliveryController
+from services.delivery_service import DeliveryService
+t1 = time.perf_counter()
+from utils.logger import logger
+logger.setLevel(logging.WARNING)
+threads = threading.active_count()
+controller = DeliveryController()
+service = DeliveryService()
+t2 = time.perf_counter()
+threads_constructed = threading.active_count()
+controller.onboard_customer("C1", "Alice")
+controller.create_order("C1", "ITEM1")
+t3 = time.perf_counter()
+threads_first_order = threading.active_count()
+controller.stop(timeout=2)
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000, "construct_ms": (t2 - t1) * 1000,
+    "first_order_ms": (t3 - t2) * 1000, "stop_ms": (t4 - t3) * 1000,
+    "threads_after_construct": threads_constructed - threads,
+    "threads_after_first_order": threads_first_order - threads,
+}))
+"""
+
+
+def run(runs: int):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    for key in samples[0]:
+        values = [s[key] for s in samples]
+        if key.endswith("_ms"):
+            print(f"{key:>28}: median {statistics.median(values):8.2f}  max {max(values):8.2f}")
+        else:
+            print(f"{key:>28}: {max(values)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import/startup time of DeliveryController and DeliveryService.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    run(args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Driver telemetry throughput: batched, coalesced ingestion into TelemetryService versus the per-event
+path it replaces (an optimistic driver-repository write per update, as set_driver_status does).
+
+    python -m benchmarks.telemetry_ingest --drivers 5000 --updates 200000 --batch 500 --threads 4
+"""
+import argparse
+import random
+import threading
+import time
+from models import DriverTelemetry
+from repositories.driver_repository import InMemoryDriverRepository
+from services.driver_service import DriverService
+from services.telemetry_service import TelemetryService
+from constants.enums import DriverStatus
+
+
+def _updates(num_drivers: int, count: int, seed: int):
+    rng = random.Random(seed)
+    now = time.time()
+    return [DriverTelemetry(f"D{rng.randrange(num_drivers)}", now + i * 1e-4,
+                            12.9 + rng.random() * 0.1, 77.5 + rng.random() * 0.1) for i in range(count)]
+
+
+def per_event_baseline(num_drivers: int, updates) -> float:
+    repo = InMemoryDriverRepository()
+    repo.clear()
+    service = DriverService(repo)
+    for i in range(num_drivers):
+        service.onboard_driver(f"D{i}", f"Driver {i}")
+    start = time.perf_counter()
+    for update in updates:
+        service.set_driver_status(update.driver_id, DriverStatus.AVAILABLE)
+    elapsed = time.perf_counter() - start
+    repo.clear()
+    return len(updates) / elapsed
+
+
+def batched(updates, batch_size: int, num_threads: int) -> float:
+    telemetry = TelemetryService()
+    telemetry.clear()
+    per_thread = [updates[t::num_threads] for t in range(num_threads)]
+
+    def worker(chunk):
+        for i in range(0, len(chunk), batch_size):
+            telemetry.ingest(chunk[i:i + batch_size])
+
+    threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in per_thread]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stats = telemetry.stats()
+    telemetry.clear()
+    print(f"{'coalesced in batch':>28}: {stats['coalesced']:,} of {stats['received']:,}")
+    return len(updates) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetry ingestion throughput.")
+    parser.add_argument("--drivers", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    updates = _updates(args.drivers, args.updates, args.seed)
+    baseline = per_event_baseline(args.drivers, updates[:min(len(updates), 50000)])
+    print(f"{'per-event repository write':>28}: {baseline:12,.0f} updates/s")
+    rate = batched(updates, args.batch, args.threads)
+    print(f"{'batched ingest':>28}: {rate:12,.0f} updates/s ({args.threads} threads, batch {args.batch})")
+
+
+if __name__ == "__main__":
+    main()
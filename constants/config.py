@@ -4,6 +4,112 @@ DATA_DIR = "data"
 CUSTOMERS_FILE = os.path.join(DATA_DIR, "customers.json")
 DRIVERS_FILE = os.path.join(DATA_DIR, "drivers.json")
 ORDERS_FILE = os.path.join(DATA_DIR, "orders.json")
+# Snapshot format for the in-memory backend: "json" (readable) or "binary" (models.codec frames;
+# an existing JSON snapshot is loaded once and written back as binary)
+SNAPSHOT_FORMAT = os.environ.get("SNAPSHOT_FORMAT", "json")
+CUSTOMERS_BIN_FILE = os.path.join(DATA_DIR, "customers.bin")
+DRIVERS_BIN_FILE = os.path.join(DATA_DIR, "drivers.bin")
+ORDERS_BIN_FILE = os.path.join(DATA_DIR, "orders.bin")
 
 MAX_ORDER_QUANTITY = 10
 TIMEOUT_MINUTES = 0.5 # 30 seconds for demo purposes, or typical business logic
+
+# Repository backend used by the controller stack: "memory" or "sqlite"
+REPOSITORY_BACKEND = os.environ.get("REPOSITORY_BACKEND", "memory")
+SQLITE_DB_FILE = os.path.join(DATA_DIR, "delivery.db")
+
+# Read-through cache in front of disk-backed repositories (0 disables it)
+REPOSITORY_CACHE_SIZE = 10000
+REPOSITORY_CACHE_TTL_SECONDS = 60
+
+# Worker processes used by PartitionedDeliveryController (zones are hashed onto them)
+PARTITION_WORKERS = 4
+
+# Attempts before an optimistic (compare-and-set) update gives up with ConflictError
+OPTIMISTIC_MAX_RETRIES = 10
+
+# Rolling window for DeliveryAnalytics (live stats), split into fixed-width buckets
+ANALYTICS_WINDOW_SECONDS = 300
+ANALYTICS_BUCKET_SECONDS = 5
+
+# Order change feed: events retained for resume-from-offset, and default per-subscriber buffer
+EVENT_LOG_SIZE = 10000
+EVENT_SUBSCRIBER_BUFFER_SIZE = 1024
+
+# Dispatch priority per item class: the fraction of the timeout by which its pending orders are
+# pulled forward in the queue (perishable food first); orders also age toward their timeout deadline
+DISPATCH_PRIORITY_HEADROOM = {"ITEM3": 0.5, "ITEM1": 0.25, "ITEM2": 0.0}
+
+# Order admission control: per-customer token bucket, and the number of queued orders beyond the
+# free driver capacity at which new orders are refused (with a retry-after hint)
+ADMISSION_RATE_PER_MINUTE = 30
+ADMISSION_BURST = 10
+ADMISSION_BACKLOG_LIMIT = 500
+ADMISSION_RETRY_AFTER_SECONDS = 30
+ADMISSION_MAX_TRACKED_CUSTOMERS = 100000
+
+# Idempotency keys: results remembered per (operation, key) so client retries are not re-executed
+IDEMPOTENCY_CACHE_SIZE = 100000
+IDEMPOTENCY_TTL_SECONDS = 3600
+
+# Item catalog: id -> (name, starting stock); None means unlimited stock
+ITEM_CATALOG = {
+    "ITEM1": ("Laptop", 100000),
+    "ITEM2": ("Document", None),
+    "ITEM3": ("Food", 100000),
+}
+# Lock stripes guarding the stock counters (items hash onto stripes)
+INVENTORY_LOCK_STRIPES = 16
+
+# Request tracing: fraction of traces recorded (0 disables), and the JSON-lines span file
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0"))
+TRACE_FILE = os.path.join(DATA_DIR, "traces.jsonl")
+
+# Lock profiling: LOCK_PROFILING=1 wraps the shared locks to record wait/hold histograms and
+# contended call sites; LOCK_DEBUG=1 also checks acquisition order and reports inversions
+LOCK_PROFILING = os.environ.get("LOCK_PROFILING", "0") == "1"
+LOCK_DEBUG = os.environ.get("LOCK_DEBUG", "0") == "1"
+
+# Driver telemetry: expected heartbeat interval, and how many may be missed before a driver is
+# stale (skipped by assignment until it reports again)
+TELEMETRY_HEARTBEAT_INTERVAL_SECONDS = 5
+TELEMETRY_MISSED_HEARTBEATS = 3
+
+# Assignment strategy: "least_loaded" (most spare capacity first) or "scored" (weighted rating,
+# idle time and vehicle fit, ranked over all available drivers at once)
+ASSIGNMENT_STRATEGY = os.environ.get("ASSIGNMENT_STRATEGY", "least_loaded")
+DRIVER_SCORE_WEIGHTS = {"rating": 1.0, "idle": 1.0, "vehicle_fit": 1.0}
+DRIVER_SCORE_UNRATED = 4.0 # Rating assumed for drivers nobody has rated yet (1-5 scale)
+DRIVER_SCORE_IDLE_HORIZON_SECONDS = 600 # Idle time beyond this earns no extra score
+# How well each vehicle type suits an item (0-1); vehicles missing from an item's table score 0
+ITEM_VEHICLE_FIT = {
+    "ITEM1": {"Four Wheeler": 1.0, "Two Wheeler": 0.6},
+    "ITEM2": {"Two Wheeler": 1.0, "Four Wheeler": 0.8},
+    "ITEM3": {"Two Wheeler": 1.0, "Four Wheeler": 0.7},
+}
+
+# Order history pages (customer / driver history queries)
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Cold-order retention (in-memory backend): orders terminal for ORDER_RETENTION_SECONDS move to
+# immutable segment files under ORDER_ARCHIVE_DIR, in batches of at least ORDER_ARCHIVE_BATCH_SIZE
+ORDER_RETENTION_SECONDS = 24 * 3600
+ORDER_ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
+ORDER_ARCHIVE_BATCH_SIZE = 1000
+
+# Driver persistence for the in-memory backend: "json" (rewritten with the other JSON files) or
+# "mmap" (fixed-width records in DRIVER_STORE_FILE, each driver change written in place)
+DRIVER_STORE = os.environ.get("DRIVER_STORE", "json")
+DRIVER_STORE_FILE = os.path.join(DATA_DIR, "drivers.dat")
+DRIVER_STORE_MAX_ACTIVE_ORDERS = 8 # Record width limit: drivers with a larger capacity need "json"
+
+# Embedded HTTP/JSON API (python -m controllers.http_server): idle keep-alive connections close after
+# HTTP_KEEPALIVE_TIMEOUT_SECONDS; list responses are streamed in chunks of HTTP_STREAM_CHUNK_ITEMS
+HTTP_HOST = os.environ.get("HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.environ.get("HTTP_PORT", "8080"))
+HTTP_KEEPALIVE_TIMEOUT_SECONDS = 15
+HTTP_MAX_BODY_BYTES = 1 << 20
+HTTP_MAX_BULK_ITEMS = 1000
+HTTP_STREAM_CHUNK_ITEMS = 256
+HTTP_WORKER_THREADS = 8 # Controller calls block on locks/disk, so they run off the event loop
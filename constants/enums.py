@@ -10,3 +10,8 @@ class OrderStatus(Enum):
 class DriverStatus(Enum):
     AVAILABLE = "AVAILABLE"
     BUSY = "BUSY"
+
+class OrderEventType(Enum):
+    ORDER_CREATED = "ORDER_CREATED"
+    ORDER_QUEUED = "ORDER_QUEUED"
+    STATUS_CHANGED = "STATUS_CHANGED"
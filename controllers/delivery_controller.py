@@ -1,23 +1,59 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from services.order_service import OrderService
 from services.driver_service import DriverService
 from services.assignment_service import AssignmentService
+from services.analytics_service import offline_report
+from services.event_bus import Subscription
 from views.console_view import ConsoleView
-from models import Customer, Driver, Order
-from scheduler.timeout_scheduler import OrderTimeoutScheduler
+from models import Customer, Driver, DriverTelemetry, Order, OrderEvent
+from services.delivery_engine import DeliveryEngine
+from repositories.optimistic import ConcurrencyStats
+from repositories.pagination import Page
+from constants.config import HISTORY_PAGE_SIZE
+from utils.instrumented_lock import LockProfiler
+from utils.tracing import traced
 
 class DeliveryController:
-    def __init__(self):
-        self.order_service = OrderService()
-        self.driver_service = DriverService()
-        self.assignment_service = AssignmentService()
+    def __init__(self, start_scheduler: bool = True):
+        # Shared with DeliveryService: repositories come from the backend selected in
+        # constants.config.REPOSITORY_BACKEND and there is one timeout scheduler per process
+        self.engine = DeliveryEngine()
+        self.order_service: OrderService = self.engine.order_service
+        self.driver_service: DriverService = self.engine.driver_service
+        self.assignment_service: AssignmentService = self.engine.assignment_service
         self.view = ConsoleView()
         
-        # Start Scheduler
-        self.scheduler = OrderTimeoutScheduler()
-        self.scheduler.start()
+        # Nothing starts here: the timeout scheduler starts with the first order, or via start().
+        # start_scheduler=False never starts it (a simulator drives scheduler.check_timeouts itself)
+        self.scheduler = self.engine.scheduler
+        self.auto_start = start_scheduler
+
+    # --- Lifecycle ---
+    def start(self):
+        self.engine.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stops background work and drains pending writes."""
+        self.engine.stop(timeout)
+
+    def flush(self):
+        self.engine.flush()
+
+    def load(self) -> int:
+        """Loads saved state into the engine (once per process); the controller never loads on its own."""
+        return self.engine.load()
+
+    def persist(self):
+        """
+        Schedules a write of the current state (coalesced by the engine's writer thread).
+        Raises RuntimeError before load(): the write would replace the saved state with a partial one.
+        """
+        if not self.engine.loaded:
+            raise RuntimeError("Saved state has not been loaded; call load() before persist().")
+        self.engine.persist()
 
     # --- Customer/Driver Onboarding ---
+    @traced("controller.onboard_customer")
     def onboard_customer(self, id: str, name: str) -> Customer:
         try:
             customer = self.order_service.onboard_customer(id, name)
@@ -27,9 +63,10 @@ class DeliveryController:
             self.view.show_error(str(e))
             raise
 
-    def onboard_driver(self, id: str, name: str) -> Driver:
+    @traced("controller.onboard_driver")
+    def onboard_driver(self, id: str, name: str, capacity: int = 1) -> Driver:
         try:
-            driver = self.driver_service.onboard_driver(id, name)
+            driver = self.driver_service.onboard_driver(id, name, capacity)
             # Try to assign any pending orders since a new driver arrived
             self.assignment_service.on_driver_available(id)
             self.view.show_onboarded_driver(driver)
@@ -38,88 +75,173 @@ class DeliveryController:
             self.view.show_error(str(e))
             raise
 
+    # --- Driver Telemetry ---
+    def ingest_telemetry(self, updates: Iterable[DriverTelemetry]) -> int:
+        """Batched location/heartbeat updates; returns how many were stored after coalescing."""
+        result = self.engine.telemetry.ingest(updates)
+        if result.recovered:
+            # Drivers back from stale can take queued orders again
+            self.assignment_service.on_driver_available(result.recovered[0])
+        return result.accepted
+
+    def get_stale_drivers(self) -> List[str]:
+        return self.engine.telemetry.stale_drivers()
+
+    def get_telemetry_stats(self) -> Dict[str, int]:
+        """Updates received, applied, coalesced within a batch, dropped as out of order; tracked and stale drivers."""
+        return self.engine.telemetry.stats()
+
     # --- Order Management ---
-    def create_order(self, customer_id: str, item_id: str, quantity: int = 1) -> str:
+    @traced("controller.create_order")
+    def create_order(self, customer_id: str, item_id: str, quantity: int = 1,
+                     idempotency_key: Optional[str] = None) -> str:
         try:
-            order = self.order_service.create_order(customer_id, item_id, quantity)
-            self.assignment_service.queue_order(order.id)
-            
-            self.view.show_order_created(order.id)
-            self.view.show_order_status(order)
-            return order.id
+            # A retry carrying the same key gets the original order id back; nothing runs twice
+            return self.engine.idempotency.run("create_order", idempotency_key, (customer_id, item_id, quantity),
+                                               lambda: self._create_order(customer_id, item_id, quantity))
         except Exception as e:
             self.view.show_error(str(e))
             raise
 
+    def _create_order(self, customer_id: str, item_id: str, quantity: int) -> str:
+        # Invalid requests are refused before admission, so they take no rate-limit token;
+        # then fail fast (OrderRejectedError) before anything is stored when intake is saturated
+        self.order_service.validate_order(customer_id, item_id, quantity)
+        self.engine.admit_order(customer_id)
+        if self.auto_start:
+            self.engine.start_scheduler()
+        order = self.order_service.create_order(customer_id, item_id, quantity)
+        self.assignment_service.queue_order(order.id)
+        
+        self.view.show_order_created(order.id)
+        self.view.show_order_status(self.order_service.get_order(order.id)) # May have been assigned already
+        return order.id
+
     def get_order(self, order_id: str) -> Optional[Order]:
         return self.order_service.get_order(order_id)
         
+    def get_customer_history(self, customer_id: str, limit: int = HISTORY_PAGE_SIZE, cursor: Optional[str] = None) -> Page:
+        """Customer's orders newest first, one page at a time (cursor from the previous page)."""
+        return self.order_service.get_customer_history(customer_id, limit, cursor)
+
+    def get_driver_history(self, driver_id: str, limit: int = HISTORY_PAGE_SIZE, cursor: Optional[str] = None) -> Page:
+        return self.order_service.get_driver_history(driver_id, limit, cursor)
+
     def get_all_drivers(self) -> List[Driver]:
         return self.driver_service.get_all_drivers()
 
+    def get_top_drivers(self, limit: int = 10) -> List[Driver]:
+        """Leaderboard by average rating, then number of ratings (same order as the partitioned controller)."""
+        drivers = list(self.driver_service.drivers_snapshot().values())
+        drivers.sort(key=lambda d: (d.average_rating, d.ratings_count), reverse=True)
+        return drivers[:limit]
+
+    def get_all_orders(self) -> List[Order]:
+        """Point-in-time copies of every resident order (archived ones are reached through get_order/history/get_report)."""
+        return list(self.order_service.orders_snapshot().values())
+
+    def get_stats(self) -> Dict[str, float]:
+        """Live rolling-window stats (orders/min, time-to-assign, durations, cancel/timeout rates)."""
+        return self.order_service.analytics.snapshot()
+
+    def get_report(self) -> Dict[str, Dict[str, float]]:
+        """Offline duration/outcome report over every stored order, archived ones included."""
+        return offline_report(self.engine.all_orders())
+
+    # --- Change Feed ---
+    def subscribe(self, order_id: Optional[str] = None, customer_id: Optional[str] = None,
+                  driver_id: Optional[str] = None, from_offset: Optional[int] = None) -> Subscription:
+        """Push-style alternative to polling get_order; see OrderEventBus.subscribe."""
+        return self.order_service.events.subscribe(order_id, customer_id, driver_id, from_offset)
+
+    def get_events(self, offset: int, limit: int = 100, **filters) -> List[OrderEvent]:
+        return self.order_service.events.events_since(offset, limit, **filters)
+
+    def get_admission_stats(self) -> Dict[str, float]:
+        """Admitted vs. shed orders (rate limited, saturated) and the shed ratio."""
+        return self.engine.admission.stats()
+
+    def get_idempotency_stats(self) -> Dict[str, int]:
+        """Idempotency cache hits, executions, coalesced waits, key reuse mismatches and evictions."""
+        return self.engine.idempotency.stats()
+
+    def get_concurrency_stats(self) -> Dict[str, Dict[str, int]]:
+        """Optimistic update counters (updates, conflicts, retries exhausted) per operation."""
+        return ConcurrencyStats().snapshot()
+
+    def get_lock_stats(self, top: int = 10) -> Dict[str, Any]:
+        """Lock wait/hold summaries, top contended call sites and order inversions (LOCK_PROFILING / LOCK_DEBUG)."""
+        return LockProfiler().report(top)
+
     def show_order_status(self, order_id: str):
         order = self.order_service.get_order(order_id)
         self.view.show_order_status(order)
 
     # --- Delivery Flow ---
-    def pickup_order(self, driver_id: str, order_id: str):
+    @traced("controller.pickup_order")
+    def pickup_order(self, driver_id: str, order_id: str, idempotency_key: Optional[str] = None):
         try:
-            # We must validate strict state via OrderService transition
-            # But we also need to check driver assignment.
-            
-            # The logic "pickup_order" is business logic combining Driver an Order.
-            # Ideally AssignmentService or similar handles this coordination? 
-            # Or we keep simple actions in Controller calling specific service methods.
-            
-            # Use OrderService for state transition, but we need extra validation (DRIVER_MATCH)
-            order = self.order_service.get_order(order_id)
-            if not order: 
-                raise ValueError("Order not found")
-            if order.driver_id != driver_id:
-                raise ValueError("Order not assigned to this driver")
-                
-            self.order_service.transition_state(order_id, "PICKED_UP") # Will convert str to Enum if we pass Enum? 
-            # Update: transition_state expects Enum.
-            from constants.enums import OrderStatus
-            self.order_service.transition_state(order_id, OrderStatus.PICKED_UP)
-            
-            self.view.show_order_status(order)
+            self.engine.idempotency.run("pickup_order", idempotency_key, (driver_id, order_id),
+                                        lambda: self._pickup_order(driver_id, order_id))
         except Exception as e:
             self.view.show_error(str(e))
             raise
 
-    def complete_order(self, driver_id: str, order_id: str):
-        try:
-            from constants.enums import OrderStatus, DriverStatus
+    def _pickup_order(self, driver_id: str, order_id: str):
+        # We must validate strict state via OrderService transition
+        # But we also need to check driver assignment.
+        
+        # The logic "pickup_order" is business logic combining Driver an Order.
+        # Ideally AssignmentService or similar handles this coordination? 
+        # Or we keep simple actions in Controller calling specific service methods.
+        
+        # Use OrderService for state transition, but we need extra validation (DRIVER_MATCH)
+        order = self.order_service.get_order(order_id)
+        if not order: 
+            raise ValueError("Order not found")
+        if order.driver_id != driver_id:
+            raise ValueError("Order not assigned to this driver")
             
-            order = self.order_service.get_order(order_id)
-            if not order:
-                raise ValueError("Order not found")
-            if order.driver_id != driver_id:
-                raise ValueError("Order not assigned to this driver")
+        from constants.enums import OrderStatus
+        order = self.order_service.transition_state(order_id, OrderStatus.PICKED_UP)
+        
+        self.view.show_order_status(order)
 
-            self.order_service.transition_state(order_id, OrderStatus.DELIVERED)
-            
-            # Free the driver
-            self.driver_service.set_driver_status(driver_id, DriverStatus.AVAILABLE)
-            driver = self.driver_service.get_driver(driver_id)
-            if driver:
-                driver.current_order_id = None
-                self.driver_service.repo.save(driver)
-            
-            self.assignment_service.on_driver_available(driver_id)
-            
+    @traced("controller.complete_order")
+    def complete_order(self, driver_id: str, order_id: str, idempotency_key: Optional[str] = None):
+        try:
+            self.engine.idempotency.run("complete_order", idempotency_key, (driver_id, order_id),
+                                        lambda: self._complete_order(driver_id, order_id))
         except Exception as e:
             self.view.show_error(str(e))
             raise
 
-    def cancel_order(self, order_id: str):
+    def _complete_order(self, driver_id: str, order_id: str):
+        from constants.enums import OrderStatus
+        
+        order = self.order_service.get_order(order_id)
+        if not order:
+            raise ValueError("Order not found")
+        if order.driver_id != driver_id:
+            raise ValueError("Order not assigned to this driver")
+
+        self.order_service.transition_state(order_id, OrderStatus.DELIVERED)
+        
+        # Free the driver
+        self.driver_service.release_order(driver_id, order_id)
+        
+        self.assignment_service.on_driver_available(driver_id)
+
+    @traced("controller.cancel_order")
+    def cancel_order(self, order_id: str, idempotency_key: Optional[str] = None):
         try:
-            self.assignment_service.cancel_order(order_id)
+            self.engine.idempotency.run("cancel_order", idempotency_key, (order_id,),
+                                        lambda: self.assignment_service.cancel_order(order_id))
         except Exception as e:
             self.view.show_error(str(e))
             raise
 
+    @traced("controller.rate_driver")
     def rate_driver(self, order_id: str, stars: int):
         try:
             from constants.enums import OrderStatus
@@ -129,13 +251,10 @@ class DeliveryController:
                 raise ValueError("Can only rate delivered orders")
             
             if order.driver_id:
-                driver = self.driver_service.get_driver(order.driver_id)
-                if driver:
-                     driver.total_rating += stars
-                     driver.ratings_count += 1
-                     self.driver_service.repo.save(driver)
+                self.order_service.record_rating(order_id, stars)
+                self.driver_service.add_rating(order.driver_id, stars)
             
-            self.view.show_top_drivers(self.driver_service.get_all_drivers())
+            self.view.show_top_drivers(list(self.driver_service.drivers_snapshot().values()))
         except Exception as e:
             self.view.show_error(str(e))
             raise
@@ -0,0 +1,571 @@
+"""
+Embedded HTTP/JSON API over DeliveryController, built on asyncio streams (standard library only).
+
+HTTP/1.1 connections stay open between requests (keep-alive) and may be pipelined: requests sent
+back to back are read ahead from the socket and answered in order. Controller calls block on locks
+and disk, so they run on a thread pool and never stall the event loop; the bulk endpoints run a
+whole batch in one such call. List responses are streamed as chunked JSON arrays, serialized a slice
+at a time. Every route keeps a latency histogram, served at GET /metrics.
+
+    python -m controllers.http_server --port 8080
+
+    POST /customers               {"id", "name"}
+    POST /drivers                 {"id", "name", "capacity"}
+    GET  /drivers                 streamed          GET /drivers/top?limit=10   streamed
+    POST /orders                  {"customer_id", "item_id", "quantity"} -> 201 {"id"}
+    GET  /orders                  streamed          GET /orders/{id}
+    POST /orders/{id}/pickup      {"driver_id"}     POST /orders/{id}/complete  {"driver_id"}
+    POST /orders/{id}/cancel                        POST /orders/{id}/rating    {"stars"}
+    GET  /customers/{id}/orders   ?limit&cursor     GET /drivers/{id}/orders    ?limit&cursor
+    POST /telemetry               [{"driver_id", "timestamp", "lat", "lon"}, ...]
+    GET  /events                  ?offset&limit, streamed
+    POST /bulk/customers | /bulk/drivers | /bulk/orders   [item, ...] -> [{"status", "body" | "error"}, ...]
+    GET  /stats                   GET /metrics
+
+Mutating routes accept an Idempotency-Key header (bulk items: an "idempotency_key" field).
+With persist=True (as main() runs it) saved state is loaded before the first request is served and
+every call to a route that changes orders, drivers or customers schedules a write (telemetry does not).
+Streamed routes answer "Accept: application/x-delivery-frames" with binary models.codec frames.
+Errors come back as {"error": message}: 400 invalid, 404 unknown, 409 write conflict,
+429 order rejected by admission control (with Retry-After).
+"""
+import argparse
+import asyncio
+import functools
+import json
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass
+from enum import Enum
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, unquote
+from controllers.delivery_controller import DeliveryController
+from models import DriverTelemetry
+from models import codec
+from services.admission_controller import OrderRejectedError
+from repositories.optimistic import ConflictError
+from constants.config import (HTTP_HOST, HTTP_PORT, HTTP_KEEPALIVE_TIMEOUT_SECONDS, HTTP_MAX_BODY_BYTES,
+                              HTTP_MAX_BULK_ITEMS, HTTP_STREAM_CHUNK_ITEMS, HTTP_WORKER_THREADS, HISTORY_PAGE_SIZE)
+from utils.instrumented_lock import _BUCKETS, _bucket, _percentile, make_lock
+from utils.logger import logger
+
+
+# Accept this type on a streamed list route to get models.codec frames instead of a JSON array
+FRAMES_CONTENT_TYPE = "application/x-delivery-frames"
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class _Request(NamedTuple):
+    method: str
+    target: str
+    version: str
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class _Response(NamedTuple):
+    status: int
+    payload: Any
+    headers: Dict[str, str] = {}
+
+
+class _Stream(NamedTuple):
+    """A list response written as a chunked JSON array."""
+    items: Iterable[Any]
+
+
+def _json_default(obj):
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, default=_json_default, separators=(",", ":"))
+
+
+def _error_status(e: Exception) -> Tuple[int, Dict[str, str]]:
+    if isinstance(e, HTTPError):
+        return e.status, e.headers
+    if isinstance(e, OrderRejectedError):
+        return 429, {"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    if isinstance(e, ConflictError):
+        return 409, {}
+    if isinstance(e, (ValueError, KeyError, TypeError)): # Business rule or malformed body
+        return 400, {}
+    return 500, {}
+
+
+async def _read_request(reader: asyncio.StreamReader, max_body: int) -> Optional[_Request]:
+    line = await reader.readline()
+    while line in (b"\r\n", b"\n"): # Tolerated between pipelined requests
+        line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+        raise HTTPError(400, "Malformed request line.")
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, sep, value = line.decode("latin-1").partition(":")
+        if not sep:
+            raise HTTPError(400, "Malformed header.")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = bytearray()
+        while True:
+            try:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            except ValueError:
+                raise HTTPError(400, "Invalid chunk size.")
+            if not size:
+                await reader.readline() # Final CRLF (trailers are not supported)
+                break
+            if len(body) + size > max_body:
+                raise HTTPError(413, f"Request body exceeds {max_body} bytes.")
+            body += await reader.readexactly(size)
+            await reader.readline()
+        return _Request(parts[0], parts[1], parts[2], headers, bytes(body))
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length.")
+    if length > max_body:
+        raise HTTPError(413, f"Request body exceeds {max_body} bytes.")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return _Request(parts[0], parts[1], parts[2], headers, body)
+
+
+def _head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _chunk(data: bytes) -> bytes:
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+class EndpointStats:
+    """Request count, responses per status class and a latency histogram (power-of-two microsecond buckets)."""
+    def __init__(self):
+        self.requests = 0
+        self.status_classes: Dict[str, int] = {}
+        self.total_us = 0.0
+        self.max_us = 0.0
+        self.hist = [0] * _BUCKETS
+
+    def record(self, status: int, us: float):
+        self.requests += 1
+        status_class = f"{status // 100}xx"
+        self.status_classes[status_class] = self.status_classes.get(status_class, 0) + 1
+        self.total_us += us
+        self.max_us = max(self.max_us, us)
+        self.hist[_bucket(us)] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "responses": dict(self.status_classes),
+                "mean_us": self.total_us / self.requests if self.requests else 0.0,
+                "p50_us": _percentile(self.hist, 0.5), "p99_us": _percentile(self.hist, 0.99),
+                "max_us": self.max_us}
+
+
+class DeliveryHTTPServer:
+    """
+    Serves a DeliveryController over HTTP. start()/close() run it on the caller's event loop;
+    start_background()/stop_background() run it on a loop thread of its own (tests, embedding).
+    Latency is measured from a parsed request to its last response byte handed to the socket.
+    """
+    def __init__(self, controller: Optional[DeliveryController] = None, host: str = HTTP_HOST, port: int = HTTP_PORT,
+                 keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT_SECONDS, max_body: int = HTTP_MAX_BODY_BYTES,
+                 stream_chunk_items: int = HTTP_STREAM_CHUNK_ITEMS, worker_threads: int = HTTP_WORKER_THREADS,
+                 persist: bool = False):
+        self.controller = controller or DeliveryController()
+        self.persist = persist # Load saved state on start and write after each call to a _saved route
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body = max_body
+        self.stream_chunk_items = stream_chunk_items
+        self.worker_threads = worker_threads
+        self.metrics_lock = make_lock("DeliveryHTTPServer.metrics_lock")
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connections = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # (method, path pattern, route label, handler(body, query, headers, *path params))
+        self._routes: List[Tuple[str, re.Pattern, str, Callable]] = []
+        for method, template, handler in (
+                ("POST", "/customers", self._saved(self._onboard_customer)),
+                ("POST", "/drivers", self._saved(self._onboard_driver)),
+                ("GET", "/drivers", self._list_drivers),
+                ("GET", "/drivers/top", self._top_drivers),
+                ("GET", "/drivers/{id}/orders", self._driver_history),
+                ("POST", "/orders", self._saved(self._create_order)),
+                ("GET", "/orders", self._list_orders),
+                ("GET", "/orders/{id}", self._get_order),
+                ("POST", "/orders/{id}/pickup", self._saved(self._pickup_order)),
+                ("POST", "/orders/{id}/complete", self._saved(self._complete_order)),
+                ("POST", "/orders/{id}/cancel", self._saved(self._cancel_order)),
+                ("POST", "/orders/{id}/rating", self._saved(self._rate_driver)),
+                ("GET", "/customers/{id}/orders", self._customer_history),
+                ("POST", "/telemetry", self._ingest_telemetry), # Locations are not saved state
+                ("GET", "/events", self._events),
+                ("POST", "/bulk/customers", self._saved(self._bulk(self._onboard_customer))),
+                ("POST", "/bulk/drivers", self._saved(self._bulk(self._onboard_driver))),
+                ("POST", "/bulk/orders", self._saved(self._bulk(self._create_order))),
+                ("GET", "/stats", lambda body, query, headers: self.controller.get_stats()),
+                ("GET", "/metrics", lambda body, query, headers: self.metrics())):
+            pattern = re.compile(re.sub(r"\{\w+\}", "([^/]+)", template))
+            self._routes.append((method, pattern, f"{method} {template}", handler))
+
+    # --- Lifecycle ---
+    async def start(self):
+        self._executor = ThreadPoolExecutor(self.worker_threads, thread_name_prefix="http-worker")
+        try:
+            if self.persist:
+                loaded = await asyncio.get_running_loop().run_in_executor(self._executor, self.controller.load)
+                logger.info(f"[HTTP] Loaded {loaded} saved records")
+            self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        except BaseException:
+            self._executor.shutdown(wait=False) # E.g. the port is taken: nothing is left running
+            self._executor = None
+            raise
+        self.port = self._server.sockets[0].getsockname()[1] # Actual port when bound to 0
+        logger.info(f"[HTTP] Listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections): # Idle keep-alive connections would hold wait_closed()
+            writer.close()
+        await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+        self._server = None
+
+    def start_background(self) -> int:
+        """Starts serving on a new event loop thread; returns the bound port (raises what start() raised)."""
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+        failure: List[BaseException] = []
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.start())
+            except BaseException as e:
+                failure.append(e)
+                return
+            finally:
+                started.set() # Also on failure, or the caller would wait forever
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="delivery-http", daemon=True)
+        self._thread.start()
+        started.wait()
+        if failure:
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = None
+            raise failure[0]
+        return self.port
+
+    def stop_background(self, timeout: float = 5.0):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._loop.close()
+        self._loop = self._thread = None
+
+    # --- Metrics ---
+    def _record(self, label: str, status: int, us: float):
+        with self.metrics_lock:
+            stats = self.endpoints.get(label)
+            if stats is None:
+                stats = self.endpoints[label] = EndpointStats()
+            stats.record(status, us)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-route latency summaries (microseconds), busiest route first."""
+        with self.metrics_lock:
+            summaries = {label: stats.summary() for label, stats in self.endpoints.items()}
+        return dict(sorted(summaries.items(), key=lambda item: -item[1]["requests"]))
+
+    # --- Connections ---
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader, self.max_body), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break # Idle keep-alive connection
+                except HTTPError as e:
+                    # Framing is lost (or the body was left unread), so answer and close
+                    writer.write(self._encode(e.status, {"error": str(e)}, e.headers, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                # Pipelined requests are already buffered in `reader`; answering them one by one keeps the order
+                start = time.perf_counter()
+                label, status = await self._handle(request, writer)
+                self._record(label, status, (time.perf_counter() - start) * 1e6)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass # Client went away, or sent a line longer than the stream limit
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def _route(self, method: str, path: str) -> Tuple[str, Optional[Callable], tuple]:
+        allowed = []
+        for route_method, pattern, label, handler in self._routes:
+            match = pattern.fullmatch(path)
+            if match:
+                if route_method == method:
+                    return label, handler, tuple(unquote(g) for g in match.groups())
+                allowed.append(route_method)
+        if allowed:
+            raise HTTPError(405, f"{method} not allowed on {path}.", {"Allow": ", ".join(allowed)})
+        raise HTTPError(404, f"No route for {path}.")
+
+    async def _handle(self, request: _Request, writer: asyncio.StreamWriter) -> Tuple[str, int]:
+        path, _, query_string = request.target.partition("?")
+        label = "unmatched"
+        try:
+            label, handler, params = self._route(request.method, path)
+            query = {key: values[-1] for key, values in parse_qs(query_string).items()}
+            try:
+                body = json.loads(request.body) if request.body else None
+            except ValueError:
+                raise HTTPError(400, "Request body is not valid JSON.")
+            call = functools.partial(handler, body, query, request.headers, *params)
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        except Exception as e:
+            status, headers = _error_status(e)
+            if status == 500:
+                logger.exception(f"[HTTP] {request.method} {path} failed")
+            writer.write(self._encode(status, {"error": str(e)}, headers, request.keep_alive))
+            await writer.drain()
+            return label, status
+
+        if isinstance(result, _Stream):
+            await self._write_stream(writer, result.items, request)
+            return label, 200
+        response = result if isinstance(result, _Response) else _Response(200, result)
+        writer.write(self._encode(response.status, response.payload, response.headers, request.keep_alive))
+        await writer.drain()
+        return label, response.status
+
+    @staticmethod
+    def _encode(status: int, payload: Any, headers: Dict[str, str], keep_alive: bool) -> bytes:
+        data = _dumps(payload).encode()
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(data)), **headers}
+        return _head(status, headers, keep_alive) + data
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, items: Iterable[Any], request: _Request):
+        if FRAMES_CONTENT_TYPE in request.headers.get("accept", ""):
+            await self._write_frames(writer, list(items), request)
+            return
+        if request.version == "HTTP/1.0": # No chunked encoding: one sized body
+            writer.write(self._encode(200, list(items), {}, request.keep_alive))
+            await writer.drain()
+            return
+        writer.write(_head(200, {"Content-Type": "application/json", "Transfer-Encoding": "chunked"},
+                           request.keep_alive))
+        items = list(items)
+        separator = "["
+        for start in range(0, len(items), self.stream_chunk_items):
+            data = separator + ",".join(_dumps(item) for item in items[start:start + self.stream_chunk_items])
+            separator = ","
+            writer.write(_chunk(data.encode()))
+            await writer.drain() # Yields to other connections between slices
+        writer.write(_chunk(b"]" if separator == "," else b"[]") + b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _write_frames(self, writer: asyncio.StreamWriter, items: List[Any], request: _Request):
+        # models.codec frames back to back; concatenated chunks decode with codec.decode_many
+        if request.version == "HTTP/1.0":
+            data = codec.encode_many(items)
+            writer.write(_head(200, {"Content-Type": FRAMES_CONTENT_TYPE, "Content-Length": str(len(data))},
+                               request.keep_alive) + data)
+            await writer.drain()
+            return
+        writer.write(_head(200, {"Content-Type": FRAMES_CONTENT_TYPE, "Transfer-Encoding": "chunked"},
+                           request.keep_alive))
+        for start in range(0, len(items), self.stream_chunk_items):
+            writer.write(_chunk(codec.encode_many(items[start:start + self.stream_chunk_items])))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    # --- Handlers (run on the worker pool) ---
+    def _saved(self, handler: Callable) -> Callable:
+        # Marks a route that changes saved state: with persist=True each call schedules a write,
+        # also after a failure (an operation can fail after part of its writes went through)
+        def run(*args):
+            try:
+                return handler(*args)
+            finally:
+                if self.persist:
+                    self.controller.persist()
+        return run
+
+    @staticmethod
+    def _field(body: Any, name: str, default: Any = KeyError) -> Any:
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Expected a JSON object.")
+        if name not in body:
+            if default is KeyError:
+                raise HTTPError(400, f"Missing field '{name}'.")
+            return default
+        return body[name]
+
+    @staticmethod
+    def _limit(query: Dict[str, str], default: int) -> int:
+        try:
+            return int(query.get("limit", default))
+        except ValueError:
+            raise HTTPError(400, "limit must be an integer.")
+
+    def _bulk(self, handler: Callable) -> Callable:
+        def run(body, query, headers):
+            if not isinstance(body, list):
+                raise HTTPError(400, "Expected a JSON array.")
+            if len(body) > HTTP_MAX_BULK_ITEMS:
+                raise HTTPError(413, f"At most {HTTP_MAX_BULK_ITEMS} items per bulk request.")
+            results = []
+            for item in body: # Items are independent: one failing does not stop the rest
+                try:
+                    result = handler(item, query, {"idempotency-key": self._field(item, "idempotency_key", None)})
+                    response = result if isinstance(result, _Response) else _Response(200, result)
+                    results.append({"status": response.status, "body": response.payload})
+                except Exception as e:
+                    status, _ = _error_status(e)
+                    results.append({"status": status, "error": str(e)})
+            return results
+        return run
+
+    def _onboard_customer(self, body, query, headers):
+        customer = self.controller.onboard_customer(self._field(body, "id"), self._field(body, "name"))
+        return _Response(201, customer)
+
+    def _onboard_driver(self, body, query, headers):
+        driver = self.controller.onboard_driver(self._field(body, "id"), self._field(body, "name"),
+                                                int(self._field(body, "capacity", 1)))
+        return _Response(201, driver)
+
+    def _list_drivers(self, body, query, headers):
+        return _Stream(self.controller.get_all_drivers())
+
+    def _top_drivers(self, body, query, headers):
+        return _Stream(self.controller.get_top_drivers(self._limit(query, 10)))
+
+    def _create_order(self, body, query, headers):
+        order_id = self.controller.create_order(self._field(body, "customer_id"), self._field(body, "item_id"),
+                                                int(self._field(body, "quantity", 1)), headers.get("idempotency-key"))
+        return _Response(201, {"id": order_id})
+
+    def _list_orders(self, body, query, headers):
+        return _Stream(self.controller.get_all_orders())
+
+    def _get_order(self, body, query, headers, order_id):
+        order = self.controller.get_order(order_id)
+        if order is None:
+            raise HTTPError(404, f"Order {order_id} not found.")
+        return order
+
+    def _pickup_order(self, body, query, headers, order_id):
+        self.controller.pickup_order(self._field(body, "driver_id"), order_id, headers.get("idempotency-key"))
+        return self.controller.get_order(order_id)
+
+    def _complete_order(self, body, query, headers, order_id):
+        self.controller.complete_order(self._field(body, "driver_id"), order_id, headers.get("idempotency-key"))
+        return self.controller.get_order(order_id)
+
+    def _cancel_order(self, body, query, headers, order_id):
+        self._get_order(body, query, headers, order_id)
+        self.controller.cancel_order(order_id, headers.get("idempotency-key"))
+        return self.controller.get_order(order_id)
+
+    def _rate_driver(self, body, query, headers, order_id):
+        self._get_order(body, query, headers, order_id)
+        self.controller.rate_driver(order_id, int(self._field(body, "stars")))
+        return self.controller.get_order(order_id)
+
+    def _customer_history(self, body, query, headers, customer_id):
+        page = self.controller.get_customer_history(customer_id, self._limit(query, HISTORY_PAGE_SIZE),
+                                                    query.get("cursor"))
+        return {"items": page.items, "next_cursor": page.next_cursor}
+
+    def _driver_history(self, body, query, headers, driver_id):
+        page = self.controller.get_driver_history(driver_id, self._limit(query, HISTORY_PAGE_SIZE),
+                                                  query.get("cursor"))
+        return {"items": page.items, "next_cursor": page.next_cursor}
+
+    def _ingest_telemetry(self, body, query, headers):
+        if not isinstance(body, list):
+            raise HTTPError(400, "Expected a JSON array.")
+        return {"accepted": self.controller.ingest_telemetry([DriverTelemetry(**item) for item in body])}
+
+    def _events(self, body, query, headers):
+        try:
+            offset = int(query.get("offset", 0))
+        except ValueError:
+            raise HTTPError(400, "offset must be an integer.")
+        return _Stream(self.controller.get_events(offset, self._limit(query, 100)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delivery HTTP/JSON API.")
+    parser.add_argument("--host", default=HTTP_HOST)
+    parser.add_argument("--port", type=int, default=HTTP_PORT)
+    args = parser.parse_args()
+
+    controller = DeliveryController()
+    server = DeliveryHTTPServer(controller, args.host, args.port, persist=True)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        controller.stop() # Stop the timeout scheduler and drain pending writes
+
+
+if __name__ == "__main__":
+    main()
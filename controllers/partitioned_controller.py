@@ -0,0 +1,200 @@
+import multiprocessing
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from constants import config
+from models import Customer, Driver, Order, OrderEvent
+from models import codec
+from services.inventory_service import InventoryService
+from utils.logger import logger
+
+_STOP = "__stop__"
+_ENTITIES = (Order, Driver, Customer, OrderEvent)
+
+
+def _encode_result(result: Any) -> Tuple[str, Any]:
+    # Entities cross the pipe as models.codec records: smaller and faster than pickled dataclasses
+    if isinstance(result, _ENTITIES):
+        return "entity", codec.encode(result)
+    if isinstance(result, list) and result and all(isinstance(r, _ENTITIES) for r in result):
+        return "entities", codec.encode_many(result)
+    return "ok", result
+
+
+def _worker_main(conn, worker_index: int, stock: Dict[str, Any]):
+    """
+    Entry point of a partition worker process. Owns a private DeliveryController (and therefore
+    private repository/service singletons) and serves (method, args, kwargs) requests over `conn`.
+    Item stock is the exception: every worker reserves from the router's shared counters in `stock`.
+    """
+    if config.REPOSITORY_BACKEND == "sqlite":
+        root, ext = config.SQLITE_DB_FILE.rsplit(".", 1) if "." in config.SQLITE_DB_FILE else (config.SQLITE_DB_FILE, "db")
+        config.SQLITE_DB_FILE = f"{root}-w{worker_index}.{ext}"
+
+    from controllers.delivery_controller import DeliveryController
+    from services.inventory_service import InventoryService
+    InventoryService().share_stock(stock)
+    controller = DeliveryController()
+
+    while True:
+        try:
+            method, args, kwargs = conn.recv()
+        except EOFError:
+            break
+        if method == _STOP:
+            conn.send(("ok", None))
+            break
+        try:
+            conn.send(_encode_result(getattr(controller, method)(*args, **kwargs)))
+        except Exception as e:
+            conn.send(("error", e))
+    controller.stop()
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, ctx, index: int, stock: Dict[str, Any]):
+        self.index = index
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, index, stock), daemon=True)
+        self.lock = threading.Lock() # One in-flight request per pipe
+        self.process.start()
+        child_conn.close()
+
+    def send(self, method: str, args: tuple = (), kwargs: Optional[dict] = None):
+        self.conn.send((method, args, kwargs or {}))
+
+    def recv(self) -> Any:
+        status, payload = self.conn.recv()
+        if status == "error":
+            raise payload
+        if status == "entity":
+            return codec.decode(payload)
+        if status == "entities":
+            return codec.decode_many(payload)
+        return payload
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        with self.lock:
+            self.send(method, args, kwargs)
+            return self.recv()
+
+
+class PartitionedDeliveryController:
+    """
+    Router in front of a pool of worker processes, each running its own DeliveryController.
+    Customers and drivers are onboarded into a zone; a zone is owned by exactly one worker,
+    so all operations on an order are forwarded to the worker that owns its customer's zone.
+    Cross-partition reads (all drivers, leaderboard) are scattered to every worker and merged.
+    Item stock is global rather than per zone: the router owns one shared counter per item and
+    every worker reserves and releases against it, so workers cannot each sell the full stock.
+    """
+    def __init__(self, num_workers: Optional[int] = None):
+        num_workers = num_workers or config.PARTITION_WORKERS
+        ctx = multiprocessing.get_context("spawn") # Fresh interpreter: no inherited singletons or threads
+        self.stock = InventoryService.shared_stock(ctx)
+        self.workers: List[_Worker] = [_Worker(ctx, i, self.stock) for i in range(num_workers)]
+        self.lock = threading.Lock()
+        self.customer_zones: Dict[str, str] = {}
+        self.driver_zones: Dict[str, str] = {}
+        self.order_zones: Dict[str, str] = {}
+        logger.info(f"PartitionedDeliveryController started {num_workers} workers.")
+
+    def _worker_for_zone(self, zone: str) -> _Worker:
+        # crc32 rather than hash(): stable across processes and restarts
+        return self.workers[zlib.crc32(zone.encode()) % len(self.workers)]
+
+    def _zone_of(self, table: Dict[str, str], key: str, kind: str) -> str:
+        with self.lock:
+            zone = table.get(key)
+        if zone is None:
+            raise ValueError(f"{kind} {key} not found.")
+        return zone
+
+    def _order_worker(self, order_id: str) -> _Worker:
+        return self._worker_for_zone(self._zone_of(self.order_zones, order_id, "Order"))
+
+    def _gather(self, method: str, *args, **kwargs) -> List[Any]:
+        # Take every pipe lock in index order (no deadlock between concurrent gathers),
+        # send to all workers first so they work in parallel, then collect.
+        for worker in self.workers:
+            worker.lock.acquire()
+        try:
+            for worker in self.workers:
+                worker.send(method, args, kwargs)
+            return [worker.recv() for worker in self.workers]
+        finally:
+            for worker in self.workers:
+                worker.lock.release()
+
+    # --- Customer/Driver Onboarding ---
+    def onboard_customer(self, id: str, name: str, zone: str) -> Customer:
+        customer = self._worker_for_zone(zone).call("onboard_customer", id, name)
+        with self.lock:
+            self.customer_zones[id] = zone
+        return customer
+
+    def onboard_driver(self, id: str, name: str, zone: str) -> Driver:
+        driver = self._worker_for_zone(zone).call("onboard_driver", id, name)
+        with self.lock:
+            self.driver_zones[id] = zone
+        return driver
+
+    # --- Order Management ---
+    def create_order(self, customer_id: str, item_id: str, quantity: int = 1,
+                     idempotency_key: Optional[str] = None) -> str:
+        # A customer's orders always land on the same worker, so its idempotency cache sees every retry
+        zone = self._zone_of(self.customer_zones, customer_id, "Customer")
+        order_id = self._worker_for_zone(zone).call("create_order", customer_id, item_id, quantity,
+                                                    idempotency_key=idempotency_key)
+        with self.lock:
+            self.order_zones[order_id] = zone
+        return order_id
+
+    def get_order(self, order_id: str) -> Optional[Order]:
+        with self.lock:
+            zone = self.order_zones.get(order_id)
+        if zone is None:
+            return None
+        return self._worker_for_zone(zone).call("get_order", order_id)
+
+    def show_order_status(self, order_id: str):
+        self._order_worker(order_id).call("show_order_status", order_id)
+
+    def get_all_drivers(self) -> List[Driver]:
+        return [d for drivers in self._gather("get_all_drivers") for d in drivers]
+
+    def get_top_drivers(self, limit: int = 10) -> List[Driver]:
+        drivers = self.get_all_drivers()
+        drivers.sort(key=lambda d: (d.average_rating, d.ratings_count), reverse=True)
+        return drivers[:limit]
+
+    # --- Delivery Flow ---
+    def pickup_order(self, driver_id: str, order_id: str, idempotency_key: Optional[str] = None):
+        self._order_worker(order_id).call("pickup_order", driver_id, order_id, idempotency_key=idempotency_key)
+
+    def complete_order(self, driver_id: str, order_id: str, idempotency_key: Optional[str] = None):
+        self._order_worker(order_id).call("complete_order", driver_id, order_id, idempotency_key=idempotency_key)
+
+    def cancel_order(self, order_id: str, idempotency_key: Optional[str] = None):
+        self._order_worker(order_id).call("cancel_order", order_id, idempotency_key=idempotency_key)
+
+    def rate_driver(self, order_id: str, stars: int):
+        self._order_worker(order_id).call("rate_driver", order_id, stars)
+
+    def available_stock(self, item_id: str) -> Optional[int]:
+        """Units left across all partitions; None means unlimited."""
+        counter = self.stock.get(item_id)
+        if counter is None:
+            InventoryService().available(item_id) # Raises for unknown items
+            return None
+        return counter.value
+
+    def close(self):
+        for worker in self.workers:
+            try:
+                worker.call(_STOP)
+            except (EOFError, OSError):
+                pass # Worker already gone
+            worker.process.join(timeout=5)
+            worker.conn.close()
@@ -61,6 +61,8 @@ def peer_service():
     except Exception as e:
         logger.error(f"Error in rating: {e}")
 
+    controller.stop() # Stop the timeout scheduler and drain pending writes
+
 if __name__ == "__main__":
     peer_service()
 
@@ -1,4 +1,6 @@
 from .user import Customer, Driver
 from .item import Item
 from .order import Order
-from constants.enums import OrderStatus, DriverStatus
+from .event import OrderEvent
+from .telemetry import DriverTelemetry
+from constants.enums import OrderStatus, DriverStatus, OrderEventType
@@ -0,0 +1,279 @@
+"""
+Compact binary encoding for Order, Driver, Customer and OrderEvent, used where the JSON form is
+too large or too slow: archive segments, snapshot files, worker-process IPC and binary event feeds.
+
+A record is a type tag byte followed by its fields in declaration order:
+    strings        varint byte length + UTF-8
+    counts, ints   unsigned varint (LEB128: 7 bits per byte, small values take one byte)
+    timestamps     float64 (also total_rating)
+    enums          one byte, from the code tables below
+    optionals      a presence bitmask right after the tag; absent fields take no bytes
+Codes and tags are stored on disk: only ever append to the tables. encode_many() writes records
+as frames (varint length + record) for files, pipes and streams; decode_many() reads them back.
+"""
+import struct
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+from models.user import Customer, Driver
+from models.order import Order
+from models.event import OrderEvent
+from constants.enums import OrderStatus, DriverStatus, OrderEventType
+
+_F64 = struct.Struct("<d")
+_ORDER, _DRIVER, _CUSTOMER, _EVENT = 1, 2, 3, 4 # Record type tags
+
+ORDER_STATUS_CODES = {OrderStatus.CREATED: 0, OrderStatus.ASSIGNED: 1, OrderStatus.PICKED_UP: 2,
+                      OrderStatus.DELIVERED: 3, OrderStatus.CANCELLED: 4}
+DRIVER_STATUS_CODES = {DriverStatus.AVAILABLE: 0, DriverStatus.BUSY: 1}
+EVENT_TYPE_CODES = {OrderEventType.ORDER_CREATED: 0, OrderEventType.ORDER_QUEUED: 1,
+                    OrderEventType.STATUS_CHANGED: 2}
+_ORDER_STATUSES = {code: status for status, code in ORDER_STATUS_CODES.items()}
+_DRIVER_STATUSES = {code: status for status, code in DRIVER_STATUS_CODES.items()}
+_EVENT_TYPES = {code: event_type for event_type, code in EVENT_TYPE_CODES.items()}
+
+Entity = Union[Order, Driver, Customer, OrderEvent]
+
+
+class OrderHead(NamedTuple):
+    """The leading fields of an Order record: enough to index or count it without a full decode."""
+    id: str
+    customer_id: str
+    item_id: str
+    quantity: int
+    status: OrderStatus
+    created_at: float
+    driver_id: Optional[str]
+
+
+# --- Writing ---
+def _varint(out: bytearray, n: int):
+    if n < 0:
+        raise ValueError(f"Cannot encode negative value {n}.")
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _str(out: bytearray, value: str):
+    data = value.encode()
+    _varint(out, len(data))
+    out += data
+
+
+def _encode_order(out: bytearray, order: Order):
+    flags = ((order.driver_id is not None) | (order.assigned_at is not None) << 1
+             | (order.picked_up_at is not None) << 2 | (order.delivered_at is not None) << 3
+             | (order.rating is not None) << 4 | (order.cancelled_at is not None) << 5)
+    out += bytes((_ORDER, flags))
+    _str(out, order.id)
+    _str(out, order.customer_id)
+    _str(out, order.item_id)
+    _varint(out, order.quantity)
+    out.append(ORDER_STATUS_CODES[order.status])
+    out += _F64.pack(order.created_at)
+    if order.driver_id is not None:
+        _str(out, order.driver_id)
+    for timestamp in (order.assigned_at, order.picked_up_at, order.delivered_at, order.cancelled_at):
+        if timestamp is not None:
+            out += _F64.pack(timestamp)
+    if order.rating is not None:
+        _varint(out, order.rating)
+    _varint(out, order.version)
+
+
+def _encode_driver(out: bytearray, driver: Driver):
+    out.append(_DRIVER)
+    _str(out, driver.id)
+    _str(out, driver.name)
+    out.append(DRIVER_STATUS_CODES[driver.status])
+    _str(out, driver.vehicle_type)
+    _varint(out, driver.capacity)
+    _varint(out, len(driver.active_order_ids))
+    for order_id in driver.active_order_ids:
+        _str(out, order_id)
+    out += _F64.pack(driver.total_rating)
+    _varint(out, driver.ratings_count)
+    _varint(out, driver.version)
+
+
+def _encode_customer(out: bytearray, customer: Customer):
+    out.append(_CUSTOMER)
+    _str(out, customer.id)
+    _str(out, customer.name)
+
+
+def _encode_event(out: bytearray, event: OrderEvent):
+    out += bytes((_EVENT, (event.driver_id is not None) | (event.previous_status is not None) << 1))
+    _varint(out, event.offset)
+    out.append(EVENT_TYPE_CODES[event.type])
+    _str(out, event.order_id)
+    _str(out, event.customer_id)
+    out.append(ORDER_STATUS_CODES[event.status])
+    if event.driver_id is not None:
+        _str(out, event.driver_id)
+    if event.previous_status is not None:
+        out.append(ORDER_STATUS_CODES[event.previous_status])
+    out += _F64.pack(event.timestamp)
+    _varint(out, event.version)
+
+
+_ENCODERS = {Order: _encode_order, Driver: _encode_driver, Customer: _encode_customer, OrderEvent: _encode_event}
+
+
+def _encode_into(out: bytearray, entity: Entity):
+    encoder = _ENCODERS.get(type(entity))
+    if encoder is None:
+        raise ValueError(f"No binary encoding for {type(entity).__name__}.")
+    encoder(out, entity)
+
+
+def encode(entity: Entity) -> bytes:
+    out = bytearray()
+    _encode_into(out, entity)
+    return bytes(out)
+
+
+def encode_many(entities: Iterable[Entity]) -> bytes:
+    """Length-prefixed frames, one per entity (types may be mixed)."""
+    out = bytearray()
+    record = bytearray()
+    for entity in entities:
+        record.clear()
+        _encode_into(record, entity)
+        _varint(out, len(record))
+        out += record
+    return bytes(out)
+
+
+# --- Reading ---
+class _Reader:
+    __slots__ = ("data", "pos", "end")
+
+    def __init__(self, data, pos: int = 0, end: int = -1):
+        self.data = data
+        self.pos = pos
+        self.end = len(data) if end < 0 else end
+
+    def byte(self) -> int:
+        if self.pos >= self.end:
+            raise ValueError("Truncated record.")
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def varint(self) -> int:
+        n = shift = 0
+        while True:
+            b = self.byte()
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def bytes(self, length: int):
+        if self.pos + length > self.end:
+            raise ValueError("Truncated record.")
+        self.pos += length
+        return self.data[self.pos - length:self.pos]
+
+    def str(self) -> str:
+        return bytes(self.bytes(self.varint())).decode()
+
+    def f64(self) -> float:
+        return _F64.unpack(self.bytes(8))[0]
+
+
+def _code(table: dict, code: int, what: str):
+    try:
+        return table[code]
+    except KeyError:
+        raise ValueError(f"Unknown {what} code {code}.")
+
+
+def _decode_order(r: _Reader) -> Order:
+    flags = r.byte()
+    order = Order(id=r.str(), customer_id=r.str(), item_id=r.str(), quantity=r.varint(),
+                  status=_code(_ORDER_STATUSES, r.byte(), "order status"), created_at=r.f64())
+    if flags & 1:
+        order.driver_id = r.str()
+    if flags & 2:
+        order.assigned_at = r.f64()
+    if flags & 4:
+        order.picked_up_at = r.f64()
+    if flags & 8:
+        order.delivered_at = r.f64()
+    if flags & 32:
+        order.cancelled_at = r.f64()
+    if flags & 16:
+        order.rating = r.varint()
+    order.version = r.varint()
+    return order
+
+
+def _decode_driver(r: _Reader) -> Driver:
+    driver_id, name = r.str(), r.str()
+    status = _code(_DRIVER_STATUSES, r.byte(), "driver status")
+    vehicle_type, capacity = r.str(), r.varint()
+    active = [r.str() for _ in range(r.varint())]
+    return Driver(id=driver_id, name=name, status=status, vehicle_type=vehicle_type, capacity=capacity,
+                  active_order_ids=active, total_rating=r.f64(), ratings_count=r.varint(), version=r.varint())
+
+
+def _decode_customer(r: _Reader) -> Customer:
+    return Customer(id=r.str(), name=r.str())
+
+
+def _decode_event(r: _Reader) -> OrderEvent:
+    flags = r.byte()
+    offset = r.varint()
+    event_type = _code(_EVENT_TYPES, r.byte(), "event type")
+    order_id, customer_id = r.str(), r.str()
+    status = _code(_ORDER_STATUSES, r.byte(), "order status")
+    driver_id = r.str() if flags & 1 else None
+    previous_status = _code(_ORDER_STATUSES, r.byte(), "order status") if flags & 2 else None
+    return OrderEvent(offset=offset, type=event_type, order_id=order_id, customer_id=customer_id, status=status,
+                      driver_id=driver_id, previous_status=previous_status, timestamp=r.f64(), version=r.varint())
+
+
+def decode_order_head(data) -> OrderHead:
+    """Reads only the head of an encoded Order (the rest of the record is not parsed)."""
+    r = _Reader(data)
+    if r.byte() != _ORDER:
+        raise ValueError("Not an order record.")
+    flags = r.byte()
+    order_id, customer_id, item_id, quantity = r.str(), r.str(), r.str(), r.varint()
+    status = _code(_ORDER_STATUSES, r.byte(), "order status")
+    created_at = r.f64()
+    return OrderHead(order_id, customer_id, item_id, quantity, status, created_at, r.str() if flags & 1 else None)
+
+
+_DECODERS = {_ORDER: _decode_order, _DRIVER: _decode_driver, _CUSTOMER: _decode_customer, _EVENT: _decode_event}
+
+
+def _decode_record(r: _Reader) -> Entity:
+    decoder = _DECODERS.get(r.byte())
+    if decoder is None:
+        raise ValueError(f"Unknown record tag {r.data[r.pos - 1]}.")
+    entity = decoder(r)
+    if r.pos != r.end:
+        raise ValueError(f"{r.end - r.pos} unexpected bytes after the record.")
+    return entity
+
+
+def decode(data) -> Entity:
+    """Decodes one record (bytes, bytearray, memoryview or an mmap slice)."""
+    return _decode_record(_Reader(data))
+
+
+def iter_frames(data) -> Iterator[Entity]:
+    """Decodes frames written by encode_many, in order."""
+    r = _Reader(data)
+    while r.pos < len(data):
+        length = r.varint()
+        if r.pos + length > len(data):
+            raise ValueError("Truncated frame.")
+        yield _decode_record(_Reader(data, r.pos, r.pos + length))
+        r.pos += length
+
+
+def decode_many(data) -> List[Entity]:
+    return list(iter_frames(data))
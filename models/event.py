@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from typing import Optional
+from constants.enums import OrderEventType, OrderStatus
+
+@dataclass(frozen=True)
+class OrderEvent:
+    offset: int # Position in the change feed, strictly increasing
+    type: OrderEventType
+    order_id: str
+    customer_id: str
+    status: OrderStatus
+    driver_id: Optional[str] = None
+    previous_status: Optional[OrderStatus] = None
+    timestamp: float = 0.0
+    version: int = 0 # Order version this event describes; orders events of the same order
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from typing import Optional
-import time
+from utils import clock
 from constants.enums import OrderStatus
 
 @dataclass
@@ -11,11 +11,13 @@ class Order:
     quantity: int = 1
     status: OrderStatus = OrderStatus.CREATED
     driver_id: Optional[str] = None
-    created_at: float = field(default_factory=time.time)
+    created_at: float = field(default_factory=clock.now)
     assigned_at: Optional[float] = None
     picked_up_at: Optional[float] = None
     delivered_at: Optional[float] = None
+    cancelled_at: Optional[float] = None
     rating: Optional[int] = None
+    version: int = 0 # Bumped on every write; used for compare-and-set
 
     def __str__(self):
         driver_info = f", Driver: {self.driver_id}" if self.driver_id else ""
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(frozen=True)
+class DriverTelemetry:
+    driver_id: str
+    timestamp: float # When the device took the reading (not when it arrived)
+    lat: Optional[float] = None # None for a heartbeat without a position fix
+    lon: Optional[float] = None
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, List
 from constants.enums import DriverStatus
 
 @dataclass
@@ -13,9 +13,19 @@ class Driver:
     name: str
     status: DriverStatus = DriverStatus.AVAILABLE
     vehicle_type: str = "Two Wheeler"
-    current_order_id: Optional[str] = None
+    capacity: int = 1 # Orders the driver can carry at once
+    active_order_ids: List[str] = field(default_factory=list)
     total_rating: float = 0.0
     ratings_count: int = 0
+    version: int = 0 # Bumped on every write; used for compare-and-set
+
+    @property
+    def current_order_id(self) -> Optional[str]:
+        return self.active_order_ids[0] if self.active_order_ids else None
+
+    @property
+    def remaining_capacity(self) -> int:
+        return self.capacity - len(self.active_order_ids)
 
     @property
     def average_rating(self) -> float:
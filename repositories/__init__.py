@@ -1,3 +1,12 @@
 from .driver_repository import InMemoryDriverRepository
 from .order_repository import InMemoryOrderRepository
 from .customer_repository import InMemoryCustomerRepository
+from .sqlite_repository import (
+    SqliteConnectionPool, SqliteOrderRepository, SqliteDriverRepository, SqliteCustomerRepository
+)
+from .cached_repository import CachedRepository
+from .snapshot import RepositorySnapshot
+from .json_store import JsonSnapshotStore
+from .binary_store import BinarySnapshotStore
+from .order_archive import OrderArchive
+from .factory import get_order_repository, get_driver_repository, get_customer_repository
@@ -0,0 +1,31 @@
+import json
+import struct
+from typing import List, Optional
+from models import Order
+from constants.enums import OrderStatus
+
+# Segments written before models.codec: the same header and index layout, JSON records.
+# OrderArchive rewrites such a segment in the current format the first time it opens it,
+# so this reader runs at most once per old file.
+LEGACY_MAGIC = b"ORDSEG01"
+_HEADER = struct.Struct("<8sIHH")
+_ENTRY_TAIL = struct.Struct("<QI")
+
+
+def read_json_segment(path: str) -> Optional[List[Order]]:
+    """The orders stored in an ORDSEG01 segment, or None if the file is not one."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        return None
+    magic, count, id_width, _ = _HEADER.unpack_from(data, 0)
+    if magic != LEGACY_MAGIC:
+        return None
+    stride = id_width + _ENTRY_TAIL.size
+    orders = []
+    for i in range(count):
+        offset, length = _ENTRY_TAIL.unpack_from(data, _HEADER.size + i * stride + id_width)
+        record = json.loads(data[offset:offset + length])
+        record["status"] = OrderStatus(record["status"])
+        orders.append(Order(**record))
+    return orders
@@ -0,0 +1,68 @@
+import os
+from typing import Iterable, Optional
+from models import Customer, Driver, Order
+from models import codec
+from constants.config import DATA_DIR, CUSTOMERS_BIN_FILE, DRIVERS_BIN_FILE, ORDERS_BIN_FILE
+from repositories.json_store import JsonSnapshotStore
+from utils.logger import logger
+
+
+class BinarySnapshotStore:
+    """
+    Same contract as JsonSnapshotStore, with one file of models.codec frames per entity type.
+    Each file is written to a temp file and renamed into place, so a crash mid-write keeps the last
+    complete snapshot. With no binary snapshot yet, load_into reads `fallback` (the JSON snapshot)
+    once; the next save writes it out in binary.
+    """
+    def __init__(self, data_dir: str = DATA_DIR, customers_file: str = CUSTOMERS_BIN_FILE,
+                 drivers_file: str = DRIVERS_BIN_FILE, orders_file: str = ORDERS_BIN_FILE,
+                 fallback: Optional[JsonSnapshotStore] = None):
+        self.data_dir = data_dir
+        self.customers_file = customers_file
+        self.drivers_file = drivers_file
+        self.orders_file = orders_file
+        self.fallback = fallback
+
+    def save(self, customers: Iterable[Customer], drivers: Optional[Iterable[Driver]], orders: Iterable[Order]):
+        """Rewrites the files; drivers=None leaves the drivers file alone (they live in another store)."""
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            for path, entities in ((self.customers_file, customers), (self.drivers_file, drivers),
+                                   (self.orders_file, orders)):
+                if entities is None:
+                    continue
+                tmp_path = path + ".tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(codec.encode_many(entities))
+                os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error saving data: {e}")
+
+    def load_into(self, customer_repo, driver_repo, order_repo) -> int:
+        """Saves every stored entity into the given repositories; returns how many were loaded."""
+        paths = (self.customers_file, self.drivers_file, self.orders_file)
+        if not any(os.path.exists(p) for p in paths):
+            return self.fallback.load_into(customer_repo, driver_repo, order_repo) if self.fallback else 0
+
+        loaded = 0
+        try:
+            for customer in self._read(self.customers_file):
+                customer_repo.save(customer)
+                loaded += 1
+            for driver in (self._read(self.drivers_file) if driver_repo is not None else ()):
+                driver_repo.save(driver)
+                loaded += 1
+            # Oldest first, so per-customer and per-driver history lists are rebuilt in creation order
+            for order in sorted(self._read(self.orders_file), key=lambda o: (o.created_at, o.id)):
+                order_repo.save(order)
+                loaded += 1
+        except Exception as e:
+            logger.error(f"Error loading data: {e}")
+        return loaded
+
+    @staticmethod
+    def _read(path: str):
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as f:
+            return codec.decode_many(f.read())
@@ -0,0 +1,64 @@
+from typing import Optional, List, Iterable, Dict, Any
+from utils.lru_cache import LRUCache
+
+
+class CachedRepository:
+    """
+    Read-through LRU/TTL cache in front of any repository exposing save/get_by_id/get_all/clear.
+    Writes go through to the wrapped repository and refresh the cached entry; both steps run under the
+    wrapped repository's lock, so concurrent writers cannot leave an older entity cached.
+    Scans (get_all and backend-specific queries) bypass the cache so they do not evict hot entries.
+    """
+    def __init__(self, inner, max_size: int = 10000, ttl_seconds: Optional[float] = None):
+        self.inner = inner
+        self.cache = LRUCache(max_size, ttl_seconds)
+
+    @property
+    def lock(self):
+        return self.inner.lock
+
+    def save(self, entity):
+        with self.lock:
+            self.inner.save(entity)
+            self.cache.put(entity.id, entity)
+
+    def save_all(self, entities: Iterable):
+        entities = list(entities)
+        with self.lock:
+            self.inner.save_all(entities)
+            for entity in entities:
+                self.cache.put(entity.id, entity)
+
+    def compare_and_set(self, entity, expected_version: int) -> bool:
+        with self.lock:
+            if self.inner.compare_and_set(entity, expected_version):
+                self.cache.put(entity.id, entity)
+                return True
+            self.cache.invalidate(entity.id) # Our copy lost the race, reload on next read
+            return False
+
+    def get_by_id(self, entity_id: str):
+        entity = self.cache.get(entity_id) # Hits are lock-free
+        if entity is None:
+            with self.lock: # A miss must not cache a row a concurrent write has already replaced
+                entity = self.inner.get_by_id(entity_id)
+                if entity is not None:
+                    self.cache.put(entity_id, entity)
+        return entity
+
+    def get_all(self) -> List:
+        return self.inner.get_all()
+
+    def clear(self):
+        self.inner.clear()
+        self.cache.clear()
+
+    def invalidate(self, entity_id: str):
+        self.cache.invalidate(entity_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+    def __getattr__(self, name):
+        # Everything else (get_by_status, get_by_driver, pool, ...) is served by the wrapped repository
+        return getattr(self.inner, name)
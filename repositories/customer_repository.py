@@ -1,6 +1,6 @@
-import threading
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from models import Customer
+from utils.instrumented_lock import make_lock
 
 class InMemoryCustomerRepository:
     _instance = None
@@ -8,7 +8,7 @@ class InMemoryCustomerRepository:
     def __new__(cls):
         if not cls._instance:
             cls._instance = super(InMemoryCustomerRepository, cls).__new__(cls)
-            cls._instance.lock = threading.RLock()
+            cls._instance.lock = make_lock("CustomerRepository.lock", reentrant=True)
             cls._instance.customers = {} # Dict[str, Customer]
         return cls._instance
 
@@ -20,6 +20,10 @@ class InMemoryCustomerRepository:
         with self.lock:
             return self.customers.get(customer_id)
             
+    def get_all(self) -> List[Customer]:
+        with self.lock:
+            return list(self.customers.values())
+
     def clear(self):
         with self.lock:
             self.customers.clear()
@@ -0,0 +1,62 @@
+from typing import Callable, Dict, Iterator, Optional
+from models import Driver
+from constants.enums import DriverStatus
+
+
+class DriverCapacityIndex:
+    """
+    Buckets AVAILABLE drivers by remaining capacity so the least-loaded driver is found without a scan.
+    Lookups cost O(distinct capacity levels), which is bounded by the largest driver capacity.
+    Within a bucket drivers are kept in arrival order, so equally loaded drivers are used round-robin.
+    Not thread-safe on its own: callers hold their repository lock.
+    """
+    def __init__(self):
+        self._buckets: Dict[int, Dict[str, None]] = {} # remaining capacity -> ordered set of driver ids
+        self._level: Dict[str, int] = {} # driver id -> bucket it currently sits in
+        self.total_remaining = 0
+
+    def update(self, driver: Driver):
+        remaining = driver.remaining_capacity if driver.status == DriverStatus.AVAILABLE else 0
+        current = self._level.get(driver.id)
+        if current == remaining:
+            return
+        self.remove(driver.id)
+        if remaining > 0:
+            self._buckets.setdefault(remaining, {})[driver.id] = None
+            self._level[driver.id] = remaining
+            self.total_remaining += remaining
+
+    def remove(self, driver_id: str):
+        current = self._level.pop(driver_id, None)
+        if current is None:
+            return
+        bucket = self._buckets[current]
+        del bucket[driver_id]
+        if not bucket:
+            del self._buckets[current]
+        self.total_remaining -= current
+
+    def best(self) -> Optional[str]:
+        if not self._buckets:
+            return None
+        return next(iter(self._buckets[max(self._buckets)]))
+
+    def best_matching(self, skip: Callable[[str], bool]) -> Optional[str]:
+        """Like best(), passing over drivers for which skip(driver_id) is true."""
+        for level in sorted(self._buckets, reverse=True):
+            for driver_id in self._buckets[level]:
+                if not skip(driver_id):
+                    return driver_id
+        return None
+
+    def iter_best(self) -> Iterator[str]:
+        for level in sorted(self._buckets, reverse=True):
+            yield from list(self._buckets[level])
+
+    def clear(self):
+        self._buckets.clear()
+        self._level.clear()
+        self.total_remaining = 0
+
+    def __len__(self) -> int:
+        return len(self._level)
@@ -1,6 +1,11 @@
-import threading
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict, Mapping
 from models import Driver
+from .optimistic import _clone
+from .snapshot import RepositorySnapshot
+from .driver_capacity_index import DriverCapacityIndex
+from .driver_score_index import DriverScoreIndex
+from utils.tracing import traced
+from utils.instrumented_lock import make_lock
 
 class InMemoryDriverRepository:
     _instance = None
@@ -8,22 +13,106 @@ class InMemoryDriverRepository:
     def __new__(cls):
         if not cls._instance:
             cls._instance = super(InMemoryDriverRepository, cls).__new__(cls)
-            cls._instance.lock = threading.RLock()
+            cls._instance.lock = make_lock("DriverRepository.lock", reentrant=True)
             cls._instance.drivers = {} # Dict[str, Driver]
+            cls._instance._snapshot = RepositorySnapshot() # Frozen copies, replaced (never mutated) on write
+            cls._instance.capacity_index = DriverCapacityIndex()
+            cls._instance.score_index = DriverScoreIndex()
+            cls._instance.store = None # Optional durable store written through on every change (see attach_store)
         return cls._instance
 
+    @traced("DriverRepository.save")
     def save(self, driver: Driver):
         with self.lock:
+            driver.version += 1
+            self._write_through(driver, driver.version - 1)
             self.drivers[driver.id] = driver
+            self._publish(driver)
+            self.capacity_index.update(driver)
+            self.score_index.update(driver)
 
-    def get_by_id(self, driver_id: str) -> Optional[Driver]:
+    @traced("DriverRepository.compare_and_set")
+    def compare_and_set(self, driver: Driver, expected_version: int) -> bool:
+        """
+        Stores `driver` only if the stored version is still `expected_version`.
+        The stored instance is updated in place so references already handed out stay current.
+        """
+        with self.lock:
+            current = self.drivers.get(driver.id)
+            if current is None or current.version != expected_version:
+                return False
+            driver.version = expected_version + 1
+            self._write_through(driver, expected_version)
+            if current is not driver:
+                vars(current).update(vars(driver))
+            self._publish(current)
+            self.capacity_index.update(current)
+            self.score_index.update(current)
+            return True
+
+    def attach_store(self, store) -> int:
+        """
+        Loads the drivers held by `store` (e.g. MmapDriverStore) and writes every later change through
+        to it, inside the same lock as the in-memory update. Returns how many drivers were loaded.
+        """
         with self.lock:
-            return self.drivers.get(driver_id)
+            drivers = store.load()
+            for driver in drivers.values():
+                self.drivers[driver.id] = driver
+                self._publish(driver)
+                self.capacity_index.update(driver)
+                self.score_index.update(driver)
+            self.store = store
+            return len(drivers)
+
+    def _write_through(self, driver: Driver, previous_version: int):
+        # Caller holds self.lock; runs before the in-memory update so a rejected record changes nothing
+        if self.store is None:
+            return
+        try:
+            self.store.put(driver)
+        except Exception:
+            driver.version = previous_version
+            raise
+
+    def _publish(self, driver: Driver):
+        # Copy-on-write under the writer lock: snapshots already handed out keep their old map
+        self._snapshot = self._snapshot.with_entity(_clone(driver))
+
+    def snapshot(self) -> RepositorySnapshot:
+        """O(1) immutable point-in-time view; iterating it never takes the writer lock."""
+        return self._snapshot
+
+    def get_by_id(self, driver_id: str) -> Optional[Driver]:
+        # Lock-free: a single dict lookup is atomic, writers swap whole entries or go through compare_and_set
+        return self.drivers.get(driver_id)
 
     def get_all(self) -> List[Driver]:
         with self.lock:
             return list(self.drivers.values())
+
+    def find_available(self, skip: Optional[Callable[[str], bool]] = None) -> Optional[Driver]:
+        """AVAILABLE driver with the most spare capacity (ignoring those `skip` rejects), or None."""
+        with self.lock:
+            driver_id = self.capacity_index.best_matching(skip) if skip else self.capacity_index.best()
+            return self.drivers[driver_id] if driver_id else None
+
+    def find_best(self, weights: Mapping[str, float], fit: Optional[Mapping[str, float]] = None,
+                  skip: Optional[Callable[[str], bool]] = None) -> Optional[Driver]:
+        """Highest-scoring AVAILABLE driver for an item's vehicle fit (see DriverScoreIndex), or None."""
+        with self.lock:
+            driver_id = self.score_index.best(weights, fit, skip)
+            return self.drivers[driver_id] if driver_id else None
+
+    def available_capacity(self) -> int:
+        with self.lock:
+            return self.capacity_index.total_remaining
             
     def clear(self):
         with self.lock:
             self.drivers.clear()
+            self._snapshot = RepositorySnapshot(version=self._snapshot.version + 1)
+            self.capacity_index.clear()
+            self.score_index.clear()
+            if self.store is not None:
+                self.store.clear()
@@ -0,0 +1,140 @@
+import math
+from typing import Callable, Dict, List, Mapping, Optional
+from models import Driver
+from constants.enums import DriverStatus
+from constants.config import DRIVER_SCORE_UNRATED, DRIVER_SCORE_IDLE_HORIZON_SECONDS
+from utils import clock
+
+try:
+    import numpy as np
+except ImportError: # Optional: without NumPy the same ranking runs as a Python loop
+    np = None
+
+# Score terms and their normalisation: rating / 5, idle seconds / horizon (capped at 1), vehicle fit in 0..1
+_MAX_RATING = 5.0
+
+
+class DriverScoreIndex:
+    """
+    Driver attributes used for scored assignment, kept in arrays aligned with a slot per driver
+    (NumPy when installed), so ranking every available driver for an order is one vectorized pass:
+
+        score = w_rating * rating / 5 + w_idle * min(idle / horizon, 1) + w_fit * fit[item][vehicle]
+
+    Idle time runs from when the driver's last active order left (or from onboarding).
+    Not thread-safe on its own: callers hold their repository lock.
+    """
+    def __init__(self, unrated: float = DRIVER_SCORE_UNRATED, idle_horizon: float = DRIVER_SCORE_IDLE_HORIZON_SECONDS):
+        self.unrated = unrated # Rating assumed until a driver has been rated
+        self.idle_horizon = idle_horizon
+        self._slot: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._vehicle_codes: Dict[str, int] = {}
+        self._capacity = 0
+        self._allocate(1024)
+
+    def _allocate(self, capacity: int):
+        old = self._capacity
+        if np is not None:
+            def grow(array, dtype, fill):
+                new = np.full(capacity, fill, dtype=dtype)
+                if old:
+                    new[:old] = array
+                return new
+            self._available = grow(getattr(self, "_available", None), bool, False)
+            self._rating = grow(getattr(self, "_rating", None), np.float64, 0.0)
+            self._idle_since = grow(getattr(self, "_idle_since", None), np.float64, math.nan)
+            self._vehicle = grow(getattr(self, "_vehicle", None), np.int32, 0)
+        else:
+            extra = capacity - old
+            self._available = getattr(self, "_available", []) + [False] * extra
+            self._rating = getattr(self, "_rating", []) + [0.0] * extra
+            self._idle_since = getattr(self, "_idle_since", []) + [math.nan] * extra
+            self._vehicle = getattr(self, "_vehicle", []) + [0] * extra
+        self._ids.extend([None] * (capacity - old))
+        self._free.extend(range(capacity - 1, old - 1, -1)) # Lowest slots handed out first
+        self._capacity = capacity
+
+    def update(self, driver: Driver):
+        slot = self._slot.get(driver.id)
+        if slot is None:
+            if not self._free:
+                self._allocate(self._capacity * 2)
+            slot = self._free.pop()
+            self._slot[driver.id] = slot
+            self._ids[slot] = driver.id
+            self._idle_since[slot] = math.nan
+        self._available[slot] = driver.status == DriverStatus.AVAILABLE and driver.remaining_capacity > 0
+        self._rating[slot] = driver.average_rating if driver.ratings_count else self.unrated
+        if driver.active_order_ids:
+            self._idle_since[slot] = math.nan
+        elif math.isnan(self._idle_since[slot]): # Just became idle
+            self._idle_since[slot] = clock.now()
+        code = self._vehicle_codes.setdefault(driver.vehicle_type, len(self._vehicle_codes))
+        self._vehicle[slot] = code
+
+    def remove(self, driver_id: str):
+        slot = self._slot.pop(driver_id, None)
+        if slot is None:
+            return
+        self._ids[slot] = None
+        self._available[slot] = False
+        self._free.append(slot)
+
+    def clear(self):
+        self._slot.clear()
+        self._ids = []
+        self._free = []
+        self._vehicle_codes.clear()
+        self._capacity = 0
+        for name in ("_available", "_rating", "_idle_since", "_vehicle"):
+            self.__dict__.pop(name, None)
+        self._allocate(1024)
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def _fit_table(self, fit: Optional[Mapping[str, float]]) -> List[float]:
+        # Per vehicle code; no fit table for the item means every vehicle suits it
+        return [1.0 if fit is None else fit.get(vehicle, 0.0) for vehicle in self._vehicle_codes] or [0.0]
+
+    def scores(self, weights: Mapping[str, float], fit: Optional[Mapping[str, float]] = None,
+               now: Optional[float] = None):
+        """Score per slot (NumPy array, or list without NumPy); -inf for slots that cannot take an order."""
+        now = clock.now() if now is None else now
+        w_rating, w_idle, w_fit = weights.get("rating", 0.0), weights.get("idle", 0.0), weights.get("vehicle_fit", 0.0)
+        fit_table = self._fit_table(fit)
+        if np is not None:
+            idle = np.nan_to_num(now - self._idle_since, nan=0.0)
+            score = (w_rating / _MAX_RATING) * self._rating
+            score += w_idle * np.clip(idle / self.idle_horizon, 0.0, 1.0)
+            score += w_fit * np.asarray(fit_table)[self._vehicle]
+            score[~self._available] = -np.inf
+            return score
+        score = []
+        for slot in range(self._capacity):
+            if not self._available[slot]:
+                score.append(-math.inf)
+                continue
+            idle_since = self._idle_since[slot]
+            idle = 0.0 if math.isnan(idle_since) else min(max((now - idle_since) / self.idle_horizon, 0.0), 1.0)
+            score.append(w_rating * self._rating[slot] / _MAX_RATING + w_idle * idle
+                         + w_fit * fit_table[self._vehicle[slot]])
+        return score
+
+    def best(self, weights: Mapping[str, float], fit: Optional[Mapping[str, float]] = None,
+             skip: Optional[Callable[[str], bool]] = None, now: Optional[float] = None) -> Optional[str]:
+        """Highest-scoring available driver id (ties go to the lowest slot), passing over those `skip` rejects."""
+        score = self.scores(weights, fit, now)
+        while True:
+            if np is not None:
+                slot = int(np.argmax(score))
+            else:
+                slot = max(range(len(score)), key=score.__getitem__, default=0)
+            if not len(score) or score[slot] == -math.inf:
+                return None
+            driver_id = self._ids[slot]
+            if not skip or not skip(driver_id):
+                return driver_id
+            score[slot] = -math.inf
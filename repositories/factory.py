@@ -0,0 +1,66 @@
+import threading
+from typing import Dict
+from constants import config
+from .order_repository import InMemoryOrderRepository
+from .driver_repository import InMemoryDriverRepository
+from .customer_repository import InMemoryCustomerRepository
+from .cached_repository import CachedRepository
+from .sqlite_repository import (
+    SqliteConnectionPool, SqliteOrderRepository, SqliteDriverRepository, SqliteCustomerRepository
+)
+
+_lock = threading.Lock()
+_sqlite_repos: Dict[str, Dict[str, object]] = {} # db path -> {"orders": ..., "drivers": ..., "customers": ...}
+
+
+def _cached(repo):
+    if config.REPOSITORY_CACHE_SIZE > 0:
+        return CachedRepository(repo, config.REPOSITORY_CACHE_SIZE, config.REPOSITORY_CACHE_TTL_SECONDS)
+    return repo
+
+
+def _sqlite(kind: str):
+    # One pool (and one repository per entity) per database file, shared like the in-memory singletons
+    with _lock:
+        repos = _sqlite_repos.get(config.SQLITE_DB_FILE)
+        if repos is None:
+            pool = SqliteConnectionPool(config.SQLITE_DB_FILE)
+            repos = {
+                "orders": _cached(SqliteOrderRepository(pool)),
+                "drivers": _cached(SqliteDriverRepository(pool)),
+                "customers": _cached(SqliteCustomerRepository(pool)),
+            }
+            _sqlite_repos[config.SQLITE_DB_FILE] = repos
+        return repos[kind]
+
+
+def _check_backend():
+    if config.REPOSITORY_BACKEND not in ("memory", "sqlite"):
+        raise ValueError(f"Unknown repository backend '{config.REPOSITORY_BACKEND}'.")
+    return config.REPOSITORY_BACKEND
+
+
+def get_order_repository():
+    if _check_backend() == "sqlite":
+        return _sqlite("orders")
+    return InMemoryOrderRepository()
+
+
+def get_driver_repository():
+    if _check_backend() == "sqlite":
+        return _sqlite("drivers")
+    return InMemoryDriverRepository()
+
+
+def get_customer_repository():
+    if _check_backend() == "sqlite":
+        return _sqlite("customers")
+    return InMemoryCustomerRepository()
+
+
+def reset_sqlite_repositories():
+    """Closes every pooled connection; used by tests and at shutdown."""
+    with _lock:
+        for repos in _sqlite_repos.values():
+            repos["orders"].pool.close_all()
+        _sqlite_repos.clear()
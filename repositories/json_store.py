@@ -0,0 +1,80 @@
+import json
+import os
+from dataclasses import asdict
+from typing import Iterable, Optional
+from models import Customer, Driver, Order
+from constants.enums import OrderStatus, DriverStatus
+from constants.config import DATA_DIR, CUSTOMERS_FILE, DRIVERS_FILE, ORDERS_FILE
+from utils.logger import logger
+
+class DateTimeEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, (OrderStatus, DriverStatus)):
+            return obj.value
+        return super().default(obj)
+
+
+class JsonSnapshotStore:
+    """
+    Persists customers, drivers and orders as one JSON file each under DATA_DIR and loads them
+    back into repositories. Used for the in-memory backend; SQLite is durable on its own.
+    """
+    def __init__(self, data_dir: str = DATA_DIR, customers_file: str = CUSTOMERS_FILE,
+                 drivers_file: str = DRIVERS_FILE, orders_file: str = ORDERS_FILE):
+        self.data_dir = data_dir
+        self.customers_file = customers_file
+        self.drivers_file = drivers_file
+        self.orders_file = orders_file
+
+    def save(self, customers: Iterable[Customer], drivers: Optional[Iterable[Driver]], orders: Iterable[Order]):
+        """Rewrites the files; drivers=None leaves the drivers file alone (they live in another store)."""
+        try:
+            if not os.path.exists(self.data_dir):
+                os.makedirs(self.data_dir)
+
+            for path, entities in ((self.customers_file, customers), (self.drivers_file, drivers),
+                                   (self.orders_file, orders)):
+                if entities is None:
+                    continue
+                with open(path, 'w') as f:
+                    json.dump({e.id: asdict(e) for e in entities}, f, cls=DateTimeEncoder, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving data: {e}")
+
+    def load_into(self, customer_repo, driver_repo, order_repo) -> int:
+        """Saves every stored entity into the given repositories; returns how many were loaded."""
+        if not os.path.exists(self.data_dir):
+            return 0
+
+        loaded = 0
+        try:
+            for v in self._read(self.customers_file):
+                customer_repo.save(Customer(**v))
+                loaded += 1
+
+            for v in (self._read(self.drivers_file) if driver_repo is not None else ()):
+                if 'status' in v:
+                    v['status'] = DriverStatus(v['status'])
+                # Files written before drivers had a capacity carry a single current_order_id
+                legacy_order_id = v.pop('current_order_id', None)
+                if legacy_order_id and 'active_order_ids' not in v:
+                    v['active_order_ids'] = [legacy_order_id]
+                driver_repo.save(Driver(**v))
+                loaded += 1
+
+            # Oldest first, so per-customer and per-driver history lists are rebuilt in creation order
+            for v in sorted(self._read(self.orders_file), key=lambda v: (v.get('created_at', 0), v['id'])):
+                if 'status' in v:
+                    v['status'] = OrderStatus(v['status'])
+                order_repo.save(Order(**v))
+                loaded += 1
+        except Exception as e:
+            logger.error(f"Error loading data: {e}")
+        return loaded
+
+    @staticmethod
+    def _read(path: str):
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return list(json.load(f).values())
@@ -0,0 +1,215 @@
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+from models import Driver
+from constants.enums import DriverStatus
+from constants.config import DRIVER_STORE_MAX_ACTIVE_ORDERS
+from utils.logger import logger
+
+MAGIC = b"DRVSTOR1"
+_HEADER = struct.Struct("<8sII") # magic | copy size | slots
+_HEADER_SIZE = 64
+_ID_BYTES, _NAME_BYTES, _VEHICLE_BYTES, _ORDER_ID_BYTES = 32, 64, 24, 16
+_STATUS_CODES = {DriverStatus.AVAILABLE: 0, DriverStatus.BUSY: 1}
+_STATUSES = {code: status for status, code in _STATUS_CODES.items()}
+_INITIAL_SLOTS = 64
+
+
+def _copy_struct(max_orders: int) -> struct.Struct:
+    # crc u32 | seq u64 | used u8 | status u8 | capacity u16 | order count u8 | total_rating f64 |
+    # ratings_count u32 | version u64 | id | name | vehicle_type | active order ids
+    return struct.Struct(f"<IQBBHBdIQ{_ID_BYTES}s{_NAME_BYTES}s{_VEHICLE_BYTES}s{max_orders * _ORDER_ID_BYTES}s")
+
+
+def _field(value: str, width: int, what: str) -> bytes:
+    data = value.encode()
+    if len(data) > width:
+        raise ValueError(f"{what} '{value}' does not fit the driver store ({width} bytes).")
+    return data
+
+
+class MmapDriverStore:
+    """
+    Driver state in a file of fixed-width records accessed through mmap. Each driver owns a slot of
+    two record copies; a write packs the new state into the older copy with a higher sequence number
+    and a CRC, so a status flip or rating update touches one record in place and never rewrites
+    the file. After a crash a torn copy fails its CRC and the other copy (the previous state) is used.
+
+    The file is opened on first use. flush() forces written pages to disk (msync); without it the
+    data survives a process crash but not necessarily a power loss.
+    """
+    def __init__(self, path: str, max_active_orders: int = DRIVER_STORE_MAX_ACTIVE_ORDERS):
+        self.path = path
+        self.max_active_orders = max_active_orders
+        self.lock = threading.Lock()
+        self._copy = _copy_struct(max_active_orders)
+        self._slot_size = 2 * self._copy.size
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._slots = 0
+        self._slot_of: Dict[str, int] = {}
+        self._seqs: List[List[int]] = [] # Per slot: sequence number of each copy (0 = empty or invalid)
+        self._free: List[int] = []
+        self.recovered = 0 # Slots whose newest copy was torn and that fell back to the previous one
+
+    # --- File management ---
+    def _ensure_open(self) -> Dict[str, Driver]:
+        # Caller holds self.lock; returns the drivers found when the file is opened (empty afterwards)
+        if self._map is not None:
+            return {}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) >= _HEADER_SIZE
+        self._file = open(self.path, "r+b" if exists else "w+b")
+        if not exists:
+            self._file.truncate(_HEADER_SIZE + _INITIAL_SLOTS * self._slot_size)
+            self._file.write(_HEADER.pack(MAGIC, self._copy.size, _INITIAL_SLOTS))
+            self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, copy_size, slots = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or copy_size != self._copy.size:
+            self._close()
+            raise ValueError(f"{self.path} is not a driver store with this record layout.")
+        self._slots = slots
+        return self._recover()
+
+    def _recover(self) -> Dict[str, Driver]:
+        drivers: Dict[str, Driver] = {}
+        self._slot_of.clear()
+        self._seqs = []
+        self._free = []
+        for slot in range(self._slots):
+            copies = [self._read_copy(slot, i) for i in (0, 1)]
+            self._seqs.append([seq for seq, _, _ in copies])
+            valid = [(seq, driver) for seq, driver, ok in copies if ok and driver is not None]
+            torn = [seq for seq, _, ok in copies if not ok]
+            if not valid:
+                if torn:
+                    logger.warning(f"[DriverStore] Slot {slot} has no intact copy; dropped")
+                self._free.append(slot)
+                continue
+            seq, driver = max(valid, key=lambda v: v[0])
+            if torn:
+                self.recovered += 1
+            if driver.id in self._slot_of: # Duplicate from a crash between remove and reuse: keep the newest
+                other = self._slot_of[driver.id]
+                if max(self._seqs[other]) >= seq:
+                    self._clear_slot(slot)
+                    continue
+                self._clear_slot(other)
+            self._slot_of[driver.id] = slot
+            drivers[driver.id] = driver
+        self._free.reverse() # Lowest slots handed out first
+        return drivers
+
+    def _read_copy(self, slot: int, copy: int) -> Tuple[int, Optional[Driver], bool]:
+        offset = _HEADER_SIZE + slot * self._slot_size + copy * self._copy.size
+        raw = self._map[offset:offset + self._copy.size]
+        if not any(raw):
+            return 0, None, True # Never written
+        fields = self._copy.unpack(raw)
+        crc, seq, used = fields[0], fields[1], fields[2]
+        if crc != zlib.crc32(raw[4:]):
+            return 0, None, False
+        if not used:
+            return seq, None, True
+        _, _, _, status, capacity, order_count, total_rating, ratings_count, version, id_, name, vehicle, orders = fields
+        active = [orders[i * _ORDER_ID_BYTES:(i + 1) * _ORDER_ID_BYTES].rstrip(b"\0").decode()
+                  for i in range(order_count)]
+        driver = Driver(id=id_.rstrip(b"\0").decode(), name=name.rstrip(b"\0").decode(), status=_STATUSES[status],
+                        vehicle_type=vehicle.rstrip(b"\0").decode(), capacity=capacity, active_order_ids=active,
+                        total_rating=total_rating, ratings_count=ratings_count, version=version)
+        return seq, driver, True
+
+    def _grow(self):
+        slots = self._slots * 2
+        self._map.close()
+        self._file.truncate(_HEADER_SIZE + slots * self._slot_size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        _HEADER.pack_into(self._map, 0, MAGIC, self._copy.size, slots)
+        self._seqs.extend([0, 0] for _ in range(self._slots, slots))
+        self._free.extend(range(slots - 1, self._slots - 1, -1))
+        self._slots = slots
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = None
+
+    # --- Records ---
+    def _write_copy(self, slot: int, payload: tuple):
+        # Caller holds self.lock. Overwrites the older copy, so the newer one stays intact if this write tears
+        seqs = self._seqs[slot]
+        copy = 0 if seqs[0] <= seqs[1] else 1
+        seq = max(seqs) + 1
+        body = self._copy.pack(0, seq, *payload)[4:]
+        offset = _HEADER_SIZE + slot * self._slot_size + copy * self._copy.size
+        self._map[offset:offset + self._copy.size] = struct.pack("<I", zlib.crc32(body)) + body
+        seqs[copy] = seq
+
+    def _clear_slot(self, slot: int):
+        start = _HEADER_SIZE + slot * self._slot_size
+        self._map[start:start + self._slot_size] = bytes(self._slot_size)
+        self._seqs[slot] = [0, 0]
+        self._free.append(slot)
+
+    def load(self) -> Dict[str, Driver]:
+        """Opens the file (recovering torn records) and returns every stored driver by id."""
+        with self.lock:
+            if self._map is not None:
+                self._close()
+            return self._ensure_open()
+
+    def put(self, driver: Driver):
+        if max(driver.capacity, len(driver.active_order_ids)) > self.max_active_orders:
+            raise ValueError(f"Driver {driver.id} capacity exceeds the {self.max_active_orders} orders a record holds.")
+        payload = (1, _STATUS_CODES[driver.status], driver.capacity, len(driver.active_order_ids),
+                   driver.total_rating, driver.ratings_count, driver.version,
+                   _field(driver.id, _ID_BYTES, "Driver id"), _field(driver.name, _NAME_BYTES, "Driver name"),
+                   _field(driver.vehicle_type, _VEHICLE_BYTES, "Vehicle type"),
+                   b"".join(_field(o, _ORDER_ID_BYTES, "Order id").ljust(_ORDER_ID_BYTES, b"\0")
+                            for o in driver.active_order_ids))
+        with self.lock:
+            self._ensure_open()
+            slot = self._slot_of.get(driver.id)
+            if slot is None:
+                if not self._free:
+                    self._grow()
+                slot = self._free.pop()
+                self._slot_of[driver.id] = slot
+            self._write_copy(slot, payload)
+
+    def remove(self, driver_id: str):
+        with self.lock:
+            self._ensure_open()
+            slot = self._slot_of.pop(driver_id, None)
+            if slot is not None:
+                self._clear_slot(slot)
+
+    def clear(self):
+        with self.lock:
+            self._ensure_open()
+            for slot in self._slot_of.values():
+                self._clear_slot(slot)
+            self._slot_of.clear()
+            self._free = sorted(set(self._free), reverse=True)
+
+    def flush(self):
+        with self.lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+    def __len__(self) -> int:
+        with self.lock:
+            self._ensure_open()
+            return len(self._slot_of)
@@ -0,0 +1,72 @@
+import copy
+from typing import Any, Callable, Dict, Optional, TypeVar
+from constants.config import OPTIMISTIC_MAX_RETRIES
+from utils.instrumented_lock import make_lock
+
+T = TypeVar("T")
+
+
+class ConflictError(ValueError):
+    """Raised when an optimistic update keeps losing the race after every retry."""
+
+
+class ConcurrencyStats:
+    """Per-operation counters for optimistic updates, exposed for tuning retry limits and hot spots."""
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(ConcurrencyStats, cls).__new__(cls)
+            cls._instance.lock = make_lock("ConcurrencyStats.lock")
+            cls._instance.counters: Dict[str, Dict[str, int]] = {}
+        return cls._instance
+
+    def record(self, operation: str, attempts: int, succeeded: bool):
+        with self.lock:
+            c = self.counters.setdefault(operation, {"updates": 0, "conflicts": 0, "retries_exhausted": 0})
+            c["conflicts"] += attempts - 1 if succeeded else attempts
+            if succeeded:
+                c["updates"] += 1
+            else:
+                c["retries_exhausted"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            return {op: dict(c) for op, c in self.counters.items()}
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+
+
+def _clone(entity: T) -> T:
+    # Shallow copy plus fresh lists, so the mutation never touches the instance other readers hold
+    clone = copy.copy(entity)
+    for name, value in vars(clone).items():
+        if isinstance(value, list):
+            setattr(clone, name, list(value))
+    return clone
+
+
+def update_with_retry(repo, entity_id: str, mutate: Callable[[Any], Optional[bool]], operation: str,
+                      max_retries: int = OPTIMISTIC_MAX_RETRIES):
+    """
+    Optimistic read-modify-write: read without locking, apply `mutate` to a private copy and
+    compare_and_set it against the version that was read, retrying on conflict.
+    `mutate` may raise (e.g. ValueError for an invalid transition) to abort, or return False to skip
+    the write when nothing changes. Returns the stored entity, or None if it does not exist.
+    """
+    stats = ConcurrencyStats()
+    for attempt in range(1, max_retries + 1):
+        current = repo.get_by_id(entity_id)
+        if current is None:
+            return None
+        expected_version = current.version
+        updated = _clone(current)
+        if mutate(updated) is False:
+            return current
+        if repo.compare_and_set(updated, expected_version):
+            stats.record(operation, attempt, succeeded=True)
+            return repo.get_by_id(entity_id)
+    stats.record(operation, max_retries, succeeded=False)
+    raise ConflictError(f"{operation} on {entity_id} lost {max_retries} concurrent update races")
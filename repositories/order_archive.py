@@ -0,0 +1,175 @@
+import mmap
+import os
+import struct
+import threading
+from typing import Iterable, Iterator, List, Optional
+from models import Order
+from models import codec
+from utils.logger import logger
+from .archive_migration import read_json_segment
+
+# Segment layout (all integers little-endian):
+#   header  MAGIC | count u32 | id_width u16 | reserved u16
+#   index   count x (id, NUL-padded to id_width | offset u64 | length u32), sorted by id
+#   data    one encoded order per index entry (models.codec records)
+MAGIC = b"ORDSEG02"
+_HEADER = struct.Struct("<8sIHH")
+_ENTRY_TAIL = struct.Struct("<QI")
+_SUFFIX = ".seg"
+
+
+def _encode_segment(orders: Iterable[Order]) -> Optional[bytes]:
+    records = sorted(((o.id.encode(), codec.encode(o)) for o in orders), key=lambda r: r[0])
+    if not records:
+        return None
+    id_width = max(len(key) for key, _ in records)
+    stride = id_width + _ENTRY_TAIL.size
+    offset = _HEADER.size + len(records) * stride
+    out = bytearray(_HEADER.pack(MAGIC, len(records), id_width, 0))
+    for key, data in records:
+        out += key.ljust(id_width, b"\0") + _ENTRY_TAIL.pack(offset, len(data))
+        offset += len(data)
+    for _, data in records:
+        out += data
+    return bytes(out)
+
+
+def _write_file(path: str, data: bytes):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path) # Readers never see a partial segment
+
+
+class Segment:
+    """One immutable segment file, memory-mapped; lookups binary-search the fixed-width id index."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size or self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not an order segment.")
+        _, self.count, self.id_width, _ = _HEADER.unpack_from(self._map, 0)
+        self._stride = self.id_width + _ENTRY_TAIL.size
+
+    def _key(self, i: int) -> bytes:
+        start = _HEADER.size + i * self._stride
+        return self._map[start:start + self.id_width]
+
+    def get(self, order_id: str) -> Optional[Order]:
+        key = order_id.encode()
+        if len(key) > self.id_width:
+            return None
+        key = key.ljust(self.id_width, b"\0")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.count or self._key(lo) != key:
+            return None
+        offset, length = _ENTRY_TAIL.unpack_from(self._map, _HEADER.size + lo * self._stride + self.id_width)
+        return codec.decode(self._map[offset:offset + length])
+
+    def __iter__(self) -> Iterator[Order]:
+        for i in range(self.count):
+            offset, length = _ENTRY_TAIL.unpack_from(self._map, _HEADER.size + i * self._stride + self.id_width)
+            yield codec.decode(self._map[offset:offset + length])
+
+    def heads(self) -> Iterator[codec.OrderHead]:
+        """Every record's head (ids, customer, driver, item, status), in index order; no full decode."""
+        for i in range(self.count):
+            offset, length = _ENTRY_TAIL.unpack_from(self._map, _HEADER.size + i * self._stride + self.id_width)
+            yield codec.decode_order_head(self._map[offset:offset + length])
+
+    def close(self):
+        self._map.close()
+
+
+class OrderArchive:
+    """
+    Cold orders on disk: a directory of immutable segment files, each written once (to a temp file,
+    fsynced, then renamed into place) and read back through mmap. Lookups try the newest segment
+    first, so an order archived again after a later change shadows its older copy.
+    Nothing touches the disk until the first write or lookup. Segments from before the codec are
+    rewritten in the current format on first open; files that cannot be read are logged and skipped.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self._segments: Optional[List[Segment]] = None # Oldest first; opened lazily
+        self._next_sequence = 1
+
+    def _open(self) -> List[Segment]:
+        with self.lock:
+            if self._segments is None:
+                names = sorted(n for n in os.listdir(self.directory) if n.endswith(_SUFFIX)) \
+                    if os.path.isdir(self.directory) else []
+                # Numbered after every file on disk, skipped ones included, so none is ever overwritten
+                self._next_sequence = int(names[-1][:-len(_SUFFIX)]) + 1 if names else 1
+                opened = (self._open_segment(os.path.join(self.directory, n)) for n in names)
+                self._segments = [segment for segment in opened if segment is not None]
+            return self._segments
+
+    def _open_segment(self, path: str) -> Optional[Segment]:
+        # Caller holds self.lock. A segment from before the codec is rewritten in place, once; any other
+        # unreadable file is logged and left out, so it cannot fail every lookup that reaches the archive
+        try:
+            return Segment(path)
+        except ValueError:
+            pass
+        try:
+            orders = read_json_segment(path)
+        except (ValueError, TypeError, struct.error):
+            orders = None
+        if orders is None:
+            logger.error(f"[Archive] Skipping unreadable segment {path}.")
+            return None
+        _write_file(path, _encode_segment(orders))
+        logger.info(f"[Archive] Rewrote {path} ({len(orders)} orders) in the binary format.")
+        return Segment(path)
+
+    def write_segment(self, orders: Iterable[Order]) -> Optional[str]:
+        """Writes `orders` as a new segment; returns its path (None if there was nothing to write)."""
+        data = _encode_segment(orders)
+        if data is None:
+            return None
+        segments = self._open()
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            path = os.path.join(self.directory, f"{self._next_sequence:08d}{_SUFFIX}")
+            self._next_sequence += 1
+            _write_file(path, data)
+            segments.append(Segment(path))
+        return path
+
+    def get(self, order_id: str) -> Optional[Order]:
+        for segment in reversed(self._open()):
+            order = segment.get(order_id)
+            if order is not None:
+                return order
+        return None
+
+    def __iter__(self) -> Iterator[Order]:
+        """Every archived copy, oldest segment first (an order archived twice appears twice)."""
+        for segment in list(self._open()):
+            yield from segment
+
+    def heads(self) -> Iterator[codec.OrderHead]:
+        """Heads of every archived copy, newest segment first (the latest copy of an order comes first)."""
+        for segment in reversed(list(self._open())):
+            yield from segment.heads()
+
+    def segment_count(self) -> int:
+        return len(self._open())
+
+    def close(self):
+        with self.lock:
+            for segment in self._segments or ():
+                segment.close()
+            self._segments = None
@@ -1,24 +1,230 @@
-import threading
-from typing import Optional, List, Dict
+from typing import Iterator, Optional, List, Dict
 from models import Order
+from models.codec import OrderHead
+from constants.enums import OrderStatus
+from constants.config import ORDER_ARCHIVE_DIR, ORDER_RETENTION_SECONDS, ORDER_ARCHIVE_BATCH_SIZE
+from utils import clock
+from .optimistic import _clone
+from .snapshot import RepositorySnapshot
+from .pagination import Page, encode_cursor, decode_cursor
+from .order_archive import OrderArchive
+from utils.tracing import traced
+from utils.instrumented_lock import make_lock
+
+_TERMINAL = (OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+
 
 class InMemoryOrderRepository:
+    """
+    Resident orders plus a disk tier: spill() moves terminal orders older than ORDER_RETENTION_SECONDS
+    into immutable archive segments, and get_by_id falls back to the archive on a miss. get_all and
+    snapshot() cover resident orders only; history pages and get_by_id also reach archived ones.
+    """
     _instance = None
     
     def __new__(cls):
         if not cls._instance:
             cls._instance = super(InMemoryOrderRepository, cls).__new__(cls)
-            cls._instance.lock = threading.RLock()
+            cls._instance.lock = make_lock("OrderRepository.lock", reentrant=True)
             cls._instance.orders = {} # Dict[str, Order]
+            cls._instance._snapshot = RepositorySnapshot() # Frozen copies, replaced (never mutated) on write
+            # History: append-only order ids per customer (in creation order) and per driver (in assignment order)
+            cls._instance._by_customer: Dict[str, List[str]] = {}
+            cls._instance._by_driver: Dict[str, List[str]] = {}
+            cls._instance._history_driver: Dict[str, str] = {} # order id -> driver it was last indexed under
+            # Archived (non-resident) order id -> driver it is listed under (None: customer history only)
+            cls._instance._archived_history: Dict[str, Optional[str]] = {}
+            # Retention: terminal order id -> when it became terminal, oldest first (insertion order;
+            # re-sorted before the next spill if orders loaded at startup arrive out of order)
+            cls._instance._terminal_since: Dict[str, float] = {}
+            cls._instance._terminal_in_order = True
+            cls._instance._spill_lock = make_lock("OrderRepository.spill_lock")
+            cls._instance.archive = OrderArchive(ORDER_ARCHIVE_DIR)
         return cls._instance
 
+    @traced("OrderRepository.save")
     def save(self, order: Order):
         with self.lock:
+            order.version += 1
+            is_new = order.id not in self.orders and not self._listed_as_archived(order.id)
             self.orders[order.id] = order
+            self._publish(order)
+            self._index_history(order, is_new)
+            self._track_terminal(order)
 
-    def get_by_id(self, order_id: str) -> Optional[Order]:
+    @traced("OrderRepository.compare_and_set")
+    def compare_and_set(self, order: Order, expected_version: int) -> bool:
+        """
+        Stores `order` only if the stored version is still `expected_version`.
+        The stored instance is updated in place so references already handed out stay current.
+        """
+        with self.lock:
+            current = self.orders.get(order.id)
+            if current is None:
+                return self._restore_archived(order, expected_version)
+            if current.version != expected_version:
+                return False
+            order.version = expected_version + 1
+            if current is not order:
+                vars(current).update(vars(order))
+            self._publish(current)
+            self._index_history(current, False)
+            self._track_terminal(current)
+            return True
+
+    def _restore_archived(self, order: Order, expected_version: int) -> bool:
+        # Caller holds self.lock. An update to an archived order (e.g. a late rating) makes it resident
+        # again; the stale archived copy is shadowed until the order is spilled into a newer segment
+        archived = self.archive.get(order.id)
+        if archived is None or archived.version != expected_version:
+            return False
+        order.version = expected_version + 1
+        self.orders[order.id] = order
+        self._publish(order)
+        self._listed_as_archived(order.id)
+        self._index_history(order, False)
+        self._track_terminal(order)
+        return True
+
+    def _listed_as_archived(self, order_id: str) -> bool:
+        # Caller holds self.lock. An archived order becoming resident is already in the history lists
+        # (e.g. at startup the archive is replayed before the snapshot loads the same order again)
+        if order_id not in self._archived_history:
+            return False
+        driver_id = self._archived_history.pop(order_id)
+        if driver_id:
+            self._history_driver[order_id] = driver_id
+        return True
+
+    def _track_terminal(self, order: Order):
+        # Caller holds self.lock. Retention runs from the order's own terminal timestamp, so orders
+        # loaded after a restart keep their age; the clock is only a fallback for records without one
+        if order.status in _TERMINAL and order.id not in self._terminal_since:
+            since = order.delivered_at if order.status == OrderStatus.DELIVERED else order.cancelled_at
+            since = clock.now() if since is None else since
+            if self._terminal_since and since < next(reversed(self._terminal_since.values())):
+                self._terminal_in_order = False
+            self._terminal_since[order.id] = since
+
+    def spill(self, now: Optional[float] = None, force: bool = False) -> int:
+        """
+        Archives terminal orders that have been terminal for ORDER_RETENTION_SECONDS, once at least
+        ORDER_ARCHIVE_BATCH_SIZE are due (or any are due with force=True); returns how many left memory.
+        The segment is written outside the repository lock: an order changed meanwhile stays resident.
+        """
+        cutoff = (clock.now() if now is None else now) - ORDER_RETENTION_SECONDS
+        with self._spill_lock:
+            with self.lock:
+                if not self._terminal_in_order:
+                    self._terminal_since = dict(sorted(self._terminal_since.items(), key=lambda item: item[1]))
+                    self._terminal_in_order = True
+                due = []
+                for order_id, since in self._terminal_since.items():
+                    if since > cutoff:
+                        break
+                    due.append(_clone(self.orders[order_id]))
+                if not due or (len(due) < ORDER_ARCHIVE_BATCH_SIZE and not force):
+                    return 0
+            self.archive.write_segment(due)
+            spilled = 0
+            with self.lock:
+                for archived in due:
+                    current = self.orders.get(archived.id)
+                    if current is None or current.version != archived.version:
+                        continue
+                    del self.orders[archived.id]
+                    del self._terminal_since[archived.id]
+                    self._archived_history[archived.id] = self._history_driver.pop(archived.id, None)
+                    self._snapshot = self._snapshot.without_entity(archived.id)
+                    spilled += 1
+            return spilled
+
+    def load_archive(self) -> int:
+        """
+        Rebuilds the history lists for archived orders (startup, before resident orders load).
+        Only record heads are read; orders stay on disk and are decoded when a lookup reaches them.
+        """
+        heads = {}
+        for head in self.archive.heads(): # Newest copy first: it carries the order's last driver
+            if head.id not in heads:
+                heads[head.id] = (head.created_at, head.id, head.customer_id, head.driver_id)
+        listed = 0
+        with self.lock:
+            for _, order_id, customer_id, driver_id in sorted(heads.values()):
+                if order_id in self.orders:
+                    continue
+                listed += 1
+                self._archived_history[order_id] = driver_id
+                self._by_customer.setdefault(customer_id, []).append(order_id)
+                if driver_id:
+                    self._by_driver.setdefault(driver_id, []).append(order_id)
+        return listed
+
+    def archived_heads(self) -> Iterator[OrderHead]:
+        """Record heads of the archived orders that are not resident, one per order (latest copy)."""
+        seen = set()
+        for head in self.archive.heads():
+            if head.id not in seen and head.id in self._archived_history:
+                seen.add(head.id)
+                yield head
+
+    def archived_orders(self) -> Iterator[Order]:
+        """The archived orders that are not resident, latest copy of each, decoded one at a time."""
         with self.lock:
-            return self.orders.get(order_id)
+            order_ids = list(self._archived_history)
+        for order_id in order_ids:
+            order = self.archive.get(order_id)
+            if order is not None:
+                yield order
+
+    def _publish(self, order: Order):
+        # Copy-on-write under the writer lock: snapshots already handed out keep their old map
+        self._snapshot = self._snapshot.with_entity(_clone(order))
+
+    def _index_history(self, order: Order, is_new: bool):
+        # Caller holds self.lock. Lists only grow, so cursor positions stay valid
+        if is_new:
+            self._by_customer.setdefault(order.customer_id, []).append(order.id)
+        if order.driver_id and self._history_driver.get(order.id) != order.driver_id:
+            self._history_driver[order.id] = order.driver_id
+            self._by_driver.setdefault(order.driver_id, []).append(order.id)
+
+    def get_customer_history(self, customer_id: str, limit: int, cursor: Optional[str] = None) -> Page:
+        """Customer's orders, newest first, `limit` per page."""
+        return self._page(self._by_customer.get(customer_id, []), limit, cursor)
+
+    def get_driver_history(self, driver_id: str, limit: int, cursor: Optional[str] = None) -> Page:
+        """Orders assigned to the driver, most recently assigned first, `limit` per page."""
+        return self._page(self._by_driver.get(driver_id, []), limit, cursor,
+                          lambda order: order.driver_id == driver_id)
+
+    def _page(self, ids: List[str], limit: int, cursor: Optional[str], keep=None) -> Page:
+        # Lock-free: appends never move existing entries, so walking back from a position is safe.
+        # Costs O(limit) plus any entries skipped because the order has moved to another driver
+        position = len(ids)
+        if cursor is not None:
+            parts = decode_cursor(cursor)
+            if len(parts) != 1 or not isinstance(parts[0], int) or not 0 <= parts[0] <= len(ids):
+                raise ValueError(f"Invalid cursor {cursor!r}.")
+            position = parts[0]
+        items = []
+        while position > 0 and len(items) < limit:
+            position -= 1
+            order = self.get_by_id(ids[position])
+            if order is not None and (keep is None or keep(order)):
+                items.append(order)
+        return Page(items, encode_cursor(position) if position > 0 else None)
+
+    def snapshot(self) -> RepositorySnapshot:
+        """O(1) immutable point-in-time view; iterating it never takes the writer lock."""
+        return self._snapshot
+
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        # Lock-free: a single dict lookup is atomic, writers swap whole entries or go through compare_and_set
+        order = self.orders.get(order_id)
+        if order is None:
+            return self.archive.get(order_id) # Cold tier: a fresh copy decoded from the mapped segment
+        return order
 
     def get_all(self) -> List[Order]:
         with self.lock:
@@ -27,3 +233,10 @@ class InMemoryOrderRepository:
     def clear(self):
         with self.lock:
             self.orders.clear()
+            self._by_customer.clear()
+            self._by_driver.clear()
+            self._history_driver.clear()
+            self._archived_history.clear()
+            self._terminal_since.clear() # Archived segments stay on disk
+            self._terminal_in_order = True
+            self._snapshot = RepositorySnapshot(version=self._snapshot.version + 1)
@@ -0,0 +1,23 @@
+import base64
+import json
+from typing import Any, List, NamedTuple, Optional
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str] # Pass back to get the following page; None on the last page
+
+
+def encode_cursor(*parts) -> str:
+    """Opaque cursor: callers must not depend on what a repository puts inside."""
+    return base64.urlsafe_b64encode(json.dumps(parts, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        parts = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor {cursor!r}.")
+    if not isinstance(parts, list):
+        raise ValueError(f"Invalid cursor {cursor!r}.")
+    return parts
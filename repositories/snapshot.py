@@ -0,0 +1,44 @@
+from typing import Any, Iterator, Mapping, Optional
+from utils.persistent_map import PersistentMap
+
+
+class RepositorySnapshot:
+    """
+    Immutable point-in-time view of a repository, keyed by entity id.
+    Entities are frozen copies taken at write time: treat them as read-only.
+    `version` counts the repository writes included, so two snapshots can be ordered.
+    """
+    __slots__ = ("_entities", "version")
+
+    def __init__(self, entities: Optional[Mapping[str, Any]] = None, version: int = 0):
+        self._entities = entities if entities is not None else PersistentMap()
+        self.version = version
+
+    def with_entity(self, entity) -> "RepositorySnapshot":
+        """New snapshot with `entity` stored under its id; this one is left untouched."""
+        return RepositorySnapshot(self._entities.set(entity.id, entity), self.version + 1)
+
+    def without_entity(self, entity_id: str) -> "RepositorySnapshot":
+        """New snapshot without `entity_id`; this one is left untouched."""
+        return RepositorySnapshot(self._entities.remove(entity_id), self.version + 1)
+
+    def get(self, entity_id: str, default: Any = None) -> Any:
+        return self._entities.get(entity_id, default)
+
+    def __getitem__(self, entity_id: str) -> Any:
+        return self._entities[entity_id]
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._entities
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entities)
+
+    def values(self) -> Iterator[Any]:
+        return iter(self._entities.values())
+
+    def items(self) -> Iterator:
+        return iter(self._entities.items())
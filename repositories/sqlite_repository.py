@@ -0,0 +1,312 @@
+import functools
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional, List, Iterable, Dict, Any, Mapping
+from models import Customer, Driver, Order
+from constants.enums import OrderStatus, DriverStatus
+from .snapshot import RepositorySnapshot
+from .driver_score_index import DriverScoreIndex
+from .pagination import Page, encode_cursor, decode_cursor
+from utils.tracing import span, get_tracer
+from utils.instrumented_lock import make_lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS drivers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    vehicle_type TEXT NOT NULL,
+    capacity INTEGER NOT NULL DEFAULT 1,
+    active_order_ids TEXT NOT NULL DEFAULT '[]',
+    remaining_capacity INTEGER NOT NULL DEFAULT 1,
+    total_rating REAL NOT NULL DEFAULT 0,
+    ratings_count INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_drivers_status ON drivers(status, remaining_capacity);
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    driver_id TEXT,
+    created_at REAL NOT NULL,
+    assigned_at REAL,
+    picked_up_at REAL,
+    delivered_at REAL,
+    cancelled_at REAL,
+    rating INTEGER,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+-- History pages are keyset scans on (owner, created_at, id); these also serve plain owner lookups
+DROP INDEX IF EXISTS idx_orders_driver;
+DROP INDEX IF EXISTS idx_orders_customer;
+CREATE INDEX IF NOT EXISTS idx_orders_driver_created ON orders(driver_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_orders_customer_created ON orders(customer_id, created_at, id);
+"""
+
+
+class SqliteConnectionPool:
+    """
+    One connection per thread (sqlite3 connections must not be shared across threads).
+    Every connection runs in WAL mode so readers never block the single writer.
+    """
+    def __init__(self, db_path: str):
+        if db_path == ":memory:":
+            raise ValueError("SQLite backend needs a file path; ':memory:' is private to each connection.")
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._schema_ready = False # Created on first connection: constructing a pool touches no disk
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        with self._lock:
+            if not self._schema_ready:
+                conn.executescript(SCHEMA)
+                # Columns added after a database may have been created (CREATE TABLE IF NOT EXISTS skips them)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(orders)")}
+                if "cancelled_at" not in columns:
+                    conn.execute("ALTER TABLE orders ADD COLUMN cancelled_at REAL")
+                self._schema_ready = True
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            # isolation_level=None -> autocommit; multi-row writes open explicit transactions.
+            # cached_statements keeps our fixed SQL strings prepared for the connection's lifetime.
+            conn = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=256, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                self._ensure_schema(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass # Closed from another thread already
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def _traced(operation: str) -> Callable:
+    """utils.tracing.traced with the table in the span name; disabled tracing costs one attribute check."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if not get_tracer().enabled:
+                return fn(self, *args, **kwargs)
+            with span(f"Sqlite.{self.table}.{operation}"):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _SqliteRepository:
+    table: str = ""
+    columns: tuple = ()
+    versioned = False # Entities carry a `version` column used for compare-and-set
+
+    def __init__(self, pool: SqliteConnectionPool):
+        self.pool = pool
+        # Guards read-modify-write sequences in this process (e.g. OrderService.transition_state)
+        self.lock = make_lock(f"Sqlite.{self.table}.lock", reentrant=True)
+        cols = ", ".join(self.columns)
+        params = ", ".join("?" for _ in self.columns)
+        updates = ", ".join(f"{c}=excluded.{c}" for c in self.columns if c != "id")
+        self._upsert_sql = f"INSERT INTO {self.table} ({cols}) VALUES ({params}) ON CONFLICT(id) DO UPDATE SET {updates}"
+        self._select_sql = f"SELECT {cols} FROM {self.table}"
+        self._get_sql = f"{self._select_sql} WHERE id = ?"
+        assignments = ", ".join(f"{c} = ?" for c in self.columns if c != "id")
+        self._cas_sql = f"UPDATE {self.table} SET {assignments} WHERE id = ? AND version = ?"
+
+    def _to_row(self, entity) -> tuple:
+        return tuple(getattr(entity, c) for c in self.columns)
+
+    def _from_row(self, row: tuple):
+        raise NotImplementedError
+
+    @_traced("save")
+    def save(self, entity):
+        if self.versioned:
+            entity.version += 1
+        self.pool.connection().execute(self._upsert_sql, self._to_row(entity))
+
+    def save_all(self, entities: Iterable):
+        conn = self.pool.connection()
+        entities = list(entities)
+        if self.versioned:
+            for e in entities:
+                e.version += 1
+        rows = [self._to_row(e) for e in entities]
+        with conn: # BEGIN ... COMMIT, rolled back on error
+            conn.execute("BEGIN")
+            conn.executemany(self._upsert_sql, rows)
+
+    @_traced("compare_and_set")
+    def compare_and_set(self, entity, expected_version: int) -> bool:
+        """Single conditional UPDATE; succeeds only if the row still has expected_version."""
+        entity.version = expected_version + 1
+        row = self._to_row(entity)
+        id_index = self.columns.index("id")
+        values = row[:id_index] + row[id_index + 1:] + (entity.id, expected_version)
+        if self.pool.connection().execute(self._cas_sql, values).rowcount == 1:
+            return True
+        entity.version = expected_version
+        return False
+
+    @_traced("get_by_id")
+    def get_by_id(self, entity_id: str):
+        row = self.pool.connection().execute(self._get_sql, (entity_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    @_traced("get_all")
+    def get_all(self) -> List:
+        return [self._from_row(r) for r in self.pool.connection().execute(self._select_sql)]
+
+    def snapshot(self) -> RepositorySnapshot:
+        """
+        Point-in-time view from a single SELECT: under WAL the read sees one consistent state
+        and never blocks the writer. Unlike the in-memory snapshot this is O(N); version stays 0.
+        """
+        return RepositorySnapshot({e.id: e for e in self.get_all()})
+
+    def clear(self):
+        self.pool.connection().execute(f"DELETE FROM {self.table}")
+
+
+class SqliteCustomerRepository(_SqliteRepository):
+    table = "customers"
+    columns = ("id", "name")
+
+    def _from_row(self, row: tuple) -> Customer:
+        return Customer(*row)
+
+
+class SqliteDriverRepository(_SqliteRepository):
+    table = "drivers"
+    columns = ("id", "name", "status", "vehicle_type", "capacity", "active_order_ids", "remaining_capacity",
+               "total_rating", "ratings_count", "version")
+    versioned = True
+
+    def _to_row(self, driver: Driver) -> tuple:
+        return (driver.id, driver.name, driver.status.value, driver.vehicle_type, driver.capacity,
+                json.dumps(driver.active_order_ids), driver.remaining_capacity,
+                driver.total_rating, driver.ratings_count, driver.version)
+
+    def _from_row(self, row: tuple) -> Driver:
+        values: Dict[str, Any] = dict(zip(self.columns, row))
+        values["status"] = DriverStatus(values["status"])
+        values["active_order_ids"] = json.loads(values["active_order_ids"])
+        del values["remaining_capacity"] # Derived, stored only for the capacity index
+        return Driver(**values)
+
+    def find_available(self, skip: Optional[Callable[[str], bool]] = None) -> Optional[Driver]:
+        """AVAILABLE driver with the most spare capacity (ignoring those `skip` rejects), or None (served by idx_drivers_status)."""
+        sql = f"{self._select_sql} WHERE status = ? AND remaining_capacity > 0 ORDER BY remaining_capacity DESC"
+        if not skip:
+            row = self.pool.connection().execute(f"{sql} LIMIT 1", (DriverStatus.AVAILABLE.value,)).fetchone()
+            return self._from_row(row) if row else None
+        for row in self.pool.connection().execute(sql, (DriverStatus.AVAILABLE.value,)):
+            if not skip(row[0]): # id is the first column
+                return self._from_row(row)
+        return None
+
+    def find_best(self, weights: Mapping[str, float], fit: Optional[Mapping[str, float]] = None,
+                  skip: Optional[Callable[[str], bool]] = None) -> Optional[Driver]:
+        """
+        Highest-scoring AVAILABLE driver. Scores are computed over the available rows on each call
+        (O(available drivers)); idle time is not stored in SQLite, so it does not contribute here.
+        """
+        index = DriverScoreIndex()
+        drivers = {}
+        for driver in self.get_by_status(DriverStatus.AVAILABLE):
+            drivers[driver.id] = driver
+            index.update(driver)
+        driver_id = index.best(weights, fit, skip)
+        return drivers[driver_id] if driver_id else None
+
+    def available_capacity(self) -> int:
+        row = self.pool.connection().execute(
+            "SELECT COALESCE(SUM(remaining_capacity), 0) FROM drivers WHERE status = ?",
+            (DriverStatus.AVAILABLE.value,)).fetchone()
+        return row[0]
+
+    def get_by_status(self, status: DriverStatus) -> List[Driver]:
+        rows = self.pool.connection().execute(f"{self._select_sql} WHERE status = ?", (status.value,))
+        return [self._from_row(r) for r in rows]
+
+
+class SqliteOrderRepository(_SqliteRepository):
+    table = "orders"
+    columns = ("id", "customer_id", "item_id", "quantity", "status", "driver_id",
+               "created_at", "assigned_at", "picked_up_at", "delivered_at", "cancelled_at", "rating", "version")
+    versioned = True
+
+    def _to_row(self, order: Order) -> tuple:
+        return (order.id, order.customer_id, order.item_id, order.quantity, order.status.value,
+                order.driver_id, order.created_at, order.assigned_at, order.picked_up_at,
+                order.delivered_at, order.cancelled_at, order.rating, order.version)
+
+    def _from_row(self, row: tuple) -> Order:
+        values: Dict[str, Any] = dict(zip(self.columns, row))
+        values["status"] = OrderStatus(values["status"])
+        return Order(**values)
+
+    def get_by_status(self, status: OrderStatus) -> List[Order]:
+        rows = self.pool.connection().execute(f"{self._select_sql} WHERE status = ?", (status.value,))
+        return [self._from_row(r) for r in rows]
+
+    def get_by_driver(self, driver_id: str) -> List[Order]:
+        rows = self.pool.connection().execute(f"{self._select_sql} WHERE driver_id = ?", (driver_id,))
+        return [self._from_row(r) for r in rows]
+
+    def get_by_customer(self, customer_id: str) -> List[Order]:
+        rows = self.pool.connection().execute(f"{self._select_sql} WHERE customer_id = ?", (customer_id,))
+        return [self._from_row(r) for r in rows]
+
+    def get_customer_history(self, customer_id: str, limit: int, cursor: Optional[str] = None) -> Page:
+        """Customer's orders, newest first, `limit` per page."""
+        return self._history("customer_id", customer_id, limit, cursor)
+
+    def get_driver_history(self, driver_id: str, limit: int, cursor: Optional[str] = None) -> Page:
+        """Orders assigned to the driver, newest first, `limit` per page."""
+        return self._history("driver_id", driver_id, limit, cursor)
+
+    @_traced("history")
+    def _history(self, column: str, value: str, limit: int, cursor: Optional[str]) -> Page:
+        # Keyset pagination: the cursor is the (created_at, id) of the last row served, so each page
+        # is an index range scan of limit + 1 rows however deep into the history it is
+        sql = f"{self._select_sql} WHERE {column} = ?"
+        params: List[Any] = [value]
+        if cursor is not None:
+            parts = decode_cursor(cursor)
+            if len(parts) != 2:
+                raise ValueError(f"Invalid cursor {cursor!r}.")
+            sql += " AND (created_at, id) < (?, ?)"
+            params.extend(parts)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        orders = [self._from_row(r) for r in self.pool.connection().execute(sql, params)]
+        if len(orders) <= limit:
+            return Page(orders, None)
+        last = orders[limit - 1]
+        return Page(orders[:limit], encode_cursor(last.created_at, last.id))
@@ -1,42 +1,74 @@
 import threading
-import time
+from typing import Optional
 from services.order_service import OrderService
 from services.assignment_service import AssignmentService
 from constants.config import TIMEOUT_MINUTES
 from constants.enums import OrderStatus
 from utils.logger import logger
+from utils import clock
 
 class OrderTimeoutScheduler:
-    def __init__(self, interval_seconds: int = 5):
+    def __init__(self, interval_seconds: int = 5, timeout_seconds: Optional[float] = None):
         self.interval = interval_seconds
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else TIMEOUT_MINUTES * 60
         self.order_service = OrderService()
-        self.assignment_service = AssignmentService()
         self._stop_event = threading.Event()
         self.thread = threading.Thread(target=self._run, daemon=True)
 
+    @property
+    def assignment_service(self) -> AssignmentService:
+        # Resolved per use: a long-lived scheduler must follow resets of the AssignmentService singleton
+        return AssignmentService()
+
+    @property
+    def running(self) -> bool:
+        return self.thread.is_alive()
+
     def start(self):
+        """Starts the thread; after stop() this starts a fresh one."""
+        if self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        if self.thread.ident is not None: # A Thread runs only once
+            self.thread = threading.Thread(target=self._run, daemon=True)
         self.thread.start()
         logger.info("OrderTimeoutScheduler started.")
 
-    def stop(self):
+    def stop(self, timeout: Optional[float] = None):
+        """Signals the thread and, if it was started, waits up to `timeout` for the current sweep to finish."""
         self._stop_event.set()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def check_timeouts(self, now: Optional[float] = None) -> int:
+        """One sweep; returns how many orders were cancelled. Called by the thread or a simulator."""
+        now = now if now is not None else clock.now()
+        cancelled = 0
+        # Point-in-time snapshot: the sweep holds no lock, so order intake is never stalled by it
+        expired = []
+        for order in self.order_service.orders_snapshot().values():
+            # Timeout rule: If CREATED or ASSIGNED for too long -> Cancel
+            # Wait, requirement says "if no pickup within 30 mins -> cancel"
+            # So applicable to CREATED and ASSIGNED.
+            if order.status in [OrderStatus.CREATED, OrderStatus.ASSIGNED]:
+                if now - order.created_at > self.timeout_seconds:
+                    expired.append(order)
+        # Snapshot order follows key hashes; cancel oldest first so sweeps are reproducible
+        expired.sort(key=lambda o: (o.created_at, o.id))
+        for order in expired:
+            logger.info(f"[Scheduler] Auto-cancelling order {order.id} due to timeout.")
+            # Use AssignmentService to cancel so it handles driver freeing/queue removal;
+            # an order picked up since the snapshot is not cancelled and not counted
+            if self.assignment_service.cancel_order(order.id, timed_out=True):
+                cancelled += 1
+        return cancelled
 
     def _run(self):
-        timeout_seconds = TIMEOUT_MINUTES * 60
         while not self._stop_event.is_set():
             try:
-                time.sleep(self.interval)
-                now = time.time()
-                # We can iterate repository copies safely
-                orders = self.order_service.order_repo.get_all()
-                for order in orders:
-                    # Timeout rule: If CREATED or ASSIGNED for too long -> Cancel
-                    # Wait, requirement says "if no pickup within 30 mins -> cancel"
-                    # So applicable to CREATED and ASSIGNED.
-                    if order.status in [OrderStatus.CREATED, OrderStatus.ASSIGNED]:
-                        if now - order.created_at > timeout_seconds:
-                            logger.info(f"[Scheduler] Auto-cancelling order {order.id} due to timeout.")
-                            # Use AssignmentService to cancel so it handles driver freeing/queue removal
-                            self.assignment_service.cancel_order(order.id)
+                # Interruptible wait, so stop() does not have to sit out a full interval
+                if clock.get_clock().wait(self._stop_event, self.interval):
+                    break
+                self.check_timeouts()
             except Exception as e:
                 logger.error(f"[Scheduler] Error: {e}")
@@ -2,3 +2,9 @@ from .order_service import OrderService
 from .driver_service import DriverService
 from .assignment_service import AssignmentService
 from .notifications import NotificationService
+from .analytics_service import DeliveryAnalytics, offline_report
+from .event_bus import OrderEventBus, Subscription
+from .admission_controller import AdmissionController, OrderRejectedError
+from .inventory_service import InventoryService
+from .telemetry_service import TelemetryService
+from .assignment_strategy import LeastLoadedStrategy, ScoredStrategy
@@ -0,0 +1,88 @@
+from typing import Dict
+from constants.config import (
+    ADMISSION_RATE_PER_MINUTE, ADMISSION_BURST, ADMISSION_BACKLOG_LIMIT,
+    ADMISSION_RETRY_AFTER_SECONDS, ADMISSION_MAX_TRACKED_CUSTOMERS
+)
+from utils.lru_cache import LRUCache
+from utils import clock
+from utils.instrumented_lock import make_lock
+
+
+class OrderRejectedError(ValueError):
+    """Order intake refused before any state was written; the client may retry after `retry_after` seconds."""
+    def __init__(self, message: str, reason: str, retry_after: float):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def __reduce__(self):
+        # Keeps reason/retry_after when the error crosses a process boundary (partition workers)
+        return (OrderRejectedError, (str(self), self.reason, self.retry_after))
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: float, now: float):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Consumes one token; returns 0 on success or the seconds until a token is available."""
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Fast accept/reject for new orders: a per-customer token bucket, and a saturation check that
+    refuses orders once the pending queue exceeds the free driver capacity by ADMISSION_BACKLOG_LIMIT.
+    Rejections are counted per reason so shed load is visible.
+    """
+    def __init__(self, rate_per_minute: float = ADMISSION_RATE_PER_MINUTE, burst: float = ADMISSION_BURST,
+                 backlog_limit: int = ADMISSION_BACKLOG_LIMIT):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = burst
+        self.backlog_limit = backlog_limit
+        self.lock = make_lock("AdmissionController.lock")
+        # Bounded: a customer evicted for being idle simply starts again with a full bucket
+        self.buckets = LRUCache(ADMISSION_MAX_TRACKED_CUSTOMERS)
+        self.counters: Dict[str, int] = {"admitted": 0, "rate_limited": 0, "saturated": 0}
+
+    def admit(self, customer_id: str, queue_depth: int, available_capacity: int):
+        """Raises OrderRejectedError if the order must not be accepted now."""
+        now = clock.now()
+        with self.lock:
+            backlog = queue_depth - available_capacity
+            if backlog >= self.backlog_limit:
+                self.counters["saturated"] += 1
+                raise OrderRejectedError(
+                    f"System saturated ({queue_depth} orders waiting for {available_capacity} free driver slots).",
+                    "saturated", ADMISSION_RETRY_AFTER_SECONDS)
+
+            bucket = self.buckets.get(customer_id)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_per_second, self.burst, now)
+                self.buckets.put(customer_id, bucket)
+            wait = bucket.take(now)
+            if wait > 0:
+                self.counters["rate_limited"] += 1
+                raise OrderRejectedError(f"Customer {customer_id} is over the order rate limit.", "rate_limited", wait)
+            self.counters["admitted"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats: Dict[str, float] = dict(self.counters)
+        offered = stats["admitted"] + stats["rate_limited"] + stats["saturated"]
+        stats["shed_ratio"] = (stats["rate_limited"] + stats["saturated"]) / offered if offered else 0.0
+        return stats
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+            for key in self.counters:
+                self.counters[key] = 0
@@ -0,0 +1,162 @@
+import math
+from typing import Dict, Iterable, List, Optional
+from models import Order
+from constants.enums import OrderStatus
+from constants.config import ANALYTICS_WINDOW_SECONDS, ANALYTICS_BUCKET_SECONDS
+from utils import clock
+from utils.instrumented_lock import make_lock
+
+try:
+    import numpy as np
+except ImportError: # Optional: offline_report falls back to pure Python
+    np = None
+
+# Per-bucket counters; the *_sum fields hold durations in seconds
+_FIELDS = ("created", "assigned", "picked_up", "delivered", "cancelled", "timed_out",
+           "assign_wait_sum", "pickup_sum", "delivery_sum")
+_INDEX = {name: i for i, name in enumerate(_FIELDS)}
+
+
+class DeliveryAnalytics:
+    """
+    Rolling-window operational stats, updated incrementally as orders move through their lifecycle.
+    The window is a ring of fixed-width time buckets plus running totals: recording adds to the
+    current bucket and the totals, advancing the clock subtracts expired buckets. Queries read the totals.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(DeliveryAnalytics, cls).__new__(cls)
+            cls._instance.lock = make_lock("DeliveryAnalytics.lock")
+            cls._instance.bucket_seconds = ANALYTICS_BUCKET_SECONDS
+            cls._instance.window_seconds = ANALYTICS_WINDOW_SECONDS
+            cls._instance.reset()
+        return cls._instance
+
+    def reset(self):
+        with self.lock:
+            self.num_buckets = max(1, int(self.window_seconds // self.bucket_seconds))
+            self.buckets: List[List[float]] = [[0.0] * len(_FIELDS) for _ in range(self.num_buckets)]
+            self.totals: List[float] = [0.0] * len(_FIELDS)
+            self.head: Optional[int] = None # Absolute index of the newest bucket
+
+    def _advance(self, now: float) -> List[float]:
+        # Must be called within self.lock; returns the bucket for `now`
+        index = int(now // self.bucket_seconds)
+        if self.head is None or index - self.head >= self.num_buckets:
+            for bucket in self.buckets:
+                bucket[:] = [0.0] * len(_FIELDS)
+            self.totals = [0.0] * len(_FIELDS)
+            self.head = index
+        while self.head < index:
+            self.head += 1
+            expired = self.buckets[self.head % self.num_buckets]
+            for i, value in enumerate(expired):
+                if value:
+                    self.totals[i] -= value
+                    expired[i] = 0.0
+        # Late events (index < head) are attributed to the newest bucket
+        return self.buckets[self.head % self.num_buckets]
+
+    def _add(self, now: float, **values: float):
+        with self.lock:
+            bucket = self._advance(now)
+            for name, value in values.items():
+                i = _INDEX[name]
+                bucket[i] += value
+                self.totals[i] += value
+
+    # --- Recording (called from OrderService / AssignmentService) ---
+    def record_created(self, order: Order):
+        self._add(order.created_at, created=1)
+
+    def record_transition(self, order: Order, new_status: OrderStatus, now: Optional[float] = None):
+        now = now if now is not None else clock.now()
+        if new_status == OrderStatus.ASSIGNED:
+            self._add(now, assigned=1, assign_wait_sum=now - order.created_at)
+        elif new_status == OrderStatus.PICKED_UP:
+            self._add(now, picked_up=1, pickup_sum=now - (order.assigned_at or now))
+        elif new_status == OrderStatus.DELIVERED:
+            self._add(now, delivered=1, delivery_sum=now - (order.picked_up_at or now))
+        elif new_status == OrderStatus.CANCELLED:
+            self._add(now, cancelled=1)
+
+    def record_timeout(self, now: Optional[float] = None):
+        self._add(now if now is not None else clock.now(), timed_out=1)
+
+    # --- O(1) queries over the current window ---
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, float]:
+        with self.lock:
+            self._advance(now if now is not None else clock.now())
+            t = dict(zip(_FIELDS, self.totals))
+        finished = t["delivered"] + t["cancelled"]
+        return {
+            "window_seconds": self.window_seconds,
+            "orders_per_minute": t["created"] * 60.0 / self.window_seconds,
+            "avg_time_to_assign": t["assign_wait_sum"] / t["assigned"] if t["assigned"] else 0.0,
+            "avg_pickup_duration": t["pickup_sum"] / t["picked_up"] if t["picked_up"] else 0.0,
+            "avg_delivery_duration": t["delivery_sum"] / t["delivered"] if t["delivered"] else 0.0,
+            "cancellation_rate": t["cancelled"] / finished if finished else 0.0,
+            "timeout_rate": t["timed_out"] / finished if finished else 0.0,
+        }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    # Linear interpolation, matching numpy.percentile's default
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def offline_report(orders: Iterable[Order]) -> Dict[str, Dict[str, float]]:
+    """
+    Full-history duration stats (mean/p50/p95/max per phase) plus outcome counts.
+    Uses NumPy column arrays when available; the pure-Python path gives the same numbers.
+    """
+    orders = list(orders)
+    nan = float("nan")
+    columns = {
+        "created": [o.created_at for o in orders],
+        "assigned": [o.assigned_at if o.assigned_at is not None else nan for o in orders],
+        "picked_up": [o.picked_up_at if o.picked_up_at is not None else nan for o in orders],
+        "delivered": [o.delivered_at if o.delivered_at is not None else nan for o in orders],
+    }
+    phases = {
+        "time_to_assign": ("created", "assigned"),
+        "pickup_duration": ("assigned", "picked_up"),
+        "delivery_duration": ("picked_up", "delivered"),
+        "end_to_end": ("created", "delivered"),
+    }
+
+    report: Dict[str, Dict[str, float]] = {}
+    if np is not None:
+        arrays = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        for phase, (start, end) in phases.items():
+            durations = arrays[end] - arrays[start]
+            durations = durations[~np.isnan(durations)]
+            report[phase] = {
+                "count": int(durations.size),
+                "mean": float(durations.mean()) if durations.size else 0.0,
+                "p50": float(np.percentile(durations, 50)) if durations.size else 0.0,
+                "p95": float(np.percentile(durations, 95)) if durations.size else 0.0,
+                "max": float(durations.max()) if durations.size else 0.0,
+            }
+    else:
+        for phase, (start, end) in phases.items():
+            durations = sorted(e - s for s, e in zip(columns[start], columns[end])
+                               if not (math.isnan(s) or math.isnan(e)))
+            report[phase] = {
+                "count": len(durations),
+                "mean": sum(durations) / len(durations) if durations else 0.0,
+                "p50": _percentile(durations, 50),
+                "p95": _percentile(durations, 95),
+                "max": durations[-1] if durations else 0.0,
+            }
+
+    statuses = [o.status for o in orders]
+    report["outcomes"] = {status.value: statuses.count(status) for status in OrderStatus}
+    return report
@@ -1,12 +1,15 @@
-import threading
-import collections
-from typing import Deque, Optional, List
+from typing import Optional, List
 from services.order_service import OrderService
 from services.driver_service import DriverService
+from services.dispatch_queue import DispatchQueue
+from services.telemetry_service import TelemetryService
+from services.assignment_strategy import make_strategy
 from models import Order, Driver
-from constants.enums import OrderStatus, DriverStatus
+from constants.enums import OrderStatus, DriverStatus, OrderEventType
 from utils.logger import logger
 from services.notifications import NotificationService
+from utils.tracing import traced
+from utils.instrumented_lock import make_lock
 
 class AssignmentService:
     _instance = None
@@ -14,108 +17,149 @@ class AssignmentService:
     def __new__(cls):
         if not cls._instance:
             cls._instance = super(AssignmentService, cls).__new__(cls)
-            cls._instance.lock = threading.RLock()
-            cls._instance.pending_orders: Deque[str] = collections.deque()
+            cls._instance.lock = make_lock("AssignmentService.lock", reentrant=True)
+            cls._instance.pending_orders = DispatchQueue() # Class priority + aging, not FIFO
             cls._instance.order_service = OrderService()
             cls._instance.driver_service = DriverService()
+            cls._instance.telemetry = TelemetryService()
+            # Pluggable: anything with select(order, skip) -> Optional[Driver]
+            cls._instance.strategy = make_strategy(cls._instance.driver_service)
         return cls._instance
 
+    @traced("AssignmentService.queue_order")
     def queue_order(self, order_id: str):
         with self.lock:
-            self.pending_orders.append(order_id)
+            order = self.order_service.get_order(order_id)
+            if not order:
+                logger.warning(f"Order {order_id} not found, not queued.")
+                return
+            self.pending_orders.push(order)
             logger.info(f"Order {order_id} added to pending queue.")
+            self.order_service.events.publish(OrderEventType.ORDER_QUEUED, order)
             self._process_queue_unsafe()
 
+    @traced("AssignmentService.on_driver_available")
     def on_driver_available(self, driver_id: str):
         with self.lock:
             self._process_queue_unsafe()
 
+    @traced("AssignmentService.process_queue_unsafe")
     def _process_queue_unsafe(self):
         # Must be called within self.lock
-        if not self.pending_orders:
-            return
+        while self.pending_orders:
+            order = self._peek_valid_order()
+            if not order:
+                return
+
+            # Driver picked by the strategy (least loaded by default), skipping drivers whose
+            # heartbeats stopped; None when everyone is full or unreachable. Without stale drivers
+            # no skip is passed, so the strategy takes its direct path instead of a filtered scan
+            skip = self.telemetry.is_stale if self.telemetry.has_stale() else None
+            driver = self.strategy.select(order, skip)
+            if not driver:
+                return
 
-        available_drivers = [d for d in self.driver_service.get_all_drivers() if d.status == DriverStatus.AVAILABLE]
-        if not available_drivers:
-            return
+            self.pending_orders.pop()
+            batch = [order]
+            # Batch: compatible orders waiting right behind this one ride with the same driver
+            while len(batch) < driver.remaining_capacity:
+                next_order = self._peek_valid_order()
+                if not next_order or not self._batch_compatible(order, next_order):
+                    break
+                self.pending_orders.pop()
+                batch.append(next_order)
 
-        while self.pending_orders and available_drivers:
-            order_id = self.pending_orders[0] # Peek
+            failed = []
+            for batch_order in batch:
+                try:
+                    driver = self._assign_atomic(batch_order, driver)
+                except Exception as e:
+                    logger.error(f"Failed to assign order {batch_order.id} to {driver.id}: {e}")
+                    # Re-queue the order if it is still valid
+                    current = self.order_service.get_order(batch_order.id)
+                    if current and current.status == OrderStatus.CREATED:
+                        failed.append(current)
+            if failed:
+                for failed_order in failed:
+                    self.pending_orders.push(failed_order) # Same key, so back at the front
+                return # Retry on the next trigger rather than spinning on the same driver
+
+    def _peek_valid_order(self) -> Optional[Order]:
+        # Returns the head without removing it. Drops orders cancelled while queued, and orders
+        # already past their timeout: a driver would only hold them until the sweep cancels them
+        while True:
+            order_id = self.pending_orders.peek()
+            if order_id is None:
+                return None
             order = self.order_service.get_order(order_id)
-            
-            # Validation: Order might have been cancelled while in queue
-            if not order or order.status != OrderStatus.CREATED:
-                self.pending_orders.popleft() # Remove invalid
-                continue
-            
-            driver = available_drivers.pop(0)
-            self.pending_orders.popleft() # Remove assigned
-            
-            try:
-                self._assign_atomic(order, driver)
-            except Exception as e:
-                logger.error(f"Failed to assign order {order_id} to {driver.id}: {e}")
-                # Logic to retry or re-queue? For now, if atomic assign fails, maybe driver status changed?
-                # We should re-queue order if order is still valid.
-                if order.status == OrderStatus.CREATED:
-                     self.pending_orders.appendleft(order_id)
+            if order and order.status == OrderStatus.CREATED and not self.pending_orders.is_expired(order):
+                return order
+            self.pending_orders.pop()
 
-    def _assign_atomic(self, order: Order, driver: Driver):
+    @staticmethod
+    def _batch_compatible(first: Order, other: Order) -> bool:
+        # Same customer -> same pickup and drop-off, so one trip serves both
+        return first.customer_id == other.customer_id
+
+    def _assign_atomic(self, order: Order, driver: Driver) -> Driver:
         # Critical Section: Locking both Order and Driver could be complex.
         # We use AssignmentService Lock + Service methods which adhere to their own logic.
         # But to be "Atomic", we need to ensure no one else steals this driver/order in between.
         # Since we are inside `_process_queue_unsafe` which has `self.lock`, 
         # as long as ALL assignments go through `AssignmentService` and its lock, we are safe.
         
-        # 1. Update Order Status
+        # 1. Reserve a slot on the driver first (BUSY once at capacity): if the driver update fails
+        # (no capacity, retries exhausted, durable store rejected the record) the order is untouched,
+        # still CREATED, and the caller re-queues it
+        driver = self.driver_service.assign_order(driver.id, order.id)
+
+        # 2. Update Order Status
         try:
-            self.order_service.transition_state(order.id, OrderStatus.ASSIGNED)
-            order.driver_id = driver.id
-            self.order_service.order_repo.save(order) # Save metadata
-        except ValueError as e:
+            # Status and driver are written together; `order` may be a stale copy on disk-backed repos
+            order = self.order_service.transition_state(order.id, OrderStatus.ASSIGNED, driver_id=driver.id)
+        except Exception as e:
             logger.warning(f"Assignment failed: Order state invalid ({e})")
+            self.driver_service.release_order(driver.id, order.id) # Give the reserved slot back
             raise
 
-        # 2. Update Driver Status
-        # We need to ensure driver is still available if we didn't lock him explicitly.
-        # But we queried list inside the lock.
-        self.driver_service.set_driver_status(driver.id, DriverStatus.BUSY)
-        driver.current_order_id = order.id
-        self.driver_service.repo.save(driver)
-
         logger.info(f"Order {order.id} assigned to driver {driver.id}")
         NotificationService.notify(order.customer_id, f"Order {order.id} assigned to {driver.name}")
         NotificationService.notify_driver(driver.id, f"You have been assigned order {order.id}")
+        return driver
 
-    def cancel_order(self, order_id: str):
+    @traced("AssignmentService.cancel_order")
+    def cancel_order(self, order_id: str, timed_out: bool = False) -> bool:
+        """Cancels the order and frees its driver; False if it was missing or could no longer be cancelled."""
         with self.lock:
-            # Remove from queue if present
-            if order_id in self.pending_orders:
-                self.pending_orders.remove(order_id) # O(N) scan, acceptable for demo
+            # Remove from queue if present (lazy deletion, O(1))
+            self.pending_orders.remove(order_id)
                 
             # Delegate state transition to OrderService
             # Check current status handles atomic check
             try:
                 order = self.order_service.get_order(order_id)
                 if not order: 
-                    return
+                    return False
                 
                 prev_status = order.status
                 driver_id = order.driver_id
+                if prev_status == OrderStatus.CANCELLED:
+                    return False # Already cancelled: the transition would be an idempotent no-op
                 
                 self.order_service.transition_state(order_id, OrderStatus.CANCELLED)
                 logger.info(f"Order {order_id} cancelled.")
+                if timed_out:
+                    self.order_service.analytics.record_timeout()
                 
                 # If was assigned, free driver
                 if prev_status == OrderStatus.ASSIGNED and driver_id:
-                    self.driver_service.set_driver_status(driver_id, DriverStatus.AVAILABLE)
-                    driver = self.driver_service.get_driver(driver_id)
+                    driver = self.driver_service.release_order(driver_id, order_id)
                     if driver:
-                        driver.current_order_id = None
-                        self.driver_service.repo.save(driver)
                         NotificationService.notify_driver(driver_id, f"Order {order_id} cancelled. You are free.")
                         # Trigger queue processing since a driver became free
                         self._process_queue_unsafe()
+                return True
                         
             except ValueError as e:
                 logger.error(f"Cannot cancel order {order_id}: {e}")
+                return False
@@ -0,0 +1,38 @@
+from typing import Callable, Dict, Mapping, Optional
+from models import Driver, Order
+from services.driver_service import DriverService
+from constants import config
+
+
+class LeastLoadedStrategy:
+    """Driver with the most spare capacity (capacity index); the default."""
+    def __init__(self, driver_service: DriverService):
+        self.driver_service = driver_service
+
+    def select(self, order: Order, skip: Optional[Callable[[str], bool]] = None) -> Optional[Driver]:
+        return self.driver_service.find_available_driver(skip)
+
+
+class ScoredStrategy:
+    """
+    Best weighted score of rating, idle time and vehicle fit for the order's item, ranked over
+    every available driver in one pass (see repositories.driver_score_index.DriverScoreIndex).
+    """
+    def __init__(self, driver_service: DriverService, weights: Optional[Mapping[str, float]] = None,
+                 vehicle_fit: Optional[Mapping[str, Mapping[str, float]]] = None):
+        self.driver_service = driver_service
+        self.weights: Dict[str, float] = dict(config.DRIVER_SCORE_WEIGHTS if weights is None else weights)
+        self.vehicle_fit = config.ITEM_VEHICLE_FIT if vehicle_fit is None else vehicle_fit
+
+    def select(self, order: Order, skip: Optional[Callable[[str], bool]] = None) -> Optional[Driver]:
+        return self.driver_service.find_best_driver(self.weights, self.vehicle_fit.get(order.item_id), skip)
+
+
+def make_strategy(driver_service: DriverService, name: Optional[str] = None):
+    """Strategy named by `name` (default constants.config.ASSIGNMENT_STRATEGY)."""
+    name = name or config.ASSIGNMENT_STRATEGY
+    if name == "least_loaded":
+        return LeastLoadedStrategy(driver_service)
+    if name == "scored":
+        return ScoredStrategy(driver_service)
+    raise ValueError(f"Unknown assignment strategy '{name}'.")
@@ -0,0 +1,228 @@
+import atexit
+import itertools
+import threading
+from typing import Iterator, Optional
+from models import Order
+from constants import config
+from repositories.factory import get_order_repository, get_driver_repository, get_customer_repository
+from repositories.json_store import JsonSnapshotStore
+from repositories.binary_store import BinarySnapshotStore
+from repositories.mmap_driver_store import MmapDriverStore
+from services.order_service import OrderService
+from services.driver_service import DriverService
+from services.assignment_service import AssignmentService
+from services.admission_controller import AdmissionController
+from services.idempotency import IdempotencyCache
+from services.telemetry_service import TelemetryService
+from scheduler.timeout_scheduler import OrderTimeoutScheduler
+from utils.logger import logger
+from utils import tracing
+from utils.instrumented_lock import make_lock
+
+class DeliveryEngine:
+    """
+    The single state engine behind DeliveryController and the DeliveryService facade:
+    one set of repositories (from the factory), one timeout scheduler thread and one
+    persistence pipeline, however many facades are constructed.
+
+    Construction does no disk I/O and starts no threads. The scheduler and the persistence
+    writer start on first use (or explicitly via start()); stop() drains pending writes and
+    leaves the engine ready to start again.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(DeliveryEngine, cls).__new__(cls)
+            cls._instance.lock = make_lock("DeliveryEngine.lock")
+            cls._instance.order_service = OrderService(get_order_repository(), get_customer_repository())
+            cls._instance.driver_service = DriverService(get_driver_repository())
+            cls._instance.admission = AdmissionController()
+            cls._instance.idempotency = IdempotencyCache()
+            cls._instance.telemetry = TelemetryService()
+            cls._instance.store = BinarySnapshotStore(fallback=JsonSnapshotStore()) \
+                if config.SNAPSHOT_FORMAT == "binary" else JsonSnapshotStore()
+            cls._instance._scheduler: Optional[OrderTimeoutScheduler] = None
+            cls._instance._scheduler_started = False
+            cls._instance._loaded = False
+            cls._instance._load_lock = make_lock("DeliveryEngine.load_lock") # Held for the whole load
+            # Persistence writer: persist() marks the store dirty, one background thread coalesces writes
+            cls._instance._persist_cond = threading.Condition()
+            cls._instance._write_lock = make_lock("DeliveryEngine.write_lock")
+            cls._instance._dirty = False
+            cls._instance._stopping = False
+            cls._instance._writer: Optional[threading.Thread] = None
+            cls._instance._exit_hook = False
+        return cls._instance
+
+    @property
+    def assignment_service(self) -> AssignmentService:
+        # Resolved on use so a reset of the AssignmentService singleton is picked up
+        return AssignmentService()
+
+    @property
+    def scheduler(self) -> OrderTimeoutScheduler:
+        with self.lock:
+            if self._scheduler is None:
+                self._scheduler = OrderTimeoutScheduler()
+            return self._scheduler
+
+    def start_scheduler(self):
+        """Starts the timeout thread once; later calls (from any facade) are no-ops until stop()."""
+        if self._scheduler_started: # Fast path: called on every order intake
+            return
+        scheduler = self.scheduler
+        with self.lock:
+            if self._scheduler_started:
+                return
+            self._scheduler_started = True
+        scheduler.start()
+
+    # --- Lifecycle ---
+    def start(self):
+        """Starts background work eagerly (otherwise it starts on first use)."""
+        self.start_scheduler()
+        if self._persists_to_json():
+            with self._persist_cond:
+                self._ensure_writer()
+
+    def stop(self, timeout: float = 5.0):
+        """Graceful shutdown: stops the scheduler, then drains pending writes before returning."""
+        with self.lock:
+            scheduler = self._scheduler if self._scheduler_started else None
+            self._scheduler_started = False # The next start_scheduler() starts it again
+        if scheduler:
+            scheduler.stop(timeout)
+        with self._persist_cond:
+            self._stopping = True
+            writer = self._writer
+            self._persist_cond.notify_all()
+        if writer:
+            writer.join(timeout)
+        with self._persist_cond:
+            # The old writer has exited; a later persist() starts a new one
+            self._stopping = False
+            if self._writer is writer:
+                self._writer = None
+        self.flush()
+        tracing.flush()
+
+    def flush(self):
+        """Writes any pending state now, on the calling thread."""
+        with self._persist_cond:
+            dirty, self._dirty = self._dirty, False
+        if dirty:
+            self._write()
+        driver_store = getattr(self.driver_service.repo, "store", None)
+        if driver_store is not None:
+            driver_store.flush()
+
+    def admit_order(self, customer_id: str):
+        """Raises OrderRejectedError when the customer is rate limited or the queue is saturated."""
+        self.admission.admit(customer_id, len(self.assignment_service.pending_orders),
+                             self.driver_service.repo.available_capacity())
+
+    # --- Persistence ---
+    def _persists_to_json(self) -> bool:
+        return config.REPOSITORY_BACKEND == "memory" # SQLite commits every write itself
+
+    def load(self) -> int:
+        """
+        Loads the JSON store into the repositories, once per engine, then reconciles driver loads
+        with the stored orders and rebuilds item stock.
+        Concurrent callers wait until the first one has finished, so nobody sees half-loaded state.
+        """
+        if self._loaded: # Fast path: called before every facade operation
+            return 0
+        with self._load_lock:
+            if self._loaded:
+                return 0
+            loaded = self._load_stores() if self._persists_to_json() else 0
+            orders = list(self.order_service.orders_snapshot().values())
+            # Drivers may be ahead of the orders (the mmap store is written on every change, the
+            # order snapshot later): make driver loads agree with the orders actually stored
+            corrected = self.driver_service.reconcile_orders(orders)
+            if corrected:
+                logger.warning(f"[Persistence] Corrected the load of {corrected} driver(s) to match stored orders.")
+            # Stock lives only in memory: take back what every stored order still holds, archived ones included
+            archived = self.order_service.order_repo.archived_heads() if self._persists_to_json() else ()
+            self.order_service.inventory.rebuild(itertools.chain(orders, archived))
+            self._loaded = True
+            return loaded
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _load_stores(self) -> int:
+        self.order_service.order_repo.load_archive() # Archived orders first: they are the oldest history
+        driver_repo = self.driver_service.repo
+        loaded = 0
+        if self._drivers_in_mmap():
+            loaded = driver_repo.attach_store(MmapDriverStore(config.DRIVER_STORE_FILE))
+            if loaded:
+                driver_repo = None # The JSON drivers file is stale; an empty store migrates from it once
+        return loaded + self.store.load_into(self.order_service.customer_repo, driver_repo,
+                                             self.order_service.order_repo)
+
+    def all_orders(self) -> Iterator[Order]:
+        """Every stored order once: the resident snapshot, then archived orders decoded one at a time."""
+        seen = set()
+        for order in self.order_service.orders_snapshot().values():
+            seen.add(order.id)
+            yield order
+        if self._persists_to_json(): # SQLite keeps every order resident in the database
+            for order in self.order_service.order_repo.archived_orders():
+                if order.id not in seen: # Restored from the archive after the snapshot was taken
+                    yield order
+
+    def _drivers_in_mmap(self) -> bool:
+        return config.DRIVER_STORE == "mmap"
+
+    def persist(self):
+        """Schedules a write of the current state; a burst of calls becomes one write."""
+        if not self._persists_to_json():
+            return
+        with self._persist_cond:
+            self._dirty = True
+            if self._stopping:
+                return # Shutting down: stop() writes it via flush()
+            self._ensure_writer()
+            self._persist_cond.notify()
+
+    def _ensure_writer(self):
+        # Caller holds _persist_cond
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop, name="delivery-persistence", daemon=True)
+            self._writer.start()
+            if not self._exit_hook:
+                self._exit_hook = True
+                atexit.register(self.stop) # Daemon thread: make sure the last writes reach disk at exit
+
+    def _writer_loop(self):
+        while True:
+            with self._persist_cond:
+                while not self._dirty and not self._stopping:
+                    self._persist_cond.wait()
+                if self._stopping:
+                    return # stop() flushes whatever is still pending
+                self._dirty = False
+            try:
+                self._write()
+            except Exception as e:
+                logger.error(f"[Persistence] Error: {e}")
+
+    def enforce_retention(self, force: bool = False) -> int:
+        """Moves old terminal orders to the on-disk archive; returns how many left memory."""
+        if not self._persists_to_json():
+            return 0 # SQLite keeps every order on disk already
+        return self.order_service.order_repo.spill(force=force)
+
+    def _write(self):
+        self.enforce_retention() # Before the snapshot, so archived orders drop out of the JSON store
+        with self._write_lock:
+            # Snapshots are consistent and taken without blocking writers
+            # Drivers in the mmap store are already durable: every change was written in place
+            drivers = None if self._drivers_in_mmap() else self.driver_service.drivers_snapshot().values()
+            self.store.save(self.order_service.customer_repo.get_all(), drivers,
+                            self.order_service.orders_snapshot().values())
@@ -0,0 +1,71 @@
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Optional
+from models import Order
+from constants.config import TIMEOUT_MINUTES, DISPATCH_PRIORITY_HEADROOM
+from utils import clock
+
+_REMOVED = None # Placeholder id for lazily deleted heap entries
+
+
+class DispatchQueue:
+    """
+    SLA-aware pending-order queue: a binary heap keyed by each order's timeout deadline, pulled
+    forward by its item class's headroom (DISPATCH_PRIORITY_HEADROOM). Because keys are absolute
+    deadlines, waiting orders age into priority: a document that has waited long enough overtakes
+    a fresh food order. push/pop are O(log N); remove is O(1) with lazy deletion.
+    """
+    def __init__(self, timeout_seconds: Optional[float] = None):
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else TIMEOUT_MINUTES * 60
+        self._heap: List[list] = [] # [priority, seq, order_id]
+        self._entries: Dict[str, list] = {}
+        self._seq = itertools.count() # FIFO among equal priorities
+
+    def priority(self, order: Order) -> float:
+        headroom = DISPATCH_PRIORITY_HEADROOM.get(order.item_id, 0.0)
+        return order.created_at + self.timeout_seconds * (1.0 - headroom)
+
+    def deadline(self, order: Order) -> float:
+        return order.created_at + self.timeout_seconds
+
+    def is_expired(self, order: Order, now: Optional[float] = None) -> bool:
+        """Past its timeout: dispatching it would only tie up a driver until the sweep cancels it."""
+        return (now if now is not None else clock.now()) > self.deadline(order)
+
+    def push(self, order: Order):
+        if order.id in self._entries:
+            return
+        entry = [self.priority(order), next(self._seq), order.id]
+        self._entries[order.id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def peek(self) -> Optional[str]:
+        while self._heap and self._heap[0][2] is _REMOVED:
+            heapq.heappop(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def pop(self) -> Optional[str]:
+        order_id = self.peek()
+        if order_id is not None:
+            heapq.heappop(self._heap)
+            del self._entries[order_id]
+        return order_id
+
+    def remove(self, order_id: str):
+        entry = self._entries.pop(order_id, None)
+        if entry is not None:
+            entry[2] = _REMOVED
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        # Dispatch order; sorts a copy, meant for inspection rather than the hot path
+        return (entry[2] for entry in sorted(self._entries.values()))
@@ -1,17 +1,22 @@
-from typing import List, Optional
-from repositories.driver_repository import InMemoryDriverRepository
-from models import Driver
-from constants.enums import DriverStatus
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+from repositories.factory import get_driver_repository
+from repositories.optimistic import update_with_retry
+from repositories.snapshot import RepositorySnapshot
+from models import Driver, Order
+from constants.enums import DriverStatus, OrderStatus
+from utils.tracing import traced
 
 class DriverService:
-    def __init__(self):
-        self.repo = InMemoryDriverRepository()
+    def __init__(self, repo=None):
+        self.repo = repo or get_driver_repository()
 
-    def onboard_driver(self, id: str, name: str) -> Driver:
+    def onboard_driver(self, id: str, name: str, capacity: int = 1) -> Driver:
         existing = self.repo.get_by_id(id)
         if existing:
             return existing
-        driver = Driver(id=id, name=name)
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity {capacity}.")
+        driver = Driver(id=id, name=name, capacity=capacity)
         self.repo.save(driver)
         return driver
 
@@ -21,16 +26,82 @@ class DriverService:
     def get_all_drivers(self) -> List[Driver]:
         return self.repo.get_all()
 
-    def set_driver_status(self, driver_id: str, status: DriverStatus):
-        # This might need locking if updated concurrently, but repo saves are atomic per driver object reference usually.
-        # Ideally, we get, modify, save inside a lock if we want strict consistency.
-        # But for now, repo.save is thread-safe for the dict put. 
-        # Modifying the object itself is not thread-safe if multiple threads modify same driver object.
-        # We should probably lock on the driver ID or use a mutex in the Service.
-        # Given the requirements, let's trust the single-threaded nature of python GIL for simple property updates 
-        # OR use the repo lock if we extended it to 'update' method.
-        # For this exercise, getting from repo returns a reference. Modifying it is in-memory.
-        driver = self.repo.get_by_id(driver_id)
-        if driver:
+    def drivers_snapshot(self) -> RepositorySnapshot:
+        """Consistent read-only view for scans (leaderboards, reports) that never blocks writers."""
+        return self.repo.snapshot()
+
+    def find_available_driver(self, skip: Optional[Callable[[str], bool]] = None) -> Optional[Driver]:
+        return self.repo.find_available(skip)
+
+    def find_best_driver(self, weights: Mapping[str, float], fit: Optional[Mapping[str, float]] = None,
+                         skip: Optional[Callable[[str], bool]] = None) -> Optional[Driver]:
+        """Highest weighted score of rating, idle time and vehicle fit among available drivers."""
+        return self.repo.find_best(weights, fit, skip)
+
+    def set_driver_status(self, driver_id: str, status: DriverStatus) -> Optional[Driver]:
+        # Optimistic update: applied to a copy and compare-and-set against the version read,
+        # so concurrent writers to the same driver retry instead of overwriting each other.
+        def apply(driver: Driver):
             driver.status = status
-            self.repo.save(driver) 
+        return update_with_retry(self.repo, driver_id, apply, "driver.set_status")
+
+    @traced("DriverService.assign_order")
+    def assign_order(self, driver_id: str, order_id: str) -> Driver:
+        """Adds the order to the driver's load; the driver turns BUSY once full."""
+        def apply(driver: Driver):
+            if driver.status != DriverStatus.AVAILABLE or driver.remaining_capacity <= 0:
+                raise ValueError(f"Driver {driver_id} has no spare capacity")
+            driver.active_order_ids.append(order_id)
+            if driver.remaining_capacity == 0:
+                driver.status = DriverStatus.BUSY
+
+        driver = update_with_retry(self.repo, driver_id, apply, "driver.assign_order")
+        if not driver:
+            raise ValueError(f"Driver {driver_id} not found")
+        return driver
+
+    @traced("DriverService.release_order")
+    def release_order(self, driver_id: str, order_id: str) -> Optional[Driver]:
+        """Removes a delivered/cancelled order from the driver's load, freeing a slot."""
+        def apply(driver: Driver):
+            if order_id in driver.active_order_ids:
+                driver.active_order_ids.remove(order_id)
+            driver.status = DriverStatus.AVAILABLE
+        return update_with_retry(self.repo, driver_id, apply, "driver.release_order")
+
+    @traced("DriverService.add_rating")
+    def add_rating(self, driver_id: str, stars: int) -> Optional[Driver]:
+        def apply(driver: Driver):
+            driver.total_rating += stars
+            driver.ratings_count += 1
+        return update_with_retry(self.repo, driver_id, apply, "driver.add_rating")
+
+    def reconcile_orders(self, orders: Iterable[Order]) -> int:
+        """
+        Makes each driver's load match the stored orders, for startup when the driver store and the
+        order store were written at different times: ids of orders that are missing or no longer
+        ASSIGNED/PICKED_UP to the driver are dropped, orders held by the driver but missing from its
+        load are added, and the status is recomputed. Returns how many drivers were corrected.
+        """
+        held: Dict[str, List[str]] = {}
+        for order in orders:
+            if order.driver_id and order.status in (OrderStatus.ASSIGNED, OrderStatus.PICKED_UP):
+                held.setdefault(order.driver_id, []).append(order.id)
+
+        corrected = 0
+        for driver in self.repo.get_all():
+            holding = held.get(driver.id, [])
+            kept = set(holding)
+            active = [i for i in driver.active_order_ids if i in kept]
+            listed = set(active)
+            active += [i for i in holding if i not in listed]
+            status = DriverStatus.BUSY if len(active) >= driver.capacity else DriverStatus.AVAILABLE
+            if active == driver.active_order_ids and status == driver.status:
+                continue
+
+            def apply(current: Driver, active=active, status=status):
+                current.active_order_ids = list(active)
+                current.status = status
+            update_with_retry(self.repo, driver.id, apply, "driver.reconcile_orders")
+            corrected += 1
+        return corrected
@@ -0,0 +1,143 @@
+import collections
+import itertools
+import threading
+from typing import Deque, List, Optional, Tuple
+from models import Order, OrderEvent
+from constants.enums import OrderEventType, OrderStatus
+from constants.config import EVENT_LOG_SIZE, EVENT_SUBSCRIBER_BUFFER_SIZE
+from utils import clock
+from utils.instrumented_lock import make_lock
+
+
+class Subscription:
+    """
+    A subscriber's view of the change feed: a bounded ring buffer filled by the publisher.
+    When the consumer falls behind, the oldest events are overwritten and counted in `dropped`;
+    the consumer can resync with OrderEventBus.events_since(cursor) or by re-reading the orders.
+    """
+    def __init__(self, bus: "OrderEventBus", buffer_size: int, order_id: Optional[str] = None,
+                 customer_id: Optional[str] = None, driver_id: Optional[str] = None):
+        self.bus = bus
+        self.order_id = order_id
+        self.customer_id = customer_id
+        self.driver_id = driver_id
+        self.buffer: Deque[OrderEvent] = collections.deque(maxlen=buffer_size)
+        self.cursor = 0 # Offset after the last event handed to the consumer
+        self.dropped = 0
+        self._ready = threading.Event()
+
+    def matches(self, event: OrderEvent) -> bool:
+        return ((self.order_id is None or event.order_id == self.order_id) and
+                (self.customer_id is None or event.customer_id == self.customer_id) and
+                (self.driver_id is None or event.driver_id == self.driver_id))
+
+    def _push(self, event: OrderEvent):
+        # Publisher side: O(1), never waits on the consumer
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(event)
+        self._ready.set()
+
+    def poll(self, max_events: Optional[int] = None) -> List[OrderEvent]:
+        events = []
+        while self.buffer and (max_events is None or len(events) < max_events):
+            events.append(self.buffer.popleft())
+        if events:
+            self.cursor = events[-1].offset + 1
+        if not self.buffer:
+            self._ready.clear()
+        return events
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks the consumer (never the publisher) until events are buffered."""
+        return bool(self.buffer) or self._ready.wait(timeout)
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class OrderEventBus:
+    """
+    In-process change feed for order lifecycle events.
+    Publishing assigns a global offset, appends to a bounded log (for resume-from-offset) and
+    copies the event into every matching subscriber's ring buffer; it never blocks on consumers.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(OrderEventBus, cls).__new__(cls)
+            cls._instance.lock = make_lock("OrderEventBus.lock")
+            cls._instance.log: Deque[OrderEvent] = collections.deque(maxlen=EVENT_LOG_SIZE)
+            cls._instance.next_offset = 0
+            # Replaced wholesale on (un)subscribe so publishers iterate without copying
+            cls._instance.subscriptions: Tuple[Subscription, ...] = ()
+        return cls._instance
+
+    def publish(self, event_type: OrderEventType, order: Order,
+                previous_status: Optional[OrderStatus] = None, timestamp: Optional[float] = None) -> OrderEvent:
+        with self.lock:
+            event = OrderEvent(
+                offset=self.next_offset,
+                type=event_type,
+                order_id=order.id,
+                customer_id=order.customer_id,
+                status=order.status,
+                driver_id=order.driver_id,
+                previous_status=previous_status,
+                timestamp=timestamp if timestamp is not None else clock.now(),
+                version=order.version,
+            )
+            self.next_offset += 1
+            self.log.append(event)
+            # Fan-out under the lock keeps every buffer in offset order; each push is a deque append
+            for subscription in self.subscriptions:
+                if subscription.matches(event):
+                    subscription._push(event)
+        return event
+
+    def subscribe(self, order_id: Optional[str] = None, customer_id: Optional[str] = None,
+                  driver_id: Optional[str] = None, from_offset: Optional[int] = None,
+                  buffer_size: int = EVENT_SUBSCRIBER_BUFFER_SIZE) -> Subscription:
+        """
+        New subscription receiving events that match all given filters.
+        With from_offset, retained events from that offset are replayed first (no gap, no duplicates).
+        """
+        subscription = Subscription(self, buffer_size, order_id, customer_id, driver_id)
+        with self.lock:
+            if from_offset is not None:
+                for event in self._retained_since(from_offset):
+                    if subscription.matches(event):
+                        subscription._push(event)
+                subscription.cursor = from_offset
+            else:
+                subscription.cursor = self.next_offset
+            self.subscriptions = self.subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscriptions = tuple(s for s in self.subscriptions if s is not subscription)
+
+    def events_since(self, offset: int, limit: int = 100, order_id: Optional[str] = None,
+                     customer_id: Optional[str] = None, driver_id: Optional[str] = None) -> List[OrderEvent]:
+        """Stateless cursor read over the retained log; pass the last offset + 1 to continue."""
+        probe = Subscription(self, 1, order_id, customer_id, driver_id)
+        with self.lock:
+            events = self._retained_since(offset)
+            return list(itertools.islice((e for e in events if probe.matches(e)), limit))
+
+    def _retained_since(self, offset: int):
+        # Must be called within self.lock
+        if offset > self.next_offset:
+            raise ValueError(f"Offset {offset} is ahead of the feed ({self.next_offset}).")
+        oldest = self.log[0].offset if self.log else self.next_offset
+        if offset < oldest:
+            raise ValueError(f"Offset {offset} is no longer retained; oldest available is {oldest}.")
+        return itertools.islice(self.log, offset - oldest, None)
+
+    def clear(self):
+        with self.lock:
+            self.log.clear()
+            self.next_offset = 0
+            self.subscriptions = ()
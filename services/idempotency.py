@@ -0,0 +1,64 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from constants.config import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS
+from utils.lru_cache import LRUCache
+from utils.instrumented_lock import make_lock
+
+_MISSING = object()
+
+
+class IdempotencyCache:
+    """
+    Remembers the result of each (operation, idempotency key) so a retried request returns the
+    original result without running the operation again. Bounded by IDEMPOTENCY_CACHE_SIZE (LRU)
+    and IDEMPOTENCY_TTL_SECONDS. Concurrent requests with the same key wait for the first one
+    instead of running twice. Failures are not cached, so a retry after an error runs again.
+    """
+    def __init__(self, max_size: int = IDEMPOTENCY_CACHE_SIZE, ttl_seconds: Optional[float] = IDEMPOTENCY_TTL_SECONDS):
+        self.results = LRUCache(max_size, ttl_seconds) # (operation, key) -> (params, result)
+        self.lock = make_lock("IdempotencyCache.lock")
+        self._in_flight: Dict[Tuple[str, Hashable], threading.Event] = {}
+        self.counters: Dict[str, int] = {"hits": 0, "executions": 0, "waits": 0, "mismatches": 0}
+
+    def run(self, operation: str, key: Optional[Hashable], params: tuple, fn: Callable[[], Any]) -> Any:
+        if key is None:
+            return fn()
+        cache_key = (operation, key)
+        while True:
+            with self.lock:
+                entry = self.results.get(cache_key, _MISSING)
+                if entry is not _MISSING:
+                    stored_params, result = entry
+                    if stored_params != params:
+                        self.counters["mismatches"] += 1
+                        raise ValueError(f"Idempotency key {key} was already used for {operation} with different parameters.")
+                    self.counters["hits"] += 1
+                    return result
+                pending = self._in_flight.get(cache_key)
+                if pending is None:
+                    self._in_flight[cache_key] = threading.Event()
+                    self.counters["executions"] += 1
+                    break
+                self.counters["waits"] += 1
+            pending.wait() # Then re-check: cached on success, or ours to run if the first attempt failed
+
+        try:
+            result = fn()
+            self.results.put(cache_key, (params, result))
+            return result
+        finally:
+            with self.lock:
+                self._in_flight.pop(cache_key).set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.counters)
+        cache = self.results.stats()
+        stats.update(size=cache["size"], evictions=cache["evictions"], expirations=cache["expirations"])
+        return stats
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+            for key in self.counters:
+                self.counters[key] = 0
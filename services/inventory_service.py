@@ -0,0 +1,120 @@
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+from models import Item, Order
+from constants.enums import OrderStatus
+from constants.config import ITEM_CATALOG, INVENTORY_LOCK_STRIPES
+from utils.instrumented_lock import make_lock
+
+
+class InventoryService:
+    """
+    Process-wide item catalog and stock counters, loaded once from constants.config.ITEM_CATALOG.
+    Catalog lookups are plain dict reads. Each stock update takes one of INVENTORY_LOCK_STRIPES locks,
+    picked by item id, so orders for different items never contend on a shared lock.
+    Items with unlimited stock (None in the catalog) skip locking entirely.
+
+    Stock is only as durable as the orders holding it: after a restart, rebuild() takes the units of
+    every stored order that was not cancelled (resident or archived) back out of the configured starting stock. Across processes
+    (partition workers), share_stock() points every process at one set of counters owned by the router.
+    """
+    # Units are taken at creation and given back only on cancellation; delivered orders keep theirs
+    RESERVING_STATUSES = (OrderStatus.CREATED, OrderStatus.ASSIGNED, OrderStatus.PICKED_UP, OrderStatus.DELIVERED)
+
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(InventoryService, cls).__new__(cls)
+            cls._instance._stripes: List[threading.Lock] = [make_lock(f"InventoryService.stripe{i}") for i in range(INVENTORY_LOCK_STRIPES)]
+            cls._instance.catalog: Dict[str, Item] = {}
+            cls._instance._stock: Dict[str, Optional[int]] = {}
+            cls._instance._shared: Dict[str, Any] = {} # item id -> process-shared counter (see share_stock)
+            cls._instance.reset()
+        return cls._instance
+
+    def reset(self):
+        """Reloads the catalog and starting stock from config (tests, simulations)."""
+        # Updated in place: services hold a reference to the catalog dict
+        self.catalog.clear()
+        self.catalog.update({item_id: Item(item_id, name) for item_id, (name, _) in ITEM_CATALOG.items()})
+        self._stock.clear()
+        self._stock.update({item_id: stock for item_id, (_, stock) in ITEM_CATALOG.items()})
+        self._shared.clear()
+
+    @staticmethod
+    def shared_stock(ctx) -> Dict[str, Any]:
+        """One process-shared counter (multiprocessing Value) per limited item, at its configured stock."""
+        return {item_id: ctx.Value("q", stock) for item_id, (_, stock) in ITEM_CATALOG.items() if stock is not None}
+
+    def share_stock(self, counters: Mapping[str, Any]):
+        """Reserves and releases against `counters` (from shared_stock) instead of this process's own copy."""
+        self._shared.clear()
+        self._shared.update(counters)
+
+    def rebuild(self, orders: Iterable[Order]):
+        """
+        Starting stock from config minus the units held by `orders` in RESERVING_STATUSES.
+        Each order must appear once; anything with item_id, quantity and status works (e.g. codec.OrderHead).
+        """
+        for item_id, (_, stock) in ITEM_CATALOG.items():
+            if stock is not None:
+                with self._lock_for(item_id):
+                    self._set(item_id, stock)
+        for order in orders:
+            if order.status in self.RESERVING_STATUSES and self._stock.get(order.item_id) is not None:
+                with self._lock_for(order.item_id):
+                    self._set(order.item_id, self._get(order.item_id) - order.quantity)
+
+    def _lock_for(self, item_id: str):
+        counter = self._shared.get(item_id)
+        if counter is not None:
+            return counter.get_lock()
+        # crc32 rather than hash(): the same item maps to the same stripe in every process
+        return self._stripes[zlib.crc32(item_id.encode()) % len(self._stripes)]
+
+    def _get(self, item_id: str) -> int:
+        counter = self._shared.get(item_id)
+        return counter.value if counter is not None else self._stock[item_id]
+
+    def _set(self, item_id: str, units: int):
+        # Caller holds _lock_for(item_id)
+        counter = self._shared.get(item_id)
+        if counter is not None:
+            counter.value = units
+        else:
+            self._stock[item_id] = units
+
+    def get_item(self, item_id: str) -> Optional[Item]:
+        return self.catalog.get(item_id)
+
+    def available(self, item_id: str) -> Optional[int]:
+        """Units in stock; None means unlimited."""
+        if item_id not in self._stock:
+            raise ValueError(f"Item {item_id} is not valid.")
+        return None if self._stock[item_id] is None else self._get(item_id)
+
+    def reserve(self, item_id: str, quantity: int):
+        """Atomically takes `quantity` units, or raises ValueError without changing anything."""
+        if item_id not in self._stock:
+            raise ValueError(f"Item {item_id} is not valid.")
+        if self._stock[item_id] is None:
+            return
+        with self._lock_for(item_id):
+            in_stock = self._get(item_id)
+            if in_stock < quantity:
+                raise ValueError(f"Insufficient stock for {item_id}: requested {quantity}, available {in_stock}.")
+            self._set(item_id, in_stock - quantity)
+
+    def release(self, item_id: str, quantity: int):
+        """Returns units taken by reserve (e.g. when the order is cancelled)."""
+        if self._stock.get(item_id) is None:
+            return
+        with self._lock_for(item_id):
+            self._set(item_id, self._get(item_id) + quantity)
+
+    def restock(self, item_id: str, quantity: int):
+        if quantity < 1:
+            raise ValueError(f"Invalid quantity {quantity}.")
+        self.available(item_id) # Validates the item
+        self.release(item_id, quantity)
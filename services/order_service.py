@@ -1,21 +1,28 @@
 import uuid
-import time
 from typing import Optional, Dict
-from repositories.order_repository import InMemoryOrderRepository
-from repositories.customer_repository import InMemoryCustomerRepository
+from repositories.factory import get_order_repository, get_customer_repository
+from repositories.optimistic import update_with_retry
+from repositories.snapshot import RepositorySnapshot
+from repositories.pagination import Page
 from models import Order, Customer, Item
-from constants.enums import OrderStatus
-from constants.config import MAX_ORDER_QUANTITY
+from constants.enums import OrderStatus, OrderEventType
+from constants.config import MAX_ORDER_QUANTITY, HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE
+from services.analytics_service import DeliveryAnalytics
+from services.event_bus import OrderEventBus
+from services.inventory_service import InventoryService
+from utils import clock
+from utils.tracing import traced
 
 class OrderService:
-    def __init__(self):
-        self.order_repo = InMemoryOrderRepository()
-        self.customer_repo = InMemoryCustomerRepository()
-        self.items: Dict[str, Item] = {
-            "ITEM1": Item("ITEM1", "Laptop"),
-            "ITEM2": Item("ITEM2", "Document"),
-            "ITEM3": Item("ITEM3", "Food")
-        }
+    def __init__(self, order_repo=None, customer_repo=None):
+        # Repositories default to the configured backend (see constants.config.REPOSITORY_BACKEND)
+        self.order_repo = order_repo or get_order_repository()
+        self.customer_repo = customer_repo or get_customer_repository()
+        self.analytics = DeliveryAnalytics()
+        self.events = OrderEventBus()
+        # Shared catalog and stock, loaded once per process (see constants.config.ITEM_CATALOG)
+        self.inventory = InventoryService()
+        self.items: Dict[str, Item] = self.inventory.catalog
 
     def onboard_customer(self, id: str, name: str) -> Customer:
         existing = self.customer_repo.get_by_id(id)
@@ -25,14 +32,19 @@ class OrderService:
         self.customer_repo.save(customer)
         return customer
 
-    def create_order(self, customer_id: str, item_id: str, quantity: int = 1) -> Order:
+    def validate_order(self, customer_id: str, item_id: str, quantity: int = 1):
+        """Raises ValueError for a request create_order would refuse, without reserving anything."""
         if not self.customer_repo.get_by_id(customer_id):
             raise ValueError(f"Customer {customer_id} not found.")
-        if item_id not in self.items:
+        if self.inventory.get_item(item_id) is None:
             raise ValueError(f"Item {item_id} is not valid.")
         if quantity < 1 or quantity > MAX_ORDER_QUANTITY:
             raise ValueError(f"Invalid quantity {quantity}.")
 
+    @traced("OrderService.create_order")
+    def create_order(self, customer_id: str, item_id: str, quantity: int = 1) -> Order:
+        self.validate_order(customer_id, item_id, quantity)
+
         order_id = str(uuid.uuid4())[:8]
         order = Order(
             id=order_id, 
@@ -41,30 +53,68 @@ class OrderService:
             quantity=quantity,
             status=OrderStatus.CREATED
         )
-        self.order_repo.save(order)
+        self.inventory.reserve(item_id, quantity) # Raises ValueError when out of stock
+        try:
+            self.order_repo.save(order)
+        except Exception:
+            self.inventory.release(item_id, quantity)
+            raise
+        self.analytics.record_created(order)
+        self.events.publish(OrderEventType.ORDER_CREATED, order, timestamp=order.created_at)
         return order
 
     def get_order(self, order_id: str) -> Optional[Order]:
         return self.order_repo.get_by_id(order_id)
 
-    def transition_state(self, order_id: str, new_status: OrderStatus):
+    def get_customer_history(self, customer_id: str, limit: int = HISTORY_PAGE_SIZE,
+                             cursor: Optional[str] = None) -> Page:
+        """One page of the customer's orders, newest first; pass page.next_cursor for the next one."""
+        return self.order_repo.get_customer_history(customer_id, self._page_size(limit), cursor)
+
+    def get_driver_history(self, driver_id: str, limit: int = HISTORY_PAGE_SIZE,
+                           cursor: Optional[str] = None) -> Page:
+        """One page of the orders assigned to the driver, newest first."""
+        return self.order_repo.get_driver_history(driver_id, self._page_size(limit), cursor)
+
+    @staticmethod
+    def _page_size(limit: int) -> int:
+        if limit < 1 or limit > HISTORY_MAX_PAGE_SIZE:
+            raise ValueError(f"Invalid page size {limit}.")
+        return limit
+
+    def record_rating(self, order_id: str, stars: int) -> Order:
+        """Stores the customer's rating on a delivered order."""
+        def apply(order: Order):
+            if order.status != OrderStatus.DELIVERED:
+                raise ValueError("Can only rate delivered orders")
+            order.rating = stars
+        order = update_with_retry(self.order_repo, order_id, apply, "order.record_rating")
+        if not order:
+            raise ValueError("Order not found")
+        return order
+
+    def orders_snapshot(self) -> RepositorySnapshot:
+        """Consistent read-only view for scans (timeouts, reports) that never blocks writers."""
+        return self.order_repo.snapshot()
+
+    @traced("OrderService.transition_state")
+    def transition_state(self, order_id: str, new_status: OrderStatus, driver_id: Optional[str] = None) -> Order:
         """
         Strict State Machine Implementation.
+        Returns the stored order; driver_id (if given) is recorded in the same write.
         """
-        # We need a lock here to ensure atomic state transition check-and-set
-        # Using the repo's lock is one way, or a lock on the order ID.
-        # Since repo.lock guards the map, not the object properties necessarily (though in this simple repo it's same lock context if we used get_and_update pattern).
-        # Let's rely on synchronized block for this operation.
-        with self.order_repo.lock: 
-            order = self.order_repo.orders.get(order_id) # Direct access to ensure lock coverage
-            if not order:
-                raise ValueError(f"Order {order_id} not found")
-            
+        # Optimistic concurrency instead of holding the repo lock: the transition is validated and
+        # applied to a private copy, then compare-and-set against the version we read. If another
+        # writer got in first, the CAS fails and we re-validate against the fresh state.
+        applied = {}
+
+        def apply(order: Order) -> bool:
+            applied.clear()
             current_status = order.status
             
             # Allow Idempotency (Same status -> Same Status is OK)
             if current_status == new_status:
-                return
+                return False
 
             valid = False
             if current_status == OrderStatus.CREATED:
@@ -84,14 +134,31 @@ class OrderService:
                 raise ValueError(f"Invalid state transition: {current_status.value} -> {new_status.value} for Order {order_id}")
             
             order.status = new_status
+            if driver_id is not None:
+                order.driver_id = driver_id
             
             # timestamp updates
-            now = time.time()
+            now = clock.now()
             if new_status == OrderStatus.ASSIGNED:
                 order.assigned_at = now
             elif new_status == OrderStatus.PICKED_UP:
                 order.picked_up_at = now
             elif new_status == OrderStatus.DELIVERED:
                 order.delivered_at = now
-                
-            self.order_repo.orders[order_id] = order # Persist (if logic changed)
+            elif new_status == OrderStatus.CANCELLED:
+                order.cancelled_at = now
+            applied.update(previous_status=current_status, now=now, written=order)
+            return True
+
+        order = update_with_retry(self.order_repo, order_id, apply, "order.transition_state")
+        if not order:
+            raise ValueError(f"Order {order_id} not found")
+        if applied:
+            # Report the state we wrote, not whatever a later writer may have stored since
+            written = applied["written"]
+            self.analytics.record_transition(written, new_status, applied["now"])
+            self.events.publish(OrderEventType.STATUS_CHANGED, written,
+                                previous_status=applied["previous_status"], timestamp=applied["now"])
+            if new_status == OrderStatus.CANCELLED:
+                self.inventory.release(written.item_id, written.quantity) # Exactly once: only the winning CAS gets here
+        return order
@@ -0,0 +1,123 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from models import DriverTelemetry
+from constants.config import TELEMETRY_HEARTBEAT_INTERVAL_SECONDS, TELEMETRY_MISSED_HEARTBEATS
+from utils import clock
+from utils.instrumented_lock import make_lock
+
+
+class IngestResult(NamedTuple):
+    accepted: int # Updates stored (the newest per driver in the batch)
+    recovered: List[str] # Drivers that were stale and are reporting again
+
+
+class TelemetryService:
+    """
+    Latest location/heartbeat per driver, kept apart from the driver repository so the update
+    stream never takes repository locks or bumps driver versions.
+
+    Batches are coalesced to the newest reading per driver before the store lock is taken, and the
+    lock is held once per batch for plain dict writes. Reads are lock-free dict lookups. A driver is
+    stale once it has missed TELEMETRY_MISSED_HEARTBEATS heartbeats; drivers that never reported
+    are not tracked and never stale.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(TelemetryService, cls).__new__(cls)
+            cls._instance.lock = make_lock("TelemetryService.lock")
+            cls._instance.latest: Dict[str, DriverTelemetry] = {}
+            cls._instance.stale_after = TELEMETRY_HEARTBEAT_INTERVAL_SECONDS * TELEMETRY_MISSED_HEARTBEATS
+            cls._instance._next_stale_at = float("inf") # No reading can be stale until then (see has_stale)
+            cls._instance.counters: Dict[str, int] = {"received": 0, "applied": 0, "coalesced": 0, "out_of_order": 0}
+        return cls._instance
+
+    def ingest(self, updates: Iterable[DriverTelemetry]) -> IngestResult:
+        # Coalesce outside the lock: a driver reporting several times in one batch costs one write
+        newest: Dict[str, DriverTelemetry] = {}
+        received = 0
+        for update in updates:
+            received += 1
+            current = newest.get(update.driver_id)
+            if current is None or update.timestamp >= current.timestamp:
+                newest[update.driver_id] = update
+
+        stale_before = clock.now() - self.stale_after
+        recovered: List[str] = []
+        applied = out_of_order = 0
+        oldest = float("inf")
+        with self.lock:
+            latest = self.latest
+            for driver_id, update in newest.items():
+                previous = latest.get(driver_id)
+                if previous is not None:
+                    if update.timestamp < previous.timestamp: # Delayed delivery of an older reading
+                        out_of_order += 1
+                        continue
+                    if previous.timestamp < stale_before <= update.timestamp:
+                        recovered.append(driver_id)
+                    if update.lat is None and previous.lat is not None: # Heartbeat keeps the last fix
+                        update = DriverTelemetry(driver_id, update.timestamp, previous.lat, previous.lon)
+                latest[driver_id] = update
+                applied += 1
+                oldest = min(oldest, update.timestamp)
+            self._next_stale_at = min(self._next_stale_at, oldest + self.stale_after)
+            counters = self.counters
+            counters["received"] += received
+            counters["applied"] += applied
+            counters["coalesced"] += received - len(newest)
+            counters["out_of_order"] += out_of_order
+        return IngestResult(applied, recovered)
+
+    def heartbeat(self, driver_id: str, timestamp: Optional[float] = None) -> IngestResult:
+        return self.ingest([DriverTelemetry(driver_id, clock.now() if timestamp is None else timestamp)])
+
+    def report_location(self, driver_id: str, lat: float, lon: float, timestamp: Optional[float] = None) -> IngestResult:
+        return self.ingest([DriverTelemetry(driver_id, clock.now() if timestamp is None else timestamp, lat, lon)])
+
+    def get_latest(self, driver_id: str) -> Optional[DriverTelemetry]:
+        return self.latest.get(driver_id)
+
+    def is_stale(self, driver_id: str, now: Optional[float] = None) -> bool:
+        reading = self.latest.get(driver_id)
+        if reading is None:
+            return False
+        return reading.timestamp < (clock.now() if now is None else now) - self.stale_after
+
+    def has_stale(self, now: Optional[float] = None) -> bool:
+        """
+        Whether any tracked driver is stale. O(1) while the oldest reading is still fresh; once it
+        may have gone stale the oldest reading is looked up again.
+        """
+        now = clock.now() if now is None else now
+        if now <= self._next_stale_at:
+            return False
+        with self.lock:
+            oldest = min((r.timestamp for r in self.latest.values()), default=None)
+            self._next_stale_at = float("inf") if oldest is None else oldest + self.stale_after
+        return now > self._next_stale_at
+
+    def stale_drivers(self, now: Optional[float] = None) -> List[str]:
+        stale_before = (clock.now() if now is None else now) - self.stale_after
+        with self.lock:
+            readings = list(self.latest.values())
+        return sorted(r.driver_id for r in readings if r.timestamp < stale_before)
+
+    def forget(self, driver_id: str):
+        """Stops tracking a driver (e.g. offboarded); it is no longer considered stale."""
+        with self.lock:
+            self.latest.pop(driver_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            stats = dict(self.counters)
+            stats["tracked"] = len(self.latest)
+        stats["stale"] = len(self.stale_drivers())
+        return stats
+
+    def clear(self):
+        with self.lock:
+            self.latest.clear()
+            self._next_stale_at = float("inf")
+            for key in self.counters:
+                self.counters[key] = 0
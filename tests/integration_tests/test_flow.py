@@ -2,41 +2,37 @@ import unittest
 import shutil
 import os
 import time
-from unittest.mock import patch
 # We use DeliveryController as the entry point for integration tests
 from controllers.delivery_controller import DeliveryController
 from services.assignment_service import AssignmentService
+from services.delivery_engine import DeliveryEngine
 from services.order_service import OrderService
 from services.driver_service import DriverService
 from constants.enums import OrderStatus, DriverStatus
+from repositories.order_repository import InMemoryOrderRepository
+from repositories.driver_repository import InMemoryDriverRepository
+from repositories.customer_repository import InMemoryCustomerRepository
 
 class TestEndToEnd(unittest.TestCase):
     def setUp(self):
         # We need to clean singleton states because they persist across tests in memory
         AssignmentService._instance = None
+        DeliveryEngine._instance = None
         # OrderService/DriverService are not singletons in my implementation, but their underlying repos ARE.
-        from repositories.order_repository import InMemoryOrderRepository
-        from repositories.driver_repository import InMemoryDriverRepository
-        from repositories.customer_repository import InMemoryCustomerRepository
-        
         InMemoryOrderRepository().clear()
         InMemoryDriverRepository().clear()
         InMemoryCustomerRepository().clear()
-        
-        # Also Scheduler might be running? 
-        # The controller starts a scheduler. We should probably stop it or mock it to avoid loose threads.
-        self.patcher = patch('controllers.delivery_controller.OrderTimeoutScheduler')
-        self.mock_scheduler = self.patcher.start()
+
 
     def tearDown(self):
-        self.patcher.stop()
         InMemoryOrderRepository().clear()
         InMemoryDriverRepository().clear()
         InMemoryCustomerRepository().clear()
         AssignmentService._instance = None
+        DeliveryEngine._instance = None
 
     def test_full_flow_success(self):
-        controller = DeliveryController()
+        controller = DeliveryController(start_scheduler=False) # No timeout thread in tests
         
         # 1. Onboard
         controller.onboard_customer("C1", "Alice")
@@ -65,7 +61,7 @@ class TestEndToEnd(unittest.TestCase):
         self.assertEqual(d1.total_rating, 5)
 
     def test_queue_flow(self):
-        controller = DeliveryController()
+        controller = DeliveryController(start_scheduler=False) # No timeout thread in tests
         controller.onboard_customer("C1", "Alice")
         
         # Create Order (No drivers)
@@ -78,3 +74,20 @@ class TestEndToEnd(unittest.TestCase):
         
         self.assertEqual(order.status, OrderStatus.ASSIGNED)
         self.assertEqual(order.driver_id, "D1")
+
+    def test_idempotent_retries(self):
+        controller = DeliveryController(start_scheduler=False) # No timeout thread in tests
+        controller.onboard_customer("C1", "Alice")
+        controller.onboard_driver("D1", "Bob")
+
+        order_id = controller.create_order("C1", "ITEM1", idempotency_key="req-1")
+        # Client retry after a timeout: same order back, no second order consuming a driver
+        self.assertEqual(controller.create_order("C1", "ITEM1", idempotency_key="req-1"), order_id)
+        self.assertEqual(len(controller.order_service.orders_snapshot()), 1)
+
+        controller.pickup_order("D1", order_id, idempotency_key="req-2")
+        controller.pickup_order("D1", order_id, idempotency_key="req-2")
+        controller.complete_order("D1", order_id, idempotency_key="req-3")
+        controller.complete_order("D1", order_id, idempotency_key="req-3")
+        self.assertEqual(controller.get_order(order_id).status, OrderStatus.DELIVERED)
+        self.assertEqual(controller.get_idempotency_stats()["hits"], 3)
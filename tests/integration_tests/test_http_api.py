@@ -0,0 +1,159 @@
+import http.client
+import json
+import os
+import re
+import socket
+import tempfile
+import shutil
+import unittest
+from unittest import mock
+from controllers.delivery_controller import DeliveryController
+from controllers.http_server import DeliveryHTTPServer, FRAMES_CONTENT_TYPE
+from models import codec
+from services.assignment_service import AssignmentService
+from services.delivery_engine import DeliveryEngine
+from repositories.order_repository import InMemoryOrderRepository
+from repositories.driver_repository import InMemoryDriverRepository
+from repositories.customer_repository import InMemoryCustomerRepository
+from repositories.json_store import JsonSnapshotStore
+from constants.config import ADMISSION_BURST
+
+
+class TestHttpApi(unittest.TestCase):
+    def setUp(self):
+        AssignmentService._instance = None
+        DeliveryEngine._instance = None
+        InMemoryOrderRepository().clear()
+        InMemoryDriverRepository().clear()
+        InMemoryCustomerRepository().clear()
+        self.server = DeliveryHTTPServer(DeliveryController(start_scheduler=False), port=0, stream_chunk_items=2)
+        self.port = self.server.start_background()
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.stop_background()
+        InMemoryOrderRepository().clear()
+        InMemoryDriverRepository().clear()
+        InMemoryCustomerRepository().clear()
+        AssignmentService._instance = None
+        DeliveryEngine._instance = None
+
+    def _call(self, method, path, body=None, headers=None):
+        self.conn.request(method, path, json.dumps(body) if body is not None else None, headers or {})
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read()), response
+
+    def test_order_flow_over_one_connection(self):
+        self.assertEqual(self._call("POST", "/customers", {"id": "C1", "name": "Alice"})[0], 201)
+        self.assertEqual(self._call("POST", "/drivers", {"id": "D1", "name": "Bob"})[0], 201)
+        sock = self.conn.sock # Keep-alive: every request below reuses this socket
+
+        status, body, _ = self._call("POST", "/orders", {"customer_id": "C1", "item_id": "ITEM1"},
+                                     {"Idempotency-Key": "req-1"})
+        self.assertEqual(status, 201)
+        order_id = body["id"]
+        # A retried create with the same key returns the same order
+        self.assertEqual(self._call("POST", "/orders", {"customer_id": "C1", "item_id": "ITEM1"},
+                                    {"Idempotency-Key": "req-1"})[1]["id"], order_id)
+        self.assertEqual(self._call("GET", f"/orders/{order_id}")[1]["status"], "ASSIGNED")
+        self._call("POST", f"/orders/{order_id}/pickup", {"driver_id": "D1"})
+        status, body, _ = self._call("POST", f"/orders/{order_id}/complete", {"driver_id": "D1"})
+        self.assertEqual((status, body["status"]), (200, "DELIVERED"))
+        self.assertEqual(self._call("POST", f"/orders/{order_id}/rating", {"stars": 5})[1]["rating"], 5)
+        self.assertIs(self.conn.sock, sock)
+
+        # Errors map to status codes
+        self.assertEqual(self._call("GET", "/orders/nope")[0], 404)
+        self.assertEqual(self._call("POST", f"/orders/{order_id}/pickup", {"driver_id": "D2"})[0], 400)
+        self.assertEqual(self._call("POST", "/orders", {"customer_id": "C1"})[0], 400)
+        self.assertEqual(self._call("DELETE", "/orders")[0], 405)
+
+        page = self._call("GET", "/customers/C1/orders?limit=1")[1]
+        self.assertEqual([o["id"] for o in page["items"]], [order_id])
+        self.assertIsNone(page["next_cursor"])
+
+        metrics = self._call("GET", "/metrics")[1]
+        self.assertEqual(metrics["POST /orders"]["requests"], 3)
+        self.assertEqual(metrics["POST /orders"]["responses"], {"2xx": 2, "4xx": 1})
+        self.assertGreater(metrics["GET /orders/{id}"]["p99_us"], 0)
+
+    def test_bulk_and_streamed_lists(self):
+        customers = [{"id": f"C{i}", "name": f"Customer {i}"} for i in range(3)]
+        self.assertEqual([r["status"] for r in self._call("POST", "/bulk/customers", customers)[1]], [201] * 3)
+        self._call("POST", "/bulk/drivers", [{"id": f"D{i}", "name": f"Driver {i}", "capacity": 2} for i in range(3)])
+
+        # One customer past the admission burst: the extra orders are refused, the rest go through
+        orders = [{"customer_id": "C0", "item_id": "ITEM2"} for _ in range(ADMISSION_BURST + 2)] + [{"customer_id": "CX"}]
+        results = self._call("POST", "/bulk/orders", orders)[1]
+        self.assertEqual([r["status"] for r in results], [201] * ADMISSION_BURST + [429, 429, 400])
+
+        status, body, response = self._call("GET", "/orders")
+        self.assertEqual(response.getheader("Transfer-Encoding"), "chunked")
+        self.assertEqual(len(body), ADMISSION_BURST)
+        self.assertEqual(len(self._call("GET", "/drivers")[1]), 3)
+        self.assertEqual(len(self._call("GET", "/drivers/top?limit=2")[1]), 2)
+        self.assertEqual(self._call("GET", "/events?offset=0&limit=0")[1], [])
+
+        # Binary feed: the same events as codec frames
+        events = self._call("GET", "/events?offset=0&limit=5")[1]
+        self.conn.request("GET", "/events?offset=0&limit=5", headers={"Accept": FRAMES_CONTENT_TYPE})
+        frames = codec.decode_many(self.conn.getresponse().read())
+        self.assertEqual([e.offset for e in frames], [e["offset"] for e in events])
+
+    def test_pipelined_requests_answered_in_order(self):
+        self._call("POST", "/customers", {"id": "C1", "name": "Alice"})
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            body = json.dumps({"customer_id": "C1", "item_id": "ITEM1"}).encode()
+            create = (b"POST /orders HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            sock.sendall(create + b"GET /orders/nope HTTP/1.1\r\nHost: x\r\n\r\n"
+                         + b"GET /orders HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+            data = b""
+            while True:
+                received = sock.recv(65536)
+                if not received:
+                    break # Server closes after the last request
+                data += received
+        statuses = re.findall(rb"HTTP/1\.1 (\d{3}) ", data) # Bodies carry no trailing CRLF
+        self.assertEqual(statuses, [b"201", b"404", b"200"])
+
+    def test_start_background_raises_when_the_port_is_taken(self):
+        server = DeliveryHTTPServer(DeliveryController(start_scheduler=False), port=self.port)
+        with self.assertRaises(OSError):
+            server.start_background()
+        server.stop_background() # Nothing left to stop
+
+    def test_persisting_server_saves_and_reloads(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+
+        def persisting_server():
+            controller = DeliveryController(start_scheduler=False)
+            controller.engine.store = JsonSnapshotStore(tmp_dir, *(os.path.join(tmp_dir, f"{n}.json")
+                                                                   for n in ("customers", "drivers", "orders")))
+            server = DeliveryHTTPServer(controller, port=0, persist=True)
+            return controller, server, http.client.HTTPConnection("127.0.0.1", server.start_background(), timeout=5)
+
+        controller, server, self.conn = persisting_server()
+        self._call("POST", "/customers", {"id": "C1", "name": "Alice"})
+        order_id = self._call("POST", "/orders", {"customer_id": "C1", "item_id": "ITEM1"})[1]["id"]
+        with mock.patch.object(controller, "persist") as persist:
+            self._call("POST", "/telemetry", [{"driver_id": "D1", "timestamp": 1.0, "lat": 0.0, "lon": 0.0}])
+            self._call("POST", f"/orders/{order_id}/rating", {"stars": 9})
+        self.assertEqual(persist.call_count, 1) # Only the rating: telemetry is not saved state
+        self.conn.close()
+        server.stop_background()
+        controller.stop() # Drains the scheduled write
+
+        # Restart: the new server loads what the first one saved before serving
+        InMemoryOrderRepository().clear()
+        InMemoryCustomerRepository().clear()
+        DeliveryEngine._instance = None
+        controller, server, self.conn = persisting_server()
+        self.addCleanup(server.stop_background)
+        self.assertEqual(self._call("GET", f"/orders/{order_id}")[1]["customer_id"], "C1")
+        self.assertEqual(self._call("GET", "/customers/C1/orders")[1]["items"][0]["id"], order_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from controllers.partitioned_controller import PartitionedDeliveryController
+from constants.enums import OrderStatus
+
+class TestPartitionedFlow(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.controller = PartitionedDeliveryController(num_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.controller.close()
+
+    def _zones_on_different_workers(self):
+        zones = [f"zone-{i}" for i in range(16)]
+        north = zones[0]
+        south = next(z for z in zones if self.controller._worker_for_zone(z) is not self.controller._worker_for_zone(north))
+        return north, south
+
+    def test_orders_stay_in_their_partition(self):
+        north, south = self._zones_on_different_workers()
+        self.controller.onboard_customer("C1", "Alice", north)
+        self.controller.onboard_customer("C2", "Carol", south)
+        self.controller.onboard_driver("D1", "Bob", north)
+
+        # South has no driver, so its order waits even though D1 is idle in another partition
+        o1 = self.controller.create_order("C1", "ITEM1")
+        o2 = self.controller.create_order("C2", "ITEM1")
+        self.assertEqual(self.controller.get_order(o1).status, OrderStatus.ASSIGNED)
+        self.assertEqual(self.controller.get_order(o2).status, OrderStatus.CREATED)
+
+        self.controller.onboard_driver("D2", "Dan", south)
+        self.assertEqual(self.controller.get_order(o2).driver_id, "D2")
+
+        self.controller.pickup_order("D1", o1)
+        self.controller.complete_order("D1", o1)
+        self.controller.rate_driver(o1, 5)
+        self.assertEqual(self.controller.get_order(o1).status, OrderStatus.DELIVERED)
+
+        # Errors raised in a worker surface in the caller
+        with self.assertRaises(ValueError):
+            self.controller.pickup_order("D1", o2)
+
+        # Cross-partition leaderboard gathers drivers from every worker
+        top = self.controller.get_top_drivers()
+        self.assertEqual([d.id for d in top][:1], ["D1"])
+        self.assertEqual({d.id for d in self.controller.get_all_drivers()}, {"D1", "D2"})
+
+    def test_stock_shared_across_partitions(self):
+        north, south = self._zones_on_different_workers()
+        self.controller.onboard_customer("C3", "Erin", north)
+        self.controller.onboard_customer("C4", "Frank", south)
+        counter = self.controller.stock["ITEM3"]
+        with counter.get_lock():
+            previous, counter.value = counter.value, 3
+        try:
+            # Each worker reserves from the router's counter, so the second order cannot oversell
+            self.controller.create_order("C3", "ITEM3", 2)
+            with self.assertRaises(ValueError):
+                self.controller.create_order("C4", "ITEM3", 2)
+            self.assertEqual(self.controller.available_stock("ITEM3"), 1)
+            self.assertIsNone(self.controller.available_stock("ITEM2"))
+        finally:
+            with counter.get_lock():
+                counter.value = previous
+
+    def test_unknown_customer(self):
+        with self.assertRaises(ValueError):
+            self.controller.create_order("CX", "ITEM1")
@@ -0,0 +1,34 @@
+import unittest
+from simulation.simulator import DeliverySimulator, SimulationConfig
+from services.assignment_service import AssignmentService
+from utils import clock
+from utils.clock import SystemClock
+
+class TestSimulation(unittest.TestCase):
+    def tearDown(self):
+        AssignmentService._instance = None
+
+    def test_simulated_hours_run_fast(self):
+        config = SimulationConfig(duration_seconds=4 * 3600, num_drivers=10, arrivals_per_minute=1.0, seed=7)
+        report = DeliverySimulator(config).run()
+
+        self.assertIsInstance(clock.get_clock(), SystemClock) # Restored after the run
+        self.assertGreater(report.orders_created, 100)
+        self.assertGreater(report.delivered, 0)
+        self.assertLessEqual(report.delivered + report.timed_out + report.cancelled_by_customer, report.orders_created)
+        self.assertGreater(report.speedup, 100)
+        self.assertLessEqual(report.sla_met_ratio, 1.0)
+
+    def test_refused_orders_do_not_stop_arrivals(self):
+        # Far more demand than two drivers can take: intake sheds orders for the whole run
+        config = SimulationConfig(duration_seconds=3600, num_drivers=2, arrivals_per_minute=60.0, seed=5)
+        report = DeliverySimulator(config).run()
+        self.assertGreater(report.orders_rejected, 0)
+        self.assertGreater(report.orders_created + report.orders_rejected, 3000) # About 3600 arrivals
+
+    def test_deterministic_for_seed(self):
+        config = SimulationConfig(duration_seconds=3600, num_drivers=5, seed=3)
+        first = DeliverySimulator(config).run()
+        second = DeliverySimulator(config).run()
+        self.assertEqual((first.orders_created, first.orders_rejected, first.delivered, first.timed_out),
+                         (second.orders_created, second.orders_rejected, second.delivered, second.timed_out))
@@ -0,0 +1,292 @@
+"""
+Concurrency stress suite: worker threads run a random mix of operations (orders created, picked up,
+completed, cancelled and rated, timeout sweeps) through DeliveryController and DeliveryService at
+once, then the shared state is checked for invariants that a lost update or missed wake-up breaks.
+
+    python -m pytest -q tests/stress_tests
+    python -m tests.stress_tests.test_concurrency_stress --ops 20000 --threads 16   # scaling report
+
+STRESS_OPS and STRESS_MAX_THREADS size the runs made under pytest.
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+from typing import Any, Dict, List
+from controllers.delivery_controller import DeliveryController
+from services.delivery_service import DeliveryService
+from services.delivery_engine import DeliveryEngine
+from services.assignment_service import AssignmentService
+from services.telemetry_service import TelemetryService
+from repositories.order_repository import InMemoryOrderRepository
+from repositories.driver_repository import InMemoryDriverRepository
+from repositories.customer_repository import InMemoryCustomerRepository
+from repositories.json_store import JsonSnapshotStore
+from constants.enums import OrderStatus, DriverStatus
+from utils import clock
+from utils.clock import VirtualClock
+from utils.logger import logger
+
+STRESS_OPS = int(os.environ.get("STRESS_OPS", "3000"))
+STRESS_MAX_THREADS = int(os.environ.get("STRESS_MAX_THREADS", "8"))
+NUM_CUSTOMERS = 200
+NUM_DRIVERS = 40
+ITEMS = ("ITEM1", "ITEM2", "ITEM3")
+# Relative weight of each operation in the mix
+OPERATION_MIX = {"create": 40, "pickup": 20, "complete": 20, "cancel": 8, "rate": 6, "sweep": 6}
+_ACTIVE = (OrderStatus.ASSIGNED, OrderStatus.PICKED_UP)
+
+
+class StressRun:
+    """
+    A fresh engine (singletons reset, JSON snapshots in a temp dir, a virtual clock that the sweep
+    operation advances) shared by one DeliveryController and one DeliveryService.
+    """
+    def __init__(self, seed: int = 7):
+        self.seed = seed
+        self.tmp_dir = tempfile.mkdtemp()
+        self.clock = VirtualClock(time.time())
+        self.previous_clock = clock.set_clock(self.clock)
+        self.previous_level = logger.level
+        logger.setLevel(logging.CRITICAL) # Expected races (cancel vs. pickup, ...) log errors by design
+        _reset_singletons()
+        self.engine = DeliveryEngine()
+        self.engine.store = JsonSnapshotStore(self.tmp_dir, *(os.path.join(self.tmp_dir, f"{name}.json")
+                                                              for name in ("customers", "drivers", "orders")))
+        self.controller = DeliveryController(start_scheduler=False) # Timeouts come from the sweep operation
+        self.service = DeliveryService(start_scheduler=False)
+        self.scheduler = self.engine.scheduler
+        self.step = self.scheduler.timeout_seconds / 50 # Virtual time per sweep
+        for i in range(NUM_CUSTOMERS):
+            self.controller.onboard_customer(f"C{i}", f"Customer {i}")
+        for i in range(NUM_DRIVERS):
+            frontend = self.controller if i % 2 else self.service
+            frontend.onboard_driver(f"D{i}", f"Driver {i}", capacity=1 + i % 3)
+        self.order_ids: List[str] = []
+        self.ids_lock = threading.Lock()
+        self.outcomes: Counter = Counter()
+        self.errors: List[BaseException] = []
+
+    def close(self):
+        self.engine.stop()
+        _reset_singletons()
+        clock.set_clock(self.previous_clock)
+        logger.setLevel(self.previous_level)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    # --- Operations (each picks its own target; ValueError means the race was lost, which is fine) ---
+    def _create(self, rng: random.Random):
+        customer_id, item_id = f"C{rng.randrange(NUM_CUSTOMERS)}", rng.choice(ITEMS)
+        if rng.random() < 0.5:
+            order_id = self.controller.create_order(customer_id, item_id)
+        else:
+            order_id = self.service.create_order(customer_id, item_id).id
+        with self.ids_lock:
+            self.order_ids.append(order_id)
+
+    def _driver_order(self, rng: random.Random, status: OrderStatus):
+        driver = self.engine.driver_service.get_driver(f"D{rng.randrange(NUM_DRIVERS)}")
+        for order_id in list(driver.active_order_ids):
+            order = self.engine.order_service.get_order(order_id)
+            if order and order.status == status:
+                return driver.id, order_id
+        return None
+
+    def _pickup(self, rng: random.Random):
+        target = self._driver_order(rng, OrderStatus.ASSIGNED)
+        if target:
+            (self.controller.pickup_order if rng.random() < 0.5 else self.service.pickup_order)(*target)
+
+    def _complete(self, rng: random.Random):
+        target = self._driver_order(rng, OrderStatus.PICKED_UP)
+        if target:
+            (self.controller.complete_order if rng.random() < 0.5 else self.service.complete_order)(*target)
+
+    def _random_order(self, rng: random.Random):
+        with self.ids_lock:
+            return rng.choice(self.order_ids) if self.order_ids else None
+
+    def _cancel(self, rng: random.Random):
+        order_id = self._random_order(rng)
+        if order_id:
+            (self.controller.cancel_order if rng.random() < 0.5 else self.service.cancel_order)(order_id)
+
+    def _rate(self, rng: random.Random):
+        order_id = self._random_order(rng)
+        if order_id:
+            (self.controller.rate_driver if rng.random() < 0.5 else self.service.rate_driver)(order_id, rng.randint(1, 5))
+
+    def _sweep(self, rng: random.Random):
+        self.clock.advance(self.step)
+        self.scheduler.check_timeouts()
+
+    def worker(self, index: int, ops: int):
+        rng = random.Random(self.seed * 1000 + index)
+        names, weights = list(OPERATION_MIX), list(OPERATION_MIX.values())
+        outcomes: Counter = Counter()
+        for name in rng.choices(names, weights, k=ops):
+            try:
+                getattr(self, f"_{name}")(rng)
+                outcomes[name] += 1
+            except ValueError: # Lost a race, rate limited or invalid by now: expected under contention
+                outcomes[f"{name}_rejected"] += 1
+            except BaseException as e:
+                self.errors.append(e)
+                return
+        with self.ids_lock:
+            self.outcomes.update(outcomes)
+
+    def run(self, num_threads: int, total_ops: int) -> float:
+        """Runs total_ops operations split over num_threads; returns the wall time in seconds."""
+        threads = [threading.Thread(target=self.worker, args=(i, total_ops // num_threads), name=f"stress-{i}")
+                   for i in range(num_threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        # Quiesce: a final sweep cancels what expired while queued, as the scheduler thread would
+        self.scheduler.check_timeouts()
+        return elapsed
+
+
+def _reset_singletons():
+    DeliveryService._instance = None
+    DeliveryEngine._instance = None
+    AssignmentService._instance = None
+    InMemoryOrderRepository().clear()
+    InMemoryDriverRepository().clear()
+    InMemoryCustomerRepository().clear()
+    TelemetryService().clear()
+
+
+def check_invariants(engine: DeliveryEngine) -> List[str]:
+    """Violations of the dispatch invariants in a quiescent engine (empty when consistent)."""
+    violations = []
+    orders = engine.order_service.orders_snapshot()
+    drivers = engine.driver_service.drivers_snapshot()
+    holder: Dict[str, str] = {}
+    for driver in drivers.values():
+        active = driver.active_order_ids
+        if len(active) > driver.capacity:
+            violations.append(f"Driver {driver.id} holds {len(active)} orders with capacity {driver.capacity}")
+        if len(set(active)) != len(active):
+            violations.append(f"Driver {driver.id} holds an order twice: {active}")
+        if (driver.status == DriverStatus.BUSY) != (driver.remaining_capacity <= 0):
+            violations.append(f"Driver {driver.id} is {driver.status.value} with {len(active)}/{driver.capacity} orders")
+        for order_id in active:
+            if order_id in holder:
+                violations.append(f"Order {order_id} assigned to both {holder[order_id]} and {driver.id}")
+            holder[order_id] = driver.id
+            order = orders.get(order_id)
+            if order is None or order.status not in _ACTIVE or order.driver_id != driver.id:
+                state = order and (order.status.value, order.driver_id)
+                violations.append(f"Driver {driver.id} holds order {order_id} that is {state}")
+
+    created = set()
+    for order in orders.values():
+        if order.status in _ACTIVE and holder.get(order.id) != order.driver_id:
+            violations.append(f"Order {order.id} is {order.status.value} for {order.driver_id}, "
+                              f"who does not hold it")
+        if order.status == OrderStatus.CREATED:
+            created.add(order.id)
+
+    queued = set(engine.assignment_service.pending_orders)
+    if queued != created:
+        violations.append(f"Queue and CREATED orders differ: only queued {sorted(queued - created)[:5]}, "
+                          f"only CREATED {sorted(created - queued)[:5]}")
+    free = [d.id for d in drivers.values() if d.status == DriverStatus.AVAILABLE and d.remaining_capacity > 0]
+    if created and free:
+        violations.append(f"{len(created)} orders wait while drivers {free[:5]} have spare capacity")
+    return violations
+
+
+def scaling_report(thread_counts: List[int], total_ops: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """
+    Runs the same workload at each thread count on a fresh engine. Each row carries its own
+    "violations": invariant violations and unexpected errors seen at that thread count.
+    """
+    rows = []
+    for num_threads in thread_counts:
+        run = StressRun(seed)
+        try:
+            elapsed = run.run(num_threads, total_ops)
+            violations = [f"Unexpected {error!r}" for error in run.errors] + check_invariants(run.engine)
+            done = sum(run.outcomes.values())
+            rows.append({"threads": num_threads, "ops": done, "seconds": elapsed,
+                         "ops_per_second": done / elapsed if elapsed else 0.0,
+                         "rejected": sum(v for k, v in run.outcomes.items() if k.endswith("_rejected")) / max(done, 1),
+                         "violations": violations})
+        finally:
+            run.close()
+    base = rows[0]["ops_per_second"]
+    for row in rows:
+        row["speedup"] = row["ops_per_second"] / base if base else 0.0
+    return rows
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'threads':>8} {'ops':>8} {'seconds':>9} {'ops/s':>10} {'speedup':>8} {'rejected':>9} {'violations':>11}"]
+    for row in rows:
+        lines.append(f"{row['threads']:>8} {row['ops']:>8} {row['seconds']:>9.2f} {row['ops_per_second']:>10,.0f} "
+                     f"{row['speedup']:>7.2f}x {row['rejected']:>8.1%} {len(row['violations']):>11}")
+    for row in rows:
+        lines.extend(f"{row['threads']} threads: {violation}" for violation in row["violations"][:20])
+    return "\n".join(lines)
+
+
+def _thread_counts(max_threads: int) -> List[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_threads:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_threads:
+        counts.append(max_threads)
+    return counts
+
+
+class TestConcurrencyStress(unittest.TestCase):
+    def test_invariants_under_contention(self):
+        run = StressRun(seed=11)
+        try:
+            run.run(STRESS_MAX_THREADS, STRESS_OPS)
+            self.assertEqual(run.errors, [])
+            self.assertEqual(check_invariants(run.engine), [])
+            # Every order a worker was told about exists exactly once
+            orders = run.engine.order_service.orders_snapshot()
+            self.assertEqual(len(run.order_ids), len(set(run.order_ids)))
+            self.assertEqual(set(run.order_ids), set(orders))
+            self.assertGreater(run.outcomes["complete"], 0) # The mix actually reached delivery
+        finally:
+            run.close()
+
+    def test_throughput_scaling(self):
+        rows = scaling_report(_thread_counts(STRESS_MAX_THREADS), STRESS_OPS // 2)
+        self.assertEqual([row["threads"] for row in rows], _thread_counts(STRESS_MAX_THREADS))
+        for row in rows:
+            with self.subTest(threads=row["threads"]):
+                self.assertGreater(row["ops_per_second"], 0)
+                self.assertEqual(row["violations"], [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delivery throughput from 1 to N threads, with invariant checks.")
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=STRESS_MAX_THREADS)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rows = scaling_report(_thread_counts(args.threads), args.ops, args.seed)
+    print(format_report(rows))
+    if any(row["violations"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import unittest
+import pickle
+from services.admission_controller import AdmissionController, OrderRejectedError
+from utils import clock
+from utils.clock import VirtualClock
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=1000.0)
+        self.previous_clock = clock.set_clock(self.clock)
+        self.admission = AdmissionController(rate_per_minute=60, burst=2, backlog_limit=5)
+
+    def tearDown(self):
+        clock.set_clock(self.previous_clock)
+
+    def test_token_bucket_per_customer(self):
+        self.admission.admit("C1", 0, 1)
+        self.admission.admit("C1", 0, 1)
+        with self.assertRaises(OrderRejectedError) as ctx:
+            self.admission.admit("C1", 0, 1)
+        self.assertEqual(ctx.exception.reason, "rate_limited")
+        self.assertAlmostEqual(ctx.exception.retry_after, 1.0)
+
+        self.admission.admit("C2", 0, 1) # Other customers are unaffected
+        self.clock.advance(1)
+        self.admission.admit("C1", 0, 1) # Refilled at one token per second
+
+    def test_rejects_when_saturated(self):
+        self.admission.admit("C1", 5, 1) # Backlog 4 < 5
+        with self.assertRaises(OrderRejectedError) as ctx:
+            self.admission.admit("C2", 5, 0)
+        self.assertEqual(ctx.exception.reason, "saturated")
+        self.assertIsInstance(ctx.exception, ValueError)
+
+        stats = self.admission.stats()
+        self.assertEqual((stats["admitted"], stats["saturated"], stats["rate_limited"]), (1, 1, 0))
+        self.assertAlmostEqual(stats["shed_ratio"], 0.5)
+
+    def test_error_survives_pickling(self):
+        error = pickle.loads(pickle.dumps(OrderRejectedError("busy", "saturated", 30)))
+        self.assertEqual((str(error), error.reason, error.retry_after), ("busy", "saturated", 30))
+
+if __name__ == '__main__':
+    unittest.main()
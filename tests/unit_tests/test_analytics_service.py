@@ -0,0 +1,61 @@
+import unittest
+from services.analytics_service import DeliveryAnalytics, offline_report
+from constants.enums import OrderStatus
+from models import Order
+
+class TestDeliveryAnalytics(unittest.TestCase):
+    def setUp(self):
+        DeliveryAnalytics._instance = None
+        self.analytics = DeliveryAnalytics()
+        self.analytics.window_seconds = 60
+        self.analytics.bucket_seconds = 10
+        self.analytics.reset()
+
+    def tearDown(self):
+        DeliveryAnalytics._instance = None
+
+    def _lifecycle(self, order_id: str, start: float) -> Order:
+        order = Order(id=order_id, customer_id="C1", item_id="ITEM1", created_at=start)
+        self.analytics.record_created(order)
+        order.assigned_at = start + 2
+        self.analytics.record_transition(order, OrderStatus.ASSIGNED, now=start + 2)
+        order.picked_up_at = start + 5
+        self.analytics.record_transition(order, OrderStatus.PICKED_UP, now=start + 5)
+        order.delivered_at = start + 15
+        order.status = OrderStatus.DELIVERED
+        self.analytics.record_transition(order, OrderStatus.DELIVERED, now=start + 15)
+        return order
+
+    def test_window_aggregates(self):
+        self._lifecycle("O1", 1000)
+        self._lifecycle("O2", 1010)
+        cancelled = Order(id="O3", customer_id="C1", item_id="ITEM1", created_at=1020)
+        self.analytics.record_created(cancelled)
+        self.analytics.record_transition(cancelled, OrderStatus.CANCELLED, now=1030)
+        self.analytics.record_timeout(now=1030)
+
+        stats = self.analytics.snapshot(now=1030)
+        self.assertAlmostEqual(stats["orders_per_minute"], 3.0)
+        self.assertAlmostEqual(stats["avg_time_to_assign"], 2.0)
+        self.assertAlmostEqual(stats["avg_pickup_duration"], 3.0)
+        self.assertAlmostEqual(stats["avg_delivery_duration"], 10.0)
+        self.assertAlmostEqual(stats["cancellation_rate"], 1 / 3)
+        self.assertAlmostEqual(stats["timeout_rate"], 1 / 3)
+
+    def test_old_buckets_expire(self):
+        self._lifecycle("O1", 1000)
+        self.assertEqual(self.analytics.snapshot(now=1050)["orders_per_minute"], 1.0)
+        # Creation bucket [1000, 1010) falls out of the 60s window
+        self.assertEqual(self.analytics.snapshot(now=1065)["orders_per_minute"], 0.0)
+        self.assertAlmostEqual(self.analytics.snapshot(now=1065)["avg_delivery_duration"], 10.0)
+        # Everything expires after a full idle window
+        self.assertEqual(self.analytics.snapshot(now=5000)["avg_delivery_duration"], 0.0)
+
+    def test_offline_report(self):
+        orders = [self._lifecycle(f"O{i}", 1000 + i) for i in range(5)]
+        orders.append(Order(id="OX", customer_id="C1", item_id="ITEM1", status=OrderStatus.CANCELLED, created_at=1000))
+        report = offline_report(orders)
+        self.assertEqual(report["delivery_duration"]["count"], 5)
+        self.assertAlmostEqual(report["end_to_end"]["p95"], 15.0)
+        self.assertEqual(report["outcomes"]["DELIVERED"], 5)
+        self.assertEqual(report["outcomes"]["CANCELLED"], 1)
@@ -62,3 +62,69 @@ class TestAssignmentService(unittest.TestCase):
         self.assertEqual(order.status, OrderStatus.ASSIGNED)
         self.assertEqual(order.driver_id, "D1")
         self.assertNotIn(order.id, self.service.pending_orders)
+
+    def test_batching_with_capacity(self):
+        self.service.order_service.onboard_customer("C1", "Alice")
+        self.service.order_service.onboard_customer("C2", "Carol")
+        o1 = self.service.order_service.create_order("C1", "ITEM1")
+        o2 = self.service.order_service.create_order("C1", "ITEM3")
+        o3 = self.service.order_service.create_order("C2", "ITEM2")
+        for o in (o1, o2, o3):
+            self.service.queue_order(o.id)
+
+        # A driver with room for three takes C1's two orders as one batch (food first);
+        # C2's order is not batch-compatible so the next pass assigns it separately
+        d1 = self.service.driver_service.onboard_driver("D1", "Bob", capacity=3)
+        self.service.on_driver_available("D1")
+
+        self.assertEqual(o1.driver_id, "D1")
+        self.assertEqual(o2.driver_id, "D1")
+        self.assertEqual(o3.driver_id, "D1")
+        self.assertEqual(d1.active_order_ids, [o2.id, o1.id, o3.id])
+        self.assertEqual(d1.status, DriverStatus.BUSY)
+
+    def test_prefers_least_loaded_driver(self):
+        self.service.order_service.onboard_customer("C1", "Alice")
+        self.service.order_service.onboard_customer("C2", "Carol")
+        d1 = self.service.driver_service.onboard_driver("D1", "Bob", capacity=2)
+        d2 = self.service.driver_service.onboard_driver("D2", "Dan", capacity=2)
+
+        o1 = self.service.order_service.create_order("C1", "ITEM1")
+        self.service.queue_order(o1.id)
+        o2 = self.service.order_service.create_order("C2", "ITEM1")
+        self.service.queue_order(o2.id)
+
+        # Second order goes to the idle driver before anyone gets a second load
+        self.assertNotEqual(o1.driver_id, o2.driver_id)
+        self.assertEqual(d1.status, DriverStatus.AVAILABLE)
+        self.assertEqual(self.service.driver_service.repo.available_capacity(), 2)
+
+    def test_failed_driver_update_requeues_order(self):
+        self.service.order_service.onboard_customer("C1", "Alice")
+        d1 = self.service.driver_service.onboard_driver("D1", "Bob")
+        order = self.service.order_service.create_order("C1", "ITEM1")
+
+        # The driver update fails (e.g. retries exhausted): the order is never left ASSIGNED
+        assign_order = self.service.driver_service.assign_order
+        self.service.driver_service.assign_order = MagicMock(side_effect=ValueError("Too much contention"))
+        self.service.queue_order(order.id)
+        self.assertEqual(order.status, OrderStatus.CREATED)
+        self.assertIsNone(order.driver_id)
+        self.assertIn(order.id, self.service.pending_orders)
+
+        # Next trigger succeeds
+        self.service.driver_service.assign_order = assign_order
+        self.service.on_driver_available("D1")
+        self.assertEqual(order.driver_id, "D1")
+        self.assertEqual(d1.active_order_ids, [order.id])
+
+    def test_failed_order_update_releases_driver(self):
+        self.service.order_service.onboard_customer("C1", "Alice")
+        d1 = self.service.driver_service.onboard_driver("D1", "Bob")
+        order = self.service.order_service.create_order("C1", "ITEM1")
+
+        self.service.order_service.transition_state = MagicMock(side_effect=ValueError("Invalid transition"))
+        self.service.queue_order(order.id)
+        self.assertEqual(order.status, OrderStatus.CREATED)
+        self.assertEqual(d1.active_order_ids, [])
+        self.assertEqual(d1.status, DriverStatus.AVAILABLE)
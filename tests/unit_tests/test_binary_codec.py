@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from dataclasses import asdict, replace
+from models import Customer, Driver, Order, OrderEvent
+from models import codec
+from constants.enums import OrderStatus, DriverStatus, OrderEventType
+from repositories.binary_store import BinarySnapshotStore
+from repositories.json_store import JsonSnapshotStore, DateTimeEncoder
+from repositories.order_repository import InMemoryOrderRepository
+from repositories.driver_repository import InMemoryDriverRepository
+from repositories.customer_repository import InMemoryCustomerRepository
+
+
+def _entities():
+    return [
+        Order(id="O1", customer_id="C1", item_id="ITEM1", created_at=1700000000.25),
+        Order(id="O2", customer_id="C1", item_id="ITEM3", quantity=300, status=OrderStatus.DELIVERED,
+              driver_id="D1", created_at=1.5, assigned_at=2.5, picked_up_at=3.5, delivered_at=4.5,
+              rating=5, version=70000),
+        Driver(id="D1", name="Zoë Ωmega", status=DriverStatus.BUSY, vehicle_type="Four Wheeler", capacity=3,
+               active_order_ids=["O3", "O4"], total_rating=13.0, ratings_count=3, version=9),
+        Driver(id="D2", name=""),
+        Customer(id="C1", name="Alice"),
+        OrderEvent(offset=2 ** 40, type=OrderEventType.STATUS_CHANGED, order_id="O2", customer_id="C1",
+                   status=OrderStatus.ASSIGNED, driver_id="D1", previous_status=OrderStatus.CREATED,
+                   timestamp=12.75, version=2),
+        OrderEvent(offset=0, type=OrderEventType.ORDER_CREATED, order_id="O1", customer_id="C1",
+                   status=OrderStatus.CREATED),
+    ]
+
+
+class TestBinaryCodec(unittest.TestCase):
+    def test_round_trip(self):
+        entities = _entities()
+        for entity in entities:
+            self.assertEqual(codec.decode(codec.encode(entity)), entity)
+        self.assertEqual(codec.decode_many(codec.encode_many(entities)), entities)
+        self.assertEqual(codec.decode_many(b""), [])
+        cancelled = Order(id="O3", customer_id="C1", item_id="ITEM1", status=OrderStatus.CANCELLED,
+                          created_at=1.0, cancelled_at=2.0, rating=1)
+        self.assertEqual(codec.decode(codec.encode(cancelled)), cancelled)
+
+    def test_order_head(self):
+        order = _entities()[1]
+        head = codec.decode_order_head(codec.encode(order))
+        self.assertEqual(head, (order.id, order.customer_id, order.item_id, order.quantity, order.status,
+                                order.created_at, order.driver_id))
+        self.assertIsNone(codec.decode_order_head(codec.encode(_entities()[0])).driver_id)
+        with self.assertRaises(ValueError):
+            codec.decode_order_head(codec.encode(_entities()[2]))
+
+    def test_rejects_bad_input(self):
+        data = codec.encode(_entities()[1])
+        for bad in (data[:-1], data + b"\0", b"\x63" + data[1:], b""):
+            with self.assertRaises(ValueError):
+                codec.decode(bad)
+        with self.assertRaises(ValueError):
+            codec.decode_many(codec.encode_many(_entities())[:-3])
+        with self.assertRaises(ValueError):
+            codec.encode(Order(id="O1", customer_id="C1", item_id="ITEM1", quantity=-1))
+        with self.assertRaises(ValueError):
+            codec.encode({"id": "O1"})
+
+    def test_smaller_than_json(self):
+        order = _entities()[1]
+        snapshot_json = json.dumps(asdict(order), cls=DateTimeEncoder, indent=2).encode()
+        compact_json = json.dumps(asdict(order), cls=DateTimeEncoder, separators=(",", ":")).encode()
+        binary = codec.encode(order)
+        self.assertLess(len(binary) * 3, len(compact_json))
+        self.assertLess(len(compact_json), len(snapshot_json))
+
+
+class TestBinaryPersistence(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repos = (InMemoryCustomerRepository(), InMemoryDriverRepository(), InMemoryOrderRepository())
+        for repo in self.repos:
+            repo.clear()
+
+    def tearDown(self):
+        for repo in self.repos:
+            repo.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir, name)
+
+    def test_snapshot_round_trip_and_json_fallback(self):
+        json_store = JsonSnapshotStore(self.tmp_dir, *(self._path(f"{n}.json") for n in ("customers", "drivers", "orders")))
+        store = BinarySnapshotStore(self.tmp_dir, *(self._path(f"{n}.bin") for n in ("customers", "drivers", "orders")),
+                                    fallback=json_store)
+        entities = _entities()
+        customers = [e for e in entities if isinstance(e, Customer)]
+        drivers = [e for e in entities if isinstance(e, Driver)]
+        orders = [e for e in entities if isinstance(e, Order)]
+
+        # First start after switching formats: the JSON snapshot is what gets loaded
+        json_store.save(customers, drivers, orders)
+        self.assertEqual(store.load_into(*self.repos), 5)
+        store.save(customers, drivers, orders)
+        for repo in self.repos:
+            repo.clear()
+        os.remove(json_store.orders_file) # From now on only the binary files are read
+        self.assertEqual(store.load_into(*self.repos), 5)
+        # Repositories bump the version on save, as with the JSON snapshot
+        self.assertEqual(replace(self.repos[1].get_by_id("D1"), version=0), replace(drivers[0], version=0))
+        self.assertEqual(replace(self.repos[2].get_by_id("O2"), version=0), replace(orders[1], version=0))
+        self.assertEqual([o.id for o in self.repos[2].get_customer_history("C1", 10).items], ["O1", "O2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+from repositories.sqlite_repository import SqliteConnectionPool, SqliteOrderRepository
+from repositories.cached_repository import CachedRepository
+from utils.lru_cache import LRUCache
+from models import Order
+
+class TestLRUCache(unittest.TestCase):
+    def test_size_based_eviction(self):
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a") # "b" is now least recently used
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(max_size=10, ttl_seconds=5)
+        with patch('utils.lru_cache.time.monotonic', return_value=100.0):
+            cache.put("a", 1)
+        with patch('utils.lru_cache.time.monotonic', return_value=104.0):
+            self.assertEqual(cache.get("a"), 1)
+        with patch('utils.lru_cache.time.monotonic', return_value=106.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+
+class TestCachedRepository(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pool = SqliteConnectionPool(os.path.join(self.tmp_dir, "test.db"))
+        self.inner = MagicMock(wraps=SqliteOrderRepository(self.pool))
+        self.repo = CachedRepository(self.inner, max_size=100)
+
+    def tearDown(self):
+        self.pool.close_all()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_read_through_and_write_through(self):
+        order = Order(id="O1", customer_id="C1", item_id="ITEM1")
+        self.repo.save(order)
+        self.inner.save.assert_called_once_with(order)
+
+        # Served from cache after the write, storage is not read
+        self.assertIs(self.repo.get_by_id("O1"), order)
+        self.inner.get_by_id.assert_not_called()
+
+        # A cold entry is loaded once, then cached
+        self.repo.invalidate("O1")
+        loaded = self.repo.get_by_id("O1")
+        self.assertIs(self.repo.get_by_id("O1"), loaded)
+        self.assertEqual(self.inner.get_by_id.call_count, 1)
+
+        stats = self.repo.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_clear_invalidates(self):
+        self.repo.save(Order(id="O1", customer_id="C1", item_id="ITEM1"))
+        self.repo.clear()
+        self.assertIsNone(self.repo.get_by_id("O1"))
+        self.assertEqual(len(self.repo.cache), 0)
+
+    def test_delegates_backend_queries(self):
+        self.repo.save_all([Order(id=f"O{i}", customer_id="C1", item_id="ITEM1") for i in range(3)])
+        self.assertEqual(len(self.repo.get_by_customer("C1")), 3)
+        self.assertEqual(len(self.repo.cache), 3)
+
+    def test_concurrent_saves_leave_newest_cached(self):
+        inner = SqliteOrderRepository(self.pool)
+        repo = CachedRepository(inner, max_size=100)
+        first_written, release = threading.Event(), threading.Event()
+        save = inner.save
+
+        def slow_save(order):
+            save(order)
+            if order.item_id == "ITEM1": # The first writer stalls between the write and the cache update
+                first_written.set()
+                release.wait(1)
+        inner.save = slow_save
+        first = threading.Thread(target=repo.save, args=(Order(id="O1", customer_id="C1", item_id="ITEM1"),))
+        first.start()
+        first_written.wait(5)
+        second = threading.Thread(target=repo.save, args=(Order(id="O1", customer_id="C1", item_id="ITEM2"),))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(repo.get_by_id("O1").item_id, "ITEM2")
+        self.assertEqual(inner.get_by_id("O1").item_id, "ITEM2")
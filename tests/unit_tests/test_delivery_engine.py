@@ -0,0 +1,254 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import patch
+from controllers.delivery_controller import DeliveryController
+from services.delivery_engine import DeliveryEngine
+from services.assignment_service import AssignmentService
+from repositories.json_store import JsonSnapshotStore
+from repositories.order_archive import OrderArchive
+from models import Customer
+from repositories.order_repository import InMemoryOrderRepository
+from repositories.driver_repository import InMemoryDriverRepository
+from repositories.customer_repository import InMemoryCustomerRepository
+from services.inventory_service import InventoryService
+from constants import config
+from constants.enums import OrderStatus, DriverStatus
+
+class TestDeliveryEngineLifecycle(unittest.TestCase):
+    def setUp(self):
+        DeliveryEngine._instance = None
+        AssignmentService._instance = None
+        InMemoryOrderRepository().clear()
+        InMemoryDriverRepository().clear()
+        InMemoryCustomerRepository().clear()
+        InventoryService().reset()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        DeliveryEngine._instance = None
+        AssignmentService._instance = None
+        InMemoryOrderRepository().clear()
+        InMemoryDriverRepository().clear()
+        InMemoryCustomerRepository().clear()
+        InventoryService().reset()
+        shutil.rmtree(self.tmp_dir)
+
+    def _store(self) -> JsonSnapshotStore:
+        return JsonSnapshotStore(self.tmp_dir, *(os.path.join(self.tmp_dir, f) for f in
+                                                 ("customers.json", "drivers.json", "orders.json")))
+
+    def test_construction_is_lazy(self):
+        threads_before = threading.active_count()
+        controller = DeliveryController()
+        self.assertEqual(threading.active_count(), threads_before)
+        self.assertFalse(controller.scheduler.running)
+
+        controller.onboard_customer("C1", "Alice")
+        controller.create_order("C1", "ITEM1") # First order starts the timeout thread
+        self.assertTrue(controller.scheduler.running)
+
+        controller.stop(timeout=2)
+        self.assertFalse(controller.scheduler.running)
+
+    def test_stop_drains_pending_writes(self):
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        engine.order_service.onboard_customer("C1", "Alice")
+        for _ in range(20):
+            engine.order_service.create_order("C1", "ITEM2")
+            engine.persist() # Coalesced by the writer thread
+        writer = engine._writer
+        engine.stop(timeout=2)
+
+        with open(engine.store.orders_file) as f:
+            self.assertEqual(len(json.load(f)), 20)
+        self.assertFalse(writer.is_alive())
+
+        # Reload into fresh repositories
+        InMemoryOrderRepository().clear()
+        DeliveryEngine._instance = None
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        self.assertEqual(engine.load(), 21)
+        self.assertEqual(engine.load(), 0) # Only once
+        self.assertEqual(len(engine.order_service.orders_snapshot()), 20)
+
+    def test_restart_after_stop(self):
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        engine.start()
+        engine.stop(timeout=2)
+        self.assertFalse(engine.scheduler.running)
+
+        # Both background threads come back, and writes after the restart still reach disk
+        engine.start()
+        self.assertTrue(engine.scheduler.running)
+        engine.order_service.onboard_customer("C1", "Alice")
+        engine.persist()
+        self.assertTrue(engine._writer.is_alive())
+        engine.stop(timeout=2)
+        with open(engine.store.customers_file) as f:
+            self.assertEqual(len(json.load(f)), 1)
+
+    def test_concurrent_load_waits_for_the_first(self):
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        engine.order_service.onboard_customer("C1", "Alice")
+        engine.persist()
+        engine.stop(timeout=2)
+        InMemoryCustomerRepository().clear()
+
+        DeliveryEngine._instance = None
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        entered, release = threading.Event(), threading.Event()
+        load_stores = engine._load_stores
+
+        def slow_load():
+            entered.set()
+            release.wait(2)
+            return load_stores()
+        engine._load_stores = slow_load
+        first = threading.Thread(target=engine.load)
+        first.start()
+        entered.wait(2)
+        seen = []
+        second = threading.Thread(target=lambda: seen.append((engine.load(), len(engine.order_service.customer_repo.get_all()))))
+        second.start()
+        second.join(0.1)
+        self.assertTrue(second.is_alive()) # Blocked until the first load finishes
+        release.set()
+        first.join(2)
+        second.join(2)
+        self.assertEqual(seen, [(0, 1)])
+
+    def _detach_driver_store(self):
+        repo = InMemoryDriverRepository()
+        if repo.store is not None:
+            repo.store.close()
+        repo.store = None
+
+    def test_restart_reconciles_mmap_drivers_with_orders(self):
+        self.addCleanup(self._detach_driver_store)
+        with patch.object(config, "DRIVER_STORE", "mmap"), \
+                patch.object(config, "DRIVER_STORE_FILE", os.path.join(self.tmp_dir, "drivers.dat")):
+            engine = DeliveryEngine()
+            engine.store = self._store()
+            engine.load()
+            engine.order_service.onboard_customer("C1", "Alice")
+            engine.driver_service.onboard_driver("D1", "Bob")
+            order = engine.order_service.create_order("C1", "ITEM1")
+            engine.assignment_service.queue_order(order.id)
+            self.assertEqual(engine.driver_service.get_driver("D1").status, DriverStatus.BUSY)
+
+            # Crash before the order snapshot is written: D1 is durable with the order, the order is not
+            self._detach_driver_store()
+            for repo in (InMemoryOrderRepository(), InMemoryDriverRepository(), InMemoryCustomerRepository()):
+                repo.clear()
+            DeliveryEngine._instance = None
+            AssignmentService._instance = None
+            engine = DeliveryEngine()
+            engine.store = self._store()
+            engine.load()
+            self.assertIsNone(engine.order_service.get_order(order.id))
+            driver = engine.driver_service.get_driver("D1")
+            self.assertEqual((driver.active_order_ids, driver.status), ([], DriverStatus.AVAILABLE))
+            self.assertEqual(engine.driver_service.repo.available_capacity(), 1)
+
+            # The correction was written through: the next start sees it without reconciling again
+            self.assertEqual(engine.driver_service.repo.store.load()["D1"].active_order_ids, [])
+
+    def test_restart_keeps_stock_reserved_by_stored_orders(self):
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        inventory = engine.order_service.inventory
+        start = inventory.available("ITEM1")
+        engine.order_service.onboard_customer("C1", "Alice")
+        engine.order_service.create_order("C1", "ITEM1", quantity=3)
+        cancelled = engine.order_service.create_order("C1", "ITEM1", quantity=2)
+        engine.order_service.transition_state(cancelled.id, OrderStatus.CANCELLED)
+        engine.persist()
+        engine.stop(timeout=2)
+
+        # New process: stock starts from the catalog again, then the open order takes its units back
+        InMemoryOrderRepository().clear()
+        inventory.reset()
+        DeliveryEngine._instance = None
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        engine.load()
+        self.assertEqual(inventory.available("ITEM1"), start - 3)
+
+    def test_restart_keeps_stock_of_delivered_and_archived_orders(self):
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        order_repo = engine.order_service.order_repo
+        previous_archive = order_repo.archive
+        order_repo.archive = OrderArchive(os.path.join(self.tmp_dir, "archive"))
+        self.addCleanup(setattr, order_repo, "archive", previous_archive)
+        self.addCleanup(lambda: order_repo.archive.close())
+        inventory = engine.order_service.inventory
+        start = inventory.available("ITEM1")
+        engine.order_service.onboard_customer("C1", "Alice")
+        for quantity in (4, 5):
+            order = engine.order_service.create_order("C1", "ITEM1", quantity=quantity)
+            for status in (OrderStatus.ASSIGNED, OrderStatus.PICKED_UP, OrderStatus.DELIVERED):
+                engine.order_service.transition_state(order.id, status)
+            if quantity == 4: # The first delivery moves to the archive
+                self.assertEqual(order_repo.spill(now=order.delivered_at + config.ORDER_RETENTION_SECONDS,
+                                                  force=True), 1)
+        self.assertEqual(inventory.available("ITEM1"), start - 9)
+        engine.persist()
+        engine.stop(timeout=2)
+
+        # New process: the resident delivery and the archived one both keep their units
+        InMemoryOrderRepository().clear()
+        inventory.reset()
+        DeliveryEngine._instance = None
+        engine = DeliveryEngine()
+        engine.store = self._store()
+        engine.load()
+        self.assertEqual(inventory.available("ITEM1"), start - 9)
+    def test_controller_persist_requires_load(self):
+        controller = DeliveryController(start_scheduler=False)
+        controller.engine.store = self._store()
+        self._store().save([Customer(id="C1", name="Alice")], [], [])
+        controller.order_service.onboard_customer("C2", "Bob")
+        with self.assertRaises(RuntimeError):
+            controller.persist() # Would have replaced the saved C1 with only C2
+        controller.stop(timeout=2)
+        with open(os.path.join(self.tmp_dir, "customers.json")) as f:
+            self.assertEqual(list(json.load(f)), ["C1"])
+
+        controller.load()
+        controller.persist()
+        controller.stop(timeout=2)
+        with open(os.path.join(self.tmp_dir, "customers.json")) as f:
+            self.assertEqual(sorted(json.load(f)), ["C1", "C2"])
+
+    def test_report_covers_archived_orders(self):
+        controller = DeliveryController(start_scheduler=False)
+        order_repo = controller.order_service.order_repo
+        previous_archive = order_repo.archive
+        order_repo.archive = OrderArchive(os.path.join(self.tmp_dir, "archive"))
+        self.addCleanup(setattr, order_repo, "archive", previous_archive)
+        self.addCleanup(lambda: order_repo.archive.close())
+        controller.order_service.onboard_customer("C1", "Alice")
+        delivered = controller.order_service.create_order("C1", "ITEM1")
+        for status in (OrderStatus.ASSIGNED, OrderStatus.PICKED_UP, OrderStatus.DELIVERED):
+            controller.order_service.transition_state(delivered.id, status)
+        controller.order_service.create_order("C1", "ITEM1")
+        order_repo.spill(now=delivered.delivered_at + config.ORDER_RETENTION_SECONDS, force=True)
+
+        self.assertEqual(len(controller.get_all_orders()), 1) # Resident only
+        report = controller.get_report()
+        self.assertEqual(report["outcomes"]["DELIVERED"], 1)
+        self.assertEqual(report["outcomes"]["CREATED"], 1)
+        self.assertEqual(report["end_to_end"]["count"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,36 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from services.delivery_service import DeliveryService
+from services.delivery_engine import DeliveryEngine
+from services.assignment_service import AssignmentService
+from repositories.order_repository import InMemoryOrderRepository
+from repositories.driver_repository import InMemoryDriverRepository
+from repositories.customer_repository import InMemoryCustomerRepository
 from constants.enums import OrderStatus, DriverStatus
 from models import Order, Driver, Customer
 
 class TestDeliveryService(unittest.TestCase):
     def setUp(self):
-        # Reset singleton for each test
+        # Reset singletons for each test; the facade shares the engine's repositories
         DeliveryService._instance = None
+        DeliveryEngine._instance = None
+        AssignmentService._instance = None
+        InMemoryOrderRepository().clear()
+        InMemoryDriverRepository().clear()
+        InMemoryCustomerRepository().clear()
         # Patch load/save to prevent file operations
-        with patch('services.delivery_service.DeliveryService._load_data'), \
-             patch('services.delivery_service.DeliveryService._save_data'), \
-             patch('services.delivery_service.threading.Thread'):  # No background thread
-            self.service = DeliveryService()
-            self.service.users = {}
-            self.service.drivers = {}
-            self.service.orders = {}
+        self.patchers = [patch('services.delivery_service.DeliveryService._load_data'),
+                         patch('services.delivery_service.DeliveryService._save_data')]
+        for p in self.patchers:
+            p.start()
+        self.service = DeliveryService(start_scheduler=False) # No background thread
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        DeliveryService._instance = None
+        DeliveryEngine._instance = None
+        AssignmentService._instance = None
 
     def test_onboard_customer(self):
         c = self.service.onboard_customer("C1", "Alice")
@@ -31,6 +46,16 @@ class TestDeliveryService(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.service.create_order("CX", "ITEM1")
 
+    def test_invalid_orders_are_not_admitted(self):
+        self.service.onboard_customer("C1", "Alice")
+        for bad in (("CX", "ITEM1", 1), ("C1", "NOPE", 1), ("C1", "ITEM1", 0)):
+            with self.assertRaises(ValueError):
+                self.service.create_order(*bad)
+        # Refused before admission: no rate-limit tokens spent, nothing counted as admitted
+        self.assertEqual(self.service.engine.admission.stats()["admitted"], 0)
+        self.service.create_order("C1", "ITEM1")
+        self.assertEqual(self.service.engine.admission.stats()["admitted"], 1)
+
     def test_create_order_success(self):
         self.service.onboard_customer("C1", "Alice")
         order = self.service.create_order("C1", "ITEM1")
@@ -72,3 +97,26 @@ class TestDeliveryService(unittest.TestCase):
         
         self.service.cancel_order(order.id)
         self.assertEqual(order.status, OrderStatus.CANCELLED)
+
+    def test_shares_state_with_controller(self):
+        from controllers.delivery_controller import DeliveryController
+        controller = DeliveryController(start_scheduler=False)
+        self.service.onboard_customer("C1", "Alice")
+        order = self.service.create_order("C1", "ITEM1")
+        # One store and one scheduler behind both facades
+        self.assertIs(controller.get_order(order.id), self.service.get_order(order.id))
+        self.assertIs(controller.scheduler, self.service.engine.scheduler)
+        with self.assertRaises(TypeError):
+            self.service.orders["X"] = order # Read-only view
+
+    def test_rate_driver(self):
+        self.service.onboard_customer("C1", "Alice")
+        self.service.onboard_driver("D1", "Dave")
+        order = self.service.create_order("C1", "ITEM1")
+        with self.assertRaises(ValueError):
+            self.service.rate_driver(order.id, 5)
+        self.service.pickup_order("D1", order.id)
+        self.service.complete_order("D1", order.id)
+        self.service.rate_driver(order.id, 4)
+        self.assertEqual(self.service.get_order(order.id).rating, 4)
+        self.assertEqual(self.service.get_driver("D1").average_rating, 4.0)
@@ -0,0 +1,46 @@
+import unittest
+from services.dispatch_queue import DispatchQueue
+from models import Order
+
+def _order(order_id, item_id, created_at):
+    return Order(id=order_id, customer_id="C1", item_id=item_id, created_at=created_at)
+
+class TestDispatchQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = DispatchQueue(timeout_seconds=100)
+
+    def test_food_overtakes_documents(self):
+        docs = [_order(f"DOC{i}", "ITEM2", 1000.0 + i) for i in range(5)]
+        food = _order("FOOD", "ITEM3", 1010.0)
+        for o in docs + [food]:
+            self.queue.push(o)
+        self.assertEqual(self.queue.pop(), "FOOD")
+        self.assertEqual([self.queue.pop() for _ in range(5)], [o.id for o in docs])
+        self.assertIsNone(self.queue.pop())
+
+    def test_aging_promotes_old_orders(self):
+        old_doc = _order("DOC", "ITEM2", 1000.0) # Deadline 1100
+        new_food = _order("FOOD", "ITEM3", 1060.0) # Deadline 1160, promoted by half the timeout -> 1110
+        self.queue.push(new_food)
+        self.queue.push(old_doc)
+        self.assertEqual(list(self.queue), ["DOC", "FOOD"])
+
+    def test_remove_and_contains(self):
+        a, b = _order("A", "ITEM1", 1.0), _order("B", "ITEM1", 2.0)
+        self.queue.push(a)
+        self.queue.push(b)
+        self.queue.push(a) # Already queued: ignored
+        self.assertEqual(len(self.queue), 2)
+        self.queue.remove("A")
+        self.assertNotIn("A", self.queue)
+        self.assertEqual(self.queue.peek(), "B")
+        self.queue.remove("missing")
+        self.assertEqual(len(self.queue), 1)
+
+    def test_expiry(self):
+        order = _order("A", "ITEM3", 1000.0)
+        self.assertFalse(self.queue.is_expired(order, now=1100.0))
+        self.assertTrue(self.queue.is_expired(order, now=1100.5))
+
+if __name__ == '__main__':
+    unittest.main()
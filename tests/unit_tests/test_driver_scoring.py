@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch
+from repositories import driver_score_index
+from repositories.driver_score_index import DriverScoreIndex
+from services.assignment_service import AssignmentService
+from services.assignment_strategy import LeastLoadedStrategy, ScoredStrategy, make_strategy
+from services.telemetry_service import TelemetryService
+from constants.enums import DriverStatus
+from models import Driver
+from utils import clock
+from utils.clock import VirtualClock
+
+
+class _ScoreIndexCases:
+    """Run once with NumPy (when installed) and once with the pure-Python fallback."""
+    numpy = None
+
+    def setUp(self):
+        self.np_patch = patch.object(driver_score_index, "np", self.numpy)
+        self.np_patch.start()
+        self.clock = VirtualClock(1000.0)
+        self.previous_clock = clock.set_clock(self.clock)
+        self.index = DriverScoreIndex(unrated=4.0, idle_horizon=100.0)
+
+    def tearDown(self):
+        clock.set_clock(self.previous_clock)
+        self.np_patch.stop()
+
+    def test_rating_idle_and_vehicle_fit(self):
+        self.index.update(Driver("D1", "Bob", total_rating=10, ratings_count=2)) # 5 stars
+        self.index.update(Driver("D2", "Dan", total_rating=3, ratings_count=1)) # 3 stars
+        self.assertEqual(self.index.best({"rating": 1.0}), "D1")
+
+        self.clock.advance(50)
+        self.index.update(Driver("D3", "Eve", vehicle_type="Four Wheeler")) # Unrated, idle from now
+        self.assertEqual(self.index.best({"idle": 1.0}), "D1") # Ties on idle go to the lowest slot
+        self.assertEqual(self.index.best({"vehicle_fit": 1.0}, {"Four Wheeler": 1.0, "Two Wheeler": 0.2}), "D3")
+        self.assertEqual(self.index.best({"rating": 1.0, "vehicle_fit": 1.0}, {"Four Wheeler": 1.0}), "D3")
+
+        # Busy drivers lose their idle time; unavailable ones are never picked
+        self.index.update(Driver("D1", "Bob", status=DriverStatus.BUSY, active_order_ids=["O1"],
+                                 total_rating=10, ratings_count=2))
+        self.assertEqual(self.index.best({"rating": 1.0}), "D3") # Unrated counts as 4 stars
+        self.assertEqual(self.index.best({"rating": 1.0}, skip=lambda d: d == "D3"), "D2")
+        self.index.remove("D2")
+        self.index.remove("D3")
+        self.assertIsNone(self.index.best({"rating": 1.0}))
+
+    def test_grows_past_initial_capacity(self):
+        for i in range(3000):
+            self.index.update(Driver(f"D{i}", "x", total_rating=i % 5 + 1, ratings_count=1))
+        self.assertEqual(len(self.index), 3000)
+        self.assertEqual(self.index.best({"rating": 1.0}), "D4")
+        self.index.clear()
+        self.assertIsNone(self.index.best({"rating": 1.0}))
+
+
+class TestScoreIndexPython(_ScoreIndexCases, unittest.TestCase):
+    numpy = None
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy not installed")
+class TestScoreIndexNumpy(_ScoreIndexCases, unittest.TestCase):
+    numpy = numpy
+
+
+class TestScoredAssignment(unittest.TestCase):
+    def setUp(self):
+        AssignmentService._instance = None
+        TelemetryService().clear()
+        self.service = AssignmentService()
+        self.service.pending_orders.clear()
+        self.service.order_service.order_repo.clear()
+        self.service.driver_service.repo.clear()
+
+    def tearDown(self):
+        AssignmentService._instance = None
+
+    def test_strategy_is_pluggable(self):
+        self.assertIsInstance(self.service.strategy, LeastLoadedStrategy)
+        self.assertIsInstance(make_strategy(self.service.driver_service, "scored"), ScoredStrategy)
+        with self.assertRaises(ValueError):
+            make_strategy(self.service.driver_service, "random")
+
+    def test_scored_strategy_picks_best_fit(self):
+        self.service.strategy = ScoredStrategy(self.service.driver_service, {"rating": 1.0, "vehicle_fit": 1.0},
+                                               {"ITEM1": {"Four Wheeler": 1.0}})
+        self.service.order_service.onboard_customer("C1", "Alice")
+        self.service.driver_service.onboard_driver("D1", "Bob", capacity=3) # Least loaded would pick D1
+        van = Driver("D2", "Dan", vehicle_type="Four Wheeler")
+        self.service.driver_service.repo.save(van)
+
+        order = self.service.order_service.create_order("C1", "ITEM1")
+        self.service.queue_order(order.id)
+        self.assertEqual(self.service.order_service.get_order(order.id).driver_id, "D2")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,3 +15,19 @@ class TestDriverService(unittest.TestCase):
         # Idempotency
         d2 = self.service.onboard_driver("D1", "Bob")
         self.assertIs(d, d2)
+
+    def test_capacity_tracking(self):
+        self.service.onboard_driver("D1", "Bob", capacity=2)
+        d = self.service.assign_order("D1", "O1")
+        self.assertEqual(d.status, DriverStatus.AVAILABLE)
+        self.assertEqual(self.service.find_available_driver().id, "D1")
+
+        d = self.service.assign_order("D1", "O2")
+        self.assertEqual(d.status, DriverStatus.BUSY)
+        self.assertIsNone(self.service.find_available_driver())
+        with self.assertRaises(ValueError):
+            self.service.assign_order("D1", "O3")
+
+        d = self.service.release_order("D1", "O1")
+        self.assertEqual(d.active_order_ids, ["O2"])
+        self.assertEqual(d.status, DriverStatus.AVAILABLE)
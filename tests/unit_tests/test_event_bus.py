@@ -0,0 +1,61 @@
+import unittest
+from services.event_bus import OrderEventBus
+from services.order_service import OrderService
+from constants.enums import OrderStatus, OrderEventType
+from models import Order
+
+class TestOrderEventBus(unittest.TestCase):
+    def setUp(self):
+        self.bus = OrderEventBus()
+        self.bus.clear()
+
+    def _order(self, order_id="O1", customer_id="C1", driver_id=None) -> Order:
+        return Order(id=order_id, customer_id=customer_id, item_id="ITEM1", driver_id=driver_id)
+
+    def test_filtering(self):
+        by_order = self.bus.subscribe(order_id="O1")
+        by_driver = self.bus.subscribe(driver_id="D1")
+        everything = self.bus.subscribe()
+
+        self.bus.publish(OrderEventType.ORDER_CREATED, self._order("O1"))
+        self.bus.publish(OrderEventType.ORDER_CREATED, self._order("O2", driver_id="D1"))
+
+        self.assertEqual([e.order_id for e in by_order.poll()], ["O1"])
+        self.assertEqual([e.order_id for e in by_driver.poll()], ["O2"])
+        self.assertEqual([e.offset for e in everything.poll()], [0, 1])
+        self.assertEqual(everything.cursor, 2)
+
+    def test_slow_subscriber_never_blocks_writer(self):
+        sub = self.bus.subscribe(buffer_size=3)
+        for i in range(10):
+            self.bus.publish(OrderEventType.ORDER_CREATED, self._order(f"O{i}"))
+        # Oldest events were overwritten, newest kept
+        self.assertEqual([e.order_id for e in sub.poll()], ["O7", "O8", "O9"])
+        self.assertEqual(sub.dropped, 7)
+
+    def test_resume_from_offset(self):
+        for i in range(5):
+            self.bus.publish(OrderEventType.ORDER_CREATED, self._order(f"O{i}"))
+        sub = self.bus.subscribe(from_offset=3)
+        self.bus.publish(OrderEventType.ORDER_CREATED, self._order("O5"))
+        self.assertEqual([e.offset for e in sub.poll()], [3, 4, 5])
+
+        page = self.bus.events_since(1, limit=2)
+        self.assertEqual([e.offset for e in page], [1, 2])
+        with self.assertRaises(ValueError):
+            self.bus.events_since(99)
+
+    def test_emitted_from_transitions(self):
+        service = OrderService()
+        service.order_repo.clear()
+        service.customer_repo.clear()
+        service.onboard_customer("C1", "Alice")
+        order = service.create_order("C1", "ITEM1")
+        sub = self.bus.subscribe(order_id=order.id)
+
+        service.transition_state(order.id, OrderStatus.ASSIGNED, driver_id="D1")
+        (event,) = sub.poll()
+        self.assertEqual(event.type, OrderEventType.STATUS_CHANGED)
+        self.assertEqual(event.previous_status, OrderStatus.CREATED)
+        self.assertEqual(event.status, OrderStatus.ASSIGNED)
+        self.assertEqual(event.driver_id, "D1")
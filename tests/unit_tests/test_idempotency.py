@@ -0,0 +1,65 @@
+import unittest
+import threading
+from services.idempotency import IdempotencyCache
+
+class TestIdempotencyCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = IdempotencyCache(max_size=2, ttl_seconds=None)
+        self.calls = 0
+
+    def _op(self):
+        self.calls += 1
+        return f"result-{self.calls}"
+
+    def test_repeat_returns_original_result(self):
+        first = self.cache.run("create_order", "k1", ("C1",), self._op)
+        second = self.cache.run("create_order", "k1", ("C1",), self._op)
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+        # Keys are scoped per operation, and no key means no caching
+        self.cache.run("cancel_order", "k1", ("C1",), self._op)
+        self.cache.run("create_order", None, ("C1",), self._op)
+        self.assertEqual(self.calls, 3)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["executions"]), (1, 2))
+
+    def test_key_reuse_with_other_params(self):
+        self.cache.run("create_order", "k1", ("C1",), self._op)
+        with self.assertRaises(ValueError):
+            self.cache.run("create_order", "k1", ("C2",), self._op)
+
+    def test_failures_are_not_cached(self):
+        def fail():
+            raise ValueError("boom")
+        with self.assertRaises(ValueError):
+            self.cache.run("create_order", "k1", (), fail)
+        self.assertEqual(self.cache.run("create_order", "k1", (), self._op), "result-1")
+
+    def test_bounded(self):
+        for key in ("a", "b", "c"):
+            self.cache.run("create_order", key, (), self._op)
+        self.assertEqual(self.cache.stats()["size"], 2)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_concurrent_duplicates_run_once(self):
+        started, release = threading.Event(), threading.Event()
+        results = []
+
+        def slow():
+            started.set()
+            release.wait(2)
+            return self._op()
+
+        first = threading.Thread(target=lambda: results.append(self.cache.run("create_order", "k1", (), slow)))
+        first.start()
+        started.wait(2)
+        second = threading.Thread(target=lambda: results.append(self.cache.run("create_order", "k1", (), slow)))
+        second.start()
+        release.set()
+        first.join(2)
+        second.join(2)
+        self.assertEqual(results, ["result-1", "result-1"])
+        self.assertEqual(self.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
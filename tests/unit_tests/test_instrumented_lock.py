@@ -0,0 +1,100 @@
+import io
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from utils.instrumented_lock import InstrumentedLock, LockOrderInversion, LockProfiler, make_lock
+
+
+class TestInstrumentedLock(unittest.TestCase):
+    def setUp(self):
+        LockProfiler._instance = None
+        self.profiler = LockProfiler()
+
+    def _lock_report(self, name):
+        return next(l for l in self.profiler.report()["locks"] if l["name"] == name)
+
+    def test_wait_and_hold_are_recorded(self):
+        lock = InstrumentedLock("test.contended")
+        held = threading.Event()
+
+        def holder():
+            with lock:
+                held.set()
+                time.sleep(0.02)
+
+        t = threading.Thread(target=holder)
+        t.start()
+        held.wait()
+        with lock: # Blocks until the holder releases
+            pass
+        t.join()
+
+        stats = self._lock_report("test.contended")
+        self.assertEqual(stats["acquisitions"], 2)
+        self.assertEqual(stats["contended"], 1)
+        self.assertGreater(stats["max_wait_us"], 5000)
+        self.assertGreater(stats["max_hold_us"], 10000)
+        self.assertEqual(sum(stats["hold_histogram"]), 2)
+        site = self.profiler.report()["top_sites"][0]
+        self.assertEqual(site["lock"], "test.contended")
+        self.assertIn("test_instrumented_lock.py", site["site"])
+
+    def test_reentrant(self):
+        lock = InstrumentedLock("test.rlock", reentrant=True)
+        with lock:
+            with lock:
+                self.assertTrue(lock.locked())
+            self.assertTrue(lock.locked())
+        self.assertFalse(lock.locked())
+        self.assertEqual(self._lock_report("test.rlock")["acquisitions"], 1)
+
+        plain = InstrumentedLock("test.lock")
+        with plain:
+            self.assertFalse(plain.acquire(blocking=False))
+            with self.assertRaises(RuntimeError):
+                plain.acquire() # Would deadlock a threading.Lock
+        with self.assertRaises(RuntimeError):
+            plain.release()
+
+    def test_lock_order_inversion(self):
+        a = InstrumentedLock("test.a", check_order=True)
+        b = InstrumentedLock("test.b", check_order=True)
+        c = InstrumentedLock("test.c", check_order=True)
+        with a, b:
+            pass
+        with b, c:
+            pass
+        self.assertEqual(self.profiler.inversions, [])
+        # c -> a closes the cycle a -> b -> c -> a, even though no deadlock happened
+        with c, a:
+            pass
+        self.assertEqual(len(self.profiler.inversions), 1)
+        inversion = self.profiler.inversions[0]
+        self.assertEqual((inversion.first, inversion.second), ("test.c", "test.a"))
+        with c, a: # Reported once
+            pass
+        self.assertEqual(len(self.profiler.inversions), 1)
+
+        self.profiler.raise_on_inversion = True
+        with self.assertRaises(LockOrderInversion):
+            with b, a:
+                pass
+        self.assertFalse(b.locked() or a.locked())
+
+        out = io.StringIO()
+        self.profiler.dump(file=out)
+        self.assertIn("Lock order inversion", out.getvalue())
+
+    def test_make_lock_is_plain_unless_enabled(self):
+        with patch("constants.config.LOCK_PROFILING", False), patch("constants.config.LOCK_DEBUG", False):
+            self.assertNotIsInstance(make_lock("test.plain"), InstrumentedLock)
+        with patch("constants.config.LOCK_PROFILING", True), patch("constants.config.LOCK_DEBUG", False):
+            lock = make_lock("test.profiled", reentrant=True)
+            self.assertIsInstance(lock, InstrumentedLock)
+            self.assertTrue(lock.reentrant)
+            self.assertFalse(lock.check_order)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import threading
+import multiprocessing
+from services.inventory_service import InventoryService
+from services.order_service import OrderService
+from constants.enums import OrderStatus
+from models import Order
+
+class TestInventoryService(unittest.TestCase):
+    def setUp(self):
+        self.inventory = InventoryService()
+        self.inventory.reset()
+
+    def tearDown(self):
+        self.inventory.reset()
+
+    def test_catalog_loaded_once(self):
+        self.assertIs(OrderService().items, OrderService().items)
+        self.assertEqual(self.inventory.get_item("ITEM3").name, "Food")
+        self.assertIsNone(self.inventory.get_item("ITEMX"))
+
+    def test_reserve_and_release(self):
+        start = self.inventory.available("ITEM1")
+        self.inventory.reserve("ITEM1", 3)
+        self.assertEqual(self.inventory.available("ITEM1"), start - 3)
+        with self.assertRaises(ValueError):
+            self.inventory.reserve("ITEM1", start) # All-or-nothing
+        self.assertEqual(self.inventory.available("ITEM1"), start - 3)
+        self.inventory.release("ITEM1", 3)
+        self.assertEqual(self.inventory.available("ITEM1"), start)
+        self.assertIsNone(self.inventory.available("ITEM2")) # Unlimited
+        with self.assertRaises(ValueError):
+            self.inventory.reserve("ITEMX", 1)
+
+    def test_concurrent_reservations_never_oversell(self):
+        self.inventory._stock["ITEM1"] = 100
+        reserved = []
+
+        def worker():
+            for _ in range(50):
+                try:
+                    self.inventory.reserve("ITEM1", 1)
+                    reserved.append(1)
+                except ValueError:
+                    pass
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(reserved), 100)
+        self.assertEqual(self.inventory.available("ITEM1"), 0)
+
+    def test_rebuild_from_stored_orders(self):
+        start = self.inventory.available("ITEM1")
+        self.inventory.reserve("ITEM1", 50) # Lost with the process
+        orders = [Order(id=f"O{i}", customer_id="C1", item_id="ITEM1", quantity=2, status=status)
+                  for i, status in enumerate(OrderStatus)]
+        orders.append(Order(id="O9", customer_id="C1", item_id="ITEM2", quantity=7))
+        self.inventory.rebuild(orders)
+        # Every order holds its units except the cancelled one, delivered included
+        self.assertEqual(self.inventory.available("ITEM1"), start - 8)
+        self.assertIsNone(self.inventory.available("ITEM2"))
+
+    def test_shared_stock(self):
+        counters = InventoryService.shared_stock(multiprocessing.get_context("spawn"))
+        self.assertNotIn("ITEM2", counters) # Unlimited items need no counter
+        counters["ITEM1"].value = 5
+        self.inventory.share_stock(counters)
+        self.inventory.reserve("ITEM1", 4)
+        self.assertEqual(counters["ITEM1"].value, 1)
+        with self.assertRaises(ValueError):
+            self.inventory.reserve("ITEM1", 2)
+        self.inventory.release("ITEM1", 4)
+        self.assertEqual(self.inventory.available("ITEM1"), 5)
+
+    def test_order_lifecycle_reserves_and_releases(self):
+        service = OrderService()
+        service.order_repo.clear()
+        service.onboard_customer("C1", "Alice")
+        start = self.inventory.available("ITEM3")
+        order = service.create_order("C1", "ITEM3", quantity=4)
+        self.assertEqual(self.inventory.available("ITEM3"), start - 4)
+        service.transition_state(order.id, OrderStatus.CANCELLED)
+        service.transition_state(order.id, OrderStatus.CANCELLED) # Idempotent: released once
+        self.assertEqual(self.inventory.available("ITEM3"), start)
+        service.order_repo.clear()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+from repositories import mmap_driver_store
+from repositories.mmap_driver_store import MmapDriverStore
+from repositories.driver_repository import InMemoryDriverRepository
+from services.driver_service import DriverService
+from constants.enums import DriverStatus
+from models import Driver
+
+
+class TestMmapDriverStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "drivers.dat")
+        self.store = MmapDriverStore(self.path, max_active_orders=4)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _reopen(self) -> dict:
+        self.store.close()
+        self.store = MmapDriverStore(self.path, max_active_orders=4)
+        return self.store.load()
+
+    def test_roundtrip_and_in_place_updates(self):
+        self.assertEqual(self.store.load(), {})
+        driver = Driver("D1", "Bob", capacity=2, vehicle_type="Four Wheeler")
+        self.store.put(driver)
+        size = os.path.getsize(self.path)
+        for i in range(100):
+            driver.status = DriverStatus.BUSY if i % 2 else DriverStatus.AVAILABLE
+            driver.active_order_ids = ["O1", "O2"] if i % 2 else []
+            driver.total_rating += 5
+            driver.ratings_count += 1
+            driver.version += 1
+            self.store.put(driver)
+        self.store.flush()
+        self.assertEqual(os.path.getsize(self.path), size) # Updated in place, never rewritten
+        self.assertEqual(self._reopen(), {"D1": driver})
+
+    def test_torn_write_falls_back_to_previous_state(self):
+        driver = Driver("D1", "Bob")
+        self.store.put(driver)
+        driver.status = DriverStatus.BUSY
+        driver.active_order_ids = ["O1"]
+        driver.version = 1
+        self.store.put(driver) # Second write lands in copy 1
+
+        # Simulate a crash halfway through that write: the tail of copy 1 is garbage
+        copy_size = self.store._copy.size
+        offset = mmap_driver_store._HEADER_SIZE + copy_size + copy_size // 2
+        self.store.close()
+        with open(self.path, "r+b") as f:
+            f.seek(offset)
+            f.write(b"\xff" * 8)
+        recovered = self._reopen()
+        self.assertEqual(recovered["D1"].status, DriverStatus.AVAILABLE)
+        self.assertEqual(recovered["D1"].version, 0)
+        self.assertEqual(self.store.recovered, 1)
+
+        # The next write reuses the torn copy and wins
+        driver.version = 2
+        self.store.put(driver)
+        self.assertEqual(self._reopen()["D1"].version, 2)
+
+    def test_grow_remove_and_limits(self):
+        for i in range(150):
+            self.store.put(Driver(f"D{i}", f"Driver {i}"))
+        self.store.remove("D7")
+        self.assertEqual(len(self.store), 149)
+        drivers = self._reopen()
+        self.assertEqual(len(drivers), 149)
+        self.assertNotIn("D7", drivers)
+        with self.assertRaises(ValueError):
+            self.store.put(Driver("D1", "Bob", capacity=5)) # More orders than a record holds
+        with self.assertRaises(ValueError):
+            self.store.put(Driver("X" * 40, "Bob"))
+        self.store.clear()
+        self.assertEqual(self._reopen(), {})
+
+
+class TestDriverRepositoryWithStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "drivers.dat")
+        self.repo = InMemoryDriverRepository()
+        self.repo.clear()
+
+    def tearDown(self):
+        if self.repo.store is not None:
+            self.repo.store.close()
+        self.repo.store = None
+        self.repo.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_write_through_and_reload(self):
+        self.repo.attach_store(MmapDriverStore(self.path))
+        service = DriverService(self.repo)
+        service.onboard_driver("D1", "Bob", capacity=2)
+        service.assign_order("D1", "O1")
+        service.add_rating("D1", 4)
+        with self.assertRaises(ValueError):
+            service.onboard_driver("D2", "Dan", capacity=50)
+        self.assertIsNone(self.repo.get_by_id("D2")) # Rejected by the store: nothing stored in memory
+
+        self.repo.store.close()
+        self.repo.store = None
+        self.repo.clear()
+        self.assertEqual(self.repo.attach_store(MmapDriverStore(self.path)), 1)
+        driver = self.repo.get_by_id("D1")
+        self.assertEqual((driver.active_order_ids, driver.ratings_count), (["O1"], 1))
+        self.assertEqual(self.repo.find_available().id, "D1") # Indexes rebuilt on load
+
+
+if __name__ == '__main__':
+    unittest.main()
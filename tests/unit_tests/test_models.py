@@ -14,6 +14,8 @@ class TestModels(unittest.TestCase):
         self.assertEqual(d.name, "Bob")
         self.assertEqual(d.status, DriverStatus.AVAILABLE)
         self.assertEqual(d.average_rating, 0.0)
+        self.assertEqual(d.remaining_capacity, 1)
+        self.assertIsNone(d.current_order_id)
 
     def test_driver_rating_calculation(self):
         d = Driver(id="D1", name="Bob")
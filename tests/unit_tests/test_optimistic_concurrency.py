@@ -0,0 +1,56 @@
+import unittest
+import threading
+from repositories.driver_repository import InMemoryDriverRepository
+from repositories.optimistic import update_with_retry, ConcurrencyStats, ConflictError
+from services.driver_service import DriverService
+from models import Driver
+
+class TestOptimisticConcurrency(unittest.TestCase):
+    def setUp(self):
+        self.repo = InMemoryDriverRepository()
+        self.repo.clear()
+        self.stats = ConcurrencyStats()
+        self.stats.reset()
+        self.driver = Driver(id="D1", name="Bob")
+        self.repo.save(self.driver)
+
+    def test_compare_and_set(self):
+        version = self.driver.version
+        copy = Driver(id="D1", name="Bobby", version=version)
+        self.assertTrue(self.repo.compare_and_set(copy, version))
+        # Stored instance updated in place, so existing references see the write
+        self.assertEqual(self.driver.name, "Bobby")
+        self.assertEqual(self.driver.version, version + 1)
+        # A writer holding the old version loses
+        self.assertFalse(self.repo.compare_and_set(Driver(id="D1", name="Stale"), version))
+        self.assertEqual(self.driver.name, "Bobby")
+
+    def test_retry_on_conflict(self):
+        calls = []
+
+        def apply(driver):
+            calls.append(driver.version)
+            if len(calls) == 1:
+                self.repo.save(self.driver) # Another writer sneaks in between our read and our CAS
+            driver.ratings_count += 1
+
+        update_with_retry(self.repo, "D1", apply, "test.rate")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.driver.ratings_count, 1)
+        self.assertEqual(self.stats.snapshot()["test.rate"], {"updates": 1, "conflicts": 1, "retries_exhausted": 0})
+
+    def test_gives_up_after_max_retries(self):
+        with self.assertRaises(ConflictError):
+            update_with_retry(self.repo, "D1", lambda d: self.repo.save(self.driver), "test.hot", max_retries=3)
+        self.assertEqual(self.stats.snapshot()["test.hot"]["retries_exhausted"], 1)
+
+    def test_no_lost_updates_under_threads(self):
+        service = DriverService()
+        threads = [threading.Thread(target=lambda: [service.add_rating("D1", 1) for _ in range(200)])
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.driver.ratings_count, 1600)
+        self.assertEqual(self.driver.total_rating, 1600)
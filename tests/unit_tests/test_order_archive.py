@@ -0,0 +1,171 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from dataclasses import asdict, replace
+from unittest import mock
+from repositories.order_archive import OrderArchive
+from repositories.order_repository import InMemoryOrderRepository
+from repositories.optimistic import update_with_retry, _clone
+from constants.config import ORDER_RETENTION_SECONDS
+from constants.enums import OrderStatus
+from models import Order
+from utils import clock
+from utils.clock import VirtualClock
+from utils.logger import logger
+
+
+class TestOrderArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.archive = OrderArchive(os.path.join(self.tmp_dir, "archive"))
+
+    def tearDown(self):
+        self.archive.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_segment_lookup(self):
+        self.assertIsNone(self.archive.get("O1")) # No directory yet
+        orders = [Order(id=f"O{i}", customer_id="C1", item_id="ITEM1", status=OrderStatus.DELIVERED,
+                        created_at=float(i), delivered_at=float(i) + 1) for i in range(50)]
+        self.archive.write_segment(orders)
+        self.assertEqual(self.archive.get("O17"), orders[17])
+        self.assertIsNone(self.archive.get("O100"))
+        self.assertIsNone(self.archive.get("O")) # Prefix of stored ids
+        self.assertIsNone(self.archive.get("O" * 64)) # Longer than the index width
+
+        # A newer segment shadows the older copy; both survive a reopen
+        rated = Order(id="O17", customer_id="C1", item_id="ITEM1", status=OrderStatus.DELIVERED, rating=5)
+        self.archive.write_segment([rated])
+        self.archive.close()
+        reopened = OrderArchive(self.archive.directory)
+        self.assertEqual(reopened.segment_count(), 2)
+        self.assertEqual(reopened.get("O17").rating, 5)
+        self.assertEqual(reopened.get("O3"), orders[3])
+        self.assertEqual(len(list(reopened)), 51)
+        reopened.close()
+
+    def test_json_segment_rewritten_and_unreadable_skipped(self):
+        order = Order(id="O1", customer_id="C1", item_id="ITEM1", status=OrderStatus.DELIVERED, created_at=1.5)
+        self.archive.write_segment([order])
+        self.archive.close()
+        # Segment written before the codec: same index layout, JSON records (and no cancelled_at yet)
+        record = asdict(replace(order, id="O2"))
+        record["status"] = order.status.value
+        del record["cancelled_at"]
+        data = json.dumps(record).encode()
+        header = struct.pack("<8sIHH", b"ORDSEG01", 1, 2, 0)
+        with open(os.path.join(self.archive.directory, "00000002.seg"), "wb") as f:
+            f.write(header + b"O2" + struct.pack("<QI", len(header) + 2 + 12, len(data)) + data)
+        with open(os.path.join(self.archive.directory, "00000003.seg"), "wb") as f:
+            f.write(b"garbage")
+
+        with self.assertLogs(logger, level="ERROR"):
+            self.assertEqual(self.archive.get("O2"), replace(order, id="O2"))
+        self.assertEqual(self.archive.get("O1"), order)
+        self.assertIsNone(self.archive.get("O3")) # A miss still answers
+        self.assertEqual(self.archive.segment_count(), 2)
+        # The next segment is numbered past the skipped file instead of replacing it
+        self.assertTrue(self.archive.write_segment([replace(order, id="O3")]).endswith("00000004.seg"))
+        self.archive.close()
+        with open(os.path.join(self.archive.directory, "00000002.seg"), "rb") as f:
+            self.assertEqual(f.read(8), b"ORDSEG02") # Rewritten once, read through the codec from now on
+
+
+class TestOrderRetention(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.clock = VirtualClock(1000.0)
+        self.previous_clock = clock.set_clock(self.clock)
+        self.repo = InMemoryOrderRepository()
+        self.repo.clear()
+        self.previous_archive = self.repo.archive
+        self.repo.archive = OrderArchive(self.tmp_dir)
+
+    def tearDown(self):
+        self.repo.archive.close()
+        self.repo.archive = self.previous_archive
+        self.repo.clear()
+        clock.set_clock(self.previous_clock)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_spill_and_read_back(self):
+        for i in range(4):
+            self.repo.save(Order(id=f"O{i}", customer_id="C1", item_id="ITEM1", driver_id="D1",
+                                 status=OrderStatus.DELIVERED if i < 3 else OrderStatus.ASSIGNED))
+        self.assertEqual(self.repo.spill(force=True), 0) # Nothing old enough yet
+        self.clock.advance(ORDER_RETENTION_SECONDS + 1)
+        self.assertEqual(self.repo.spill(), 0) # Below the batch size
+        self.assertEqual(self.repo.spill(force=True), 3)
+
+        self.assertEqual(sorted(self.repo.orders), ["O3"])
+        self.assertEqual([o.id for o in self.repo.snapshot().values()], ["O3"])
+        self.assertEqual(self.repo.get_by_id("O1").status, OrderStatus.DELIVERED)
+        history = self.repo.get_customer_history("C1", 10)
+        self.assertEqual([o.id for o in history.items], ["O3", "O2", "O1", "O0"])
+
+        # Updating an archived order makes it resident again
+        def rate(order):
+            order.rating = 4
+        update_with_retry(self.repo, "O1", rate, "test_rating")
+        self.assertIs(self.repo.get_by_id("O1"), self.repo.orders["O1"])
+        self.assertEqual(self.repo.get_by_id("O1").rating, 4)
+        self.assertEqual([o.id for o in self.repo.get_driver_history("D1", 10).items], ["O3", "O2", "O1", "O0"])
+
+    def test_history_rebuilt_from_archive(self):
+        for i in range(3):
+            self.repo.save(Order(id=f"O{i}", customer_id="C1", item_id="ITEM1", status=OrderStatus.CANCELLED,
+                                 created_at=float(i)))
+        self.clock.advance(ORDER_RETENTION_SECONDS + 1)
+        self.repo.spill(force=True)
+        self.repo.clear() # Restart: nothing resident
+        # Only record heads are read at startup; no order is decoded until a lookup needs it
+        with mock.patch("repositories.order_archive.codec.decode", side_effect=AssertionError("full decode")):
+            self.assertEqual(self.repo.load_archive(), 3)
+        self.assertEqual([o.id for o in self.repo.get_customer_history("C1", 10).items], ["O2", "O1", "O0"])
+
+    def test_retention_counts_from_the_terminal_time(self):
+        service_now = self.clock.now()
+        orders = [Order(id="O0", customer_id="C1", item_id="ITEM1", status=OrderStatus.DELIVERED,
+                        created_at=service_now - 50, delivered_at=service_now - 10),
+                  Order(id="O1", customer_id="C1", item_id="ITEM1", status=OrderStatus.CANCELLED,
+                        created_at=service_now - 40, cancelled_at=service_now - 30)]
+        for order in orders:
+            self.repo.save(order)
+        # Restart well after both became terminal: loading must not make them fresh again
+        self.clock.advance(ORDER_RETENTION_SECONDS)
+        resident = [_clone(o) for o in self.repo.get_all()]
+        self.repo.clear()
+        # A fresh order tracked ahead of the older ones does not hold them back
+        self.repo.save(Order(id="O2", customer_id="C1", item_id="ITEM1", status=OrderStatus.DELIVERED,
+                             delivered_at=self.clock.now()))
+        for order in resident:
+            self.repo.save(order)
+        self.assertEqual(self.repo.spill(force=True), 2)
+        self.assertEqual(sorted(self.repo.orders), ["O2"])
+        self.assertEqual(self.repo.get_by_id("O1").cancelled_at, service_now - 30) # Read back from the archive
+
+    def test_restored_order_not_listed_twice_after_restart(self):
+        for i in range(2):
+            self.repo.save(Order(id=f"O{i}", customer_id="C1", item_id="ITEM1", driver_id="D1",
+                                 status=OrderStatus.DELIVERED, created_at=float(i)))
+        self.clock.advance(ORDER_RETENTION_SECONDS + 1)
+        self.repo.spill(force=True)
+        update_with_retry(self.repo, "O1", lambda order: setattr(order, "rating", 5), "test_rating") # Resident again
+        self.repo.save(Order(id="O2", customer_id="C1", item_id="ITEM1", driver_id="D1", created_at=2.0))
+
+        # Restart: the archive is replayed, then the snapshot (which also holds O1) is loaded
+        resident = sorted((_clone(o) for o in self.repo.get_all()), key=lambda o: o.created_at)
+        self.repo.clear()
+        self.repo.load_archive()
+        for order in resident:
+            self.repo.save(order)
+        self.assertEqual([o.id for o in self.repo.get_customer_history("C1", 10).items], ["O2", "O1", "O0"])
+        self.assertEqual([o.id for o in self.repo.get_driver_history("D1", 10).items], ["O2", "O1", "O0"])
+        self.assertEqual(self.repo.get_by_id("O1").rating, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
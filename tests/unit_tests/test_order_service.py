@@ -45,3 +45,28 @@ class TestOrderService(unittest.TestCase):
 
         # Valid: PICKED_UP -> DELIVERED
         self.service.transition_state(o.id, OrderStatus.DELIVERED)
+
+    def test_history_pages(self):
+        self.service.onboard_customer("C1", "Alice")
+        self.service.onboard_customer("C2", "Bob")
+        created = []
+        for i in range(5):
+            created.append(self.service.create_order("C1", "ITEM2").id)
+            self.service.create_order("C2", "ITEM2")
+        self.service.transition_state(created[1], OrderStatus.ASSIGNED, driver_id="D1")
+        self.service.transition_state(created[3], OrderStatus.ASSIGNED, driver_id="D1")
+
+        first = self.service.get_customer_history("C1", limit=2)
+        self.assertEqual([o.id for o in first.items], created[:2:-1]) # Newest first
+        second = self.service.get_customer_history("C1", limit=2, cursor=first.next_cursor)
+        last = self.service.get_customer_history("C1", limit=2, cursor=second.next_cursor)
+        self.assertEqual([o.id for o in second.items + last.items], created[2::-1])
+        self.assertIsNone(last.next_cursor)
+
+        drivers = self.service.get_driver_history("D1")
+        self.assertEqual([o.id for o in drivers.items], [created[3], created[1]])
+        self.assertEqual(self.service.get_customer_history("C9").items, [])
+        with self.assertRaises(ValueError):
+            self.service.get_customer_history("C1", limit=0)
+        with self.assertRaises(ValueError):
+            self.service.get_customer_history("C1", cursor="not-a-cursor")
@@ -0,0 +1,96 @@
+import unittest
+import threading
+from repositories.order_repository import InMemoryOrderRepository
+from utils.persistent_map import PersistentMap
+from models import Order
+from constants.enums import OrderStatus
+
+class _CollidingKey:
+    """Distinct keys that share one hash, to exercise collision slots."""
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        return 7
+
+    def __eq__(self, other):
+        return isinstance(other, _CollidingKey) and other.name == self.name
+
+class TestPersistentMap(unittest.TestCase):
+    def test_set_get_remove_keeps_old_versions(self):
+        m0 = PersistentMap()
+        maps = [m0]
+        for i in range(2000):
+            maps.append(maps[-1].set(f"K{i}", i))
+        m = maps[-1]
+        self.assertEqual(len(m), 2000)
+        self.assertEqual(m["K1234"], 1234)
+        self.assertEqual(len(maps[10]), 10)
+        self.assertNotIn("K10", maps[10])
+        self.assertEqual(len(m0), 0)
+
+        updated = m.set("K5", "five")
+        self.assertEqual(len(updated), 2000)
+        self.assertEqual(updated["K5"], "five")
+        self.assertEqual(m["K5"], 5)
+
+        smaller = m.remove("K5").remove("missing")
+        self.assertEqual(len(smaller), 1999)
+        self.assertNotIn("K5", smaller)
+        self.assertEqual(sorted(smaller.values()), [i for i in range(2000) if i != 5])
+
+    def test_hash_collisions(self):
+        a, b, c = _CollidingKey("a"), _CollidingKey("b"), _CollidingKey("c")
+        m = PersistentMap().set(a, 1).set(b, 2).set(c, 3).set(b, 20)
+        self.assertEqual(len(m), 3)
+        self.assertEqual((m[a], m[b], m[c]), (1, 20, 3))
+        m = m.remove(a).remove(c)
+        self.assertEqual(dict(m.items()), {b: 20})
+        with self.assertRaises(KeyError):
+            m[a]
+
+class TestRepositorySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.repo = InMemoryOrderRepository()
+        self.repo.clear()
+
+    def tearDown(self):
+        self.repo.clear()
+
+    def test_snapshot_is_point_in_time(self):
+        order = Order(id="O1", customer_id="C1", item_id="ITEM1")
+        self.repo.save(order)
+        before = self.repo.snapshot()
+
+        order.status = OrderStatus.CANCELLED
+        self.repo.save(order)
+        self.repo.save(Order(id="O2", customer_id="C1", item_id="ITEM2"))
+        after = self.repo.snapshot()
+
+        # Mutating the live instance never leaks into a snapshot already taken
+        self.assertEqual(before["O1"].status, OrderStatus.CREATED)
+        self.assertEqual(len(before), 1)
+        self.assertEqual(after["O1"].status, OrderStatus.CANCELLED)
+        self.assertEqual(set(after), {"O1", "O2"})
+        self.assertGreater(after.version, before.version)
+
+    def test_compare_and_set_publishes(self):
+        self.repo.save(Order(id="O1", customer_id="C1", item_id="ITEM1"))
+        stored = self.repo.get_by_id("O1")
+        update = Order(id="O1", customer_id="C1", item_id="ITEM1", status=OrderStatus.ASSIGNED)
+        self.assertTrue(self.repo.compare_and_set(update, stored.version))
+        self.assertEqual(self.repo.snapshot()["O1"].status, OrderStatus.ASSIGNED)
+
+    def test_scan_does_not_block_writers(self):
+        for i in range(100):
+            self.repo.save(Order(id=f"O{i}", customer_id="C1", item_id="ITEM1"))
+        snap = self.repo.snapshot()
+        scanned = []
+        with self.repo.lock: # A writer holds the lock: the scan must still complete
+            t = threading.Thread(target=lambda: scanned.extend(snap.values()))
+            t.start()
+            t.join(timeout=2)
+        self.assertEqual(len(scanned), 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+import os
+import sqlite3
+import shutil
+import tempfile
+import threading
+from repositories.sqlite_repository import (
+    SqliteConnectionPool, SqliteOrderRepository, SqliteDriverRepository, SqliteCustomerRepository
+)
+from services.order_service import OrderService
+from services.driver_service import DriverService
+from constants.enums import OrderStatus, DriverStatus
+from models import Order, Driver
+
+class TestSqliteRepository(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pool = SqliteConnectionPool(os.path.join(self.tmp_dir, "test.db"))
+        self.orders = SqliteOrderRepository(self.pool)
+        self.drivers = SqliteDriverRepository(self.pool)
+        self.customers = SqliteCustomerRepository(self.pool)
+
+    def tearDown(self):
+        self.pool.close_all()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_wal_mode(self):
+        mode = self.pool.connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_save_and_get_roundtrip(self):
+        self.drivers.save(Driver(id="D1", name="Bob"))
+        d = self.drivers.get_by_id("D1")
+        self.assertEqual(d.status, DriverStatus.AVAILABLE)
+
+        d.status = DriverStatus.BUSY
+        d.active_order_ids.append("O1")
+        self.drivers.save(d) # Upsert
+        self.assertEqual(self.drivers.get_by_id("D1").current_order_id, "O1")
+        self.assertEqual([x.id for x in self.drivers.get_by_status(DriverStatus.BUSY)], ["D1"])
+        self.assertIsNone(self.drivers.get_by_id("DX"))
+
+    def test_adds_columns_to_older_databases(self):
+        path = os.path.join(self.tmp_dir, "old.db")
+        with sqlite3.connect(path) as conn: # Orders table as created before cancelled_at existed
+            conn.execute("CREATE TABLE orders (id TEXT PRIMARY KEY, customer_id TEXT NOT NULL, item_id TEXT NOT NULL, "
+                         "quantity INTEGER NOT NULL, status TEXT NOT NULL, driver_id TEXT, created_at REAL NOT NULL, "
+                         "assigned_at REAL, picked_up_at REAL, delivered_at REAL, rating INTEGER, "
+                         "version INTEGER NOT NULL DEFAULT 0)")
+        conn.close()
+        pool = SqliteConnectionPool(path)
+        orders = SqliteOrderRepository(pool)
+        orders.save(Order(id="O1", customer_id="C1", item_id="ITEM1", status=OrderStatus.CANCELLED, cancelled_at=5.0))
+        self.assertEqual(orders.get_by_id("O1").cancelled_at, 5.0)
+        pool.close_all()
+
+    def test_find_available_prefers_spare_capacity(self):
+        self.drivers.save(Driver(id="D1", name="Bob"))
+        self.drivers.save(Driver(id="D2", name="Dan", capacity=3, active_order_ids=["O1"]))
+        self.drivers.save(Driver(id="D3", name="Eve", status=DriverStatus.BUSY))
+        self.assertEqual(self.drivers.find_available().id, "D2")
+        self.assertEqual(self.drivers.available_capacity(), 3)
+
+    def test_find_best_scores_available_drivers(self):
+        self.drivers.save(Driver(id="D1", name="Bob", total_rating=6, ratings_count=2))
+        self.drivers.save(Driver(id="D2", name="Dan", total_rating=10, ratings_count=2))
+        self.drivers.save(Driver(id="D3", name="Eve", status=DriverStatus.BUSY, total_rating=5, ratings_count=1))
+        self.assertEqual(self.drivers.find_best({"rating": 1.0}).id, "D2")
+        self.assertEqual(self.drivers.find_best({"rating": 1.0}, skip=lambda d: d == "D2").id, "D1")
+
+    def test_history_keyset_pages(self):
+        for i in range(5):
+            self.orders.save(Order(id=f"O{i}", customer_id="C1", item_id="ITEM1", created_at=100.0 + i // 2,
+                                   driver_id="D1" if i % 2 else None))
+        self.orders.save(Order(id="X", customer_id="C2", item_id="ITEM1", created_at=101.0))
+        pages, cursor = [], None
+        while True:
+            page = self.orders.get_customer_history("C1", 2, cursor)
+            pages.append([o.id for o in page.items])
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        # Ties on created_at are broken by id, so no row is skipped or repeated across pages
+        self.assertEqual(pages, [["O4", "O3"], ["O2", "O1"], ["O0"]])
+        self.assertEqual([o.id for o in self.orders.get_driver_history("D1", 10).items], ["O3", "O1"])
+
+    def test_compare_and_set(self):
+        self.orders.save(Order(id="O1", customer_id="C1", item_id="ITEM1"))
+        stored = self.orders.get_by_id("O1")
+        stored.status = OrderStatus.CANCELLED
+        self.assertTrue(self.orders.compare_and_set(stored, stored.version))
+
+        stale = Order(id="O1", customer_id="C1", item_id="ITEM1", status=OrderStatus.ASSIGNED, version=1)
+        self.assertFalse(self.orders.compare_and_set(stale, 1))
+        self.assertEqual(stale.version, 1)
+        self.assertEqual(self.orders.get_by_id("O1").status, OrderStatus.CANCELLED)
+
+    def test_bulk_upsert_and_indexed_queries(self):
+        orders = [Order(id=f"O{i}", customer_id=f"C{i % 2}", item_id="ITEM1") for i in range(10)]
+        self.orders.save_all(orders)
+        orders[0].status = OrderStatus.ASSIGNED
+        orders[0].driver_id = "D1"
+        self.orders.save_all(orders[:1])
+
+        self.assertEqual(len(self.orders.get_all()), 10)
+        self.assertEqual(len(self.orders.get_by_customer("C0")), 5)
+        self.assertEqual([o.id for o in self.orders.get_by_driver("D1")], ["O0"])
+        self.assertEqual(len(self.orders.get_by_status(OrderStatus.CREATED)), 9)
+
+    def test_connection_per_thread(self):
+        conns = []
+        t = threading.Thread(target=lambda: conns.append(self.pool.connection()))
+        t.start()
+        t.join()
+        self.assertIsNot(conns[0], self.pool.connection())
+
+    def test_services_over_sqlite(self):
+        order_service = OrderService(self.orders, self.customers)
+        driver_service = DriverService(self.drivers)
+        order_service.onboard_customer("C1", "Alice")
+        driver_service.onboard_driver("D1", "Bob")
+
+        order = order_service.create_order("C1", "ITEM1")
+        order_service.transition_state(order.id, OrderStatus.ASSIGNED, driver_id="D1")
+        self.assertEqual(driver_service.assign_order("D1", order.id).status, DriverStatus.BUSY)
+
+        stored = order_service.get_order(order.id)
+        self.assertEqual(stored.status, OrderStatus.ASSIGNED)
+        self.assertEqual(stored.driver_id, "D1")
+        self.assertIsNotNone(stored.assigned_at)
+        self.assertEqual(driver_service.release_order("D1", order.id).status, DriverStatus.AVAILABLE)
+
+    def test_snapshot(self):
+        self.orders.save(Order(id="O1", customer_id="C1", item_id="ITEM1"))
+        snap = self.orders.snapshot()
+        self.orders.save(Order(id="O2", customer_id="C1", item_id="ITEM1"))
+        self.assertEqual(list(snap), ["O1"])
+        self.assertEqual(len(self.orders.snapshot()), 2)
+
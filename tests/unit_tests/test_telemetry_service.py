@@ -0,0 +1,118 @@
+import threading
+import unittest
+from models import DriverTelemetry
+from services.assignment_service import AssignmentService
+from services.telemetry_service import TelemetryService
+from constants.enums import OrderStatus
+from utils import clock
+from utils.clock import VirtualClock
+
+
+class TestTelemetryService(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.previous_clock = clock.set_clock(self.clock)
+        self.telemetry = TelemetryService()
+        self.telemetry.clear()
+
+    def tearDown(self):
+        self.telemetry.clear()
+        clock.set_clock(self.previous_clock)
+
+    def test_batches_coalesce_to_newest(self):
+        result = self.telemetry.ingest([
+            DriverTelemetry("D1", 990.0, 12.90, 77.50),
+            DriverTelemetry("D1", 995.0, 12.91, 77.51),
+            DriverTelemetry("D1", 993.0, 12.99, 77.59), # Arrived late within the batch
+            DriverTelemetry("D2", 994.0),
+        ])
+        self.assertEqual(result.accepted, 2)
+        self.assertEqual(self.telemetry.get_latest("D1"), DriverTelemetry("D1", 995.0, 12.91, 77.51))
+
+        # Older than what is stored: dropped. A heartbeat keeps the last known position
+        self.telemetry.ingest([DriverTelemetry("D1", 994.0, 0.0, 0.0)])
+        self.telemetry.heartbeat("D1")
+        self.assertEqual(self.telemetry.get_latest("D1"), DriverTelemetry("D1", 1000.0, 12.91, 77.51))
+
+        stats = self.telemetry.stats()
+        self.assertEqual((stats["received"], stats["applied"], stats["coalesced"], stats["out_of_order"]), (6, 3, 2, 1))
+        self.assertEqual(stats["tracked"], 2)
+
+    def test_missed_heartbeats_make_driver_stale(self):
+        self.telemetry.heartbeat("D1")
+        self.assertFalse(self.telemetry.is_stale("D1"))
+        self.assertFalse(self.telemetry.is_stale("UNKNOWN")) # Never reported: not tracked
+        self.clock.advance(self.telemetry.stale_after + 1)
+        self.assertTrue(self.telemetry.is_stale("D1"))
+        self.assertEqual(self.telemetry.stale_drivers(), ["D1"])
+
+        result = self.telemetry.heartbeat("D1")
+        self.assertEqual(result.recovered, ["D1"])
+        self.assertFalse(self.telemetry.is_stale("D1"))
+
+    def test_has_stale(self):
+        self.assertFalse(self.telemetry.has_stale())
+        self.telemetry.heartbeat("D1")
+        self.clock.advance(self.telemetry.stale_after / 2)
+        self.telemetry.heartbeat("D2")
+        self.assertFalse(self.telemetry.has_stale())
+        self.clock.advance(self.telemetry.stale_after / 2 + 1)
+        self.assertTrue(self.telemetry.has_stale()) # D1 only
+        self.telemetry.heartbeat("D1")
+        self.assertFalse(self.telemetry.has_stale())
+        # A late first reading older than everything tracked is noticed too
+        self.telemetry.ingest([DriverTelemetry("D3", self.clock.now() - self.telemetry.stale_after - 1)])
+        self.assertTrue(self.telemetry.has_stale())
+        self.telemetry.forget("D3")
+        self.assertFalse(self.telemetry.has_stale())
+
+    def test_concurrent_ingest(self):
+        def report(worker):
+            for i in range(200):
+                self.telemetry.ingest(DriverTelemetry(f"D{d}", 1000.0 + i, worker, i) for d in range(50))
+
+        threads = [threading.Thread(target=report, args=(w,)) for w in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.telemetry.stats()["received"], 4 * 200 * 50)
+        self.assertTrue(all(self.telemetry.get_latest(f"D{d}").timestamp == 1199.0 for d in range(50)))
+
+    def test_assignment_skips_stale_drivers(self):
+        AssignmentService._instance = None
+        assignment = AssignmentService()
+        assignment.pending_orders.clear()
+        assignment.order_service.order_repo.clear()
+        assignment.driver_service.repo.clear()
+        assignment.order_service.onboard_customer("C1", "Alice")
+        assignment.driver_service.onboard_driver("D1", "Bob", capacity=3) # Preferred: most spare capacity
+        assignment.driver_service.onboard_driver("D2", "Carol")
+
+        # Nobody stale: no skip filter is handed to the strategy
+        selected = []
+        select = assignment.strategy.select
+        assignment.strategy.select = lambda order, skip=None: selected.append(skip) or select(order, skip)
+        order = assignment.order_service.create_order("C1", "ITEM3")
+        assignment.queue_order(order.id)
+        assignment.cancel_order(order.id)
+        self.assertEqual(selected, [None])
+
+        self.telemetry.heartbeat("D1")
+        self.clock.advance(self.telemetry.stale_after + 1)
+        order = assignment.order_service.create_order("C1", "ITEM1")
+        assignment.queue_order(order.id)
+        self.assertEqual(assignment.order_service.get_order(order.id).driver_id, "D2")
+
+        # With D2 busy the next order waits rather than going to the unreachable D1
+        order2 = assignment.order_service.create_order("C1", "ITEM2")
+        assignment.queue_order(order2.id)
+        self.assertEqual(assignment.order_service.get_order(order2.id).status, OrderStatus.CREATED)
+        self.telemetry.heartbeat("D1")
+        assignment.on_driver_available("D1")
+        self.assertEqual(assignment.order_service.get_order(order2.id).driver_id, "D1")
+        AssignmentService._instance = None
+
+
+if __name__ == '__main__':
+    unittest.main()
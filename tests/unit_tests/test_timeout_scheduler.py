@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+from scheduler.timeout_scheduler import OrderTimeoutScheduler
+from services.assignment_service import AssignmentService
+from constants.enums import OrderStatus
+from utils import clock
+from utils.clock import VirtualClock
+
+class TestOrderTimeoutScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=1000.0)
+        self.previous_clock = clock.set_clock(self.clock)
+        AssignmentService._instance = None
+        self.scheduler = OrderTimeoutScheduler(timeout_seconds=60)
+        self.scheduler.order_service.order_repo.clear()
+        self.scheduler.order_service.customer_repo.clear()
+        self.scheduler.assignment_service.driver_service.repo.clear()
+
+    def tearDown(self):
+        self.scheduler.stop(5)
+        clock.set_clock(self.previous_clock)
+        AssignmentService._instance = None
+
+    def test_timeout_without_sleeping(self):
+        service = self.scheduler.order_service
+        service.onboard_customer("C1", "Alice")
+        order = service.create_order("C1", "ITEM1")
+        self.assertEqual(order.created_at, 1000.0)
+
+        self.clock.advance(59)
+        self.assertEqual(self.scheduler.check_timeouts(), 0)
+
+        self.clock.advance(2)
+        self.assertEqual(self.scheduler.check_timeouts(), 1)
+        self.assertEqual(order.status, OrderStatus.CANCELLED)
+
+    def test_counts_only_orders_it_cancelled(self):
+        service = self.scheduler.order_service
+        service.onboard_customer("C1", "Alice")
+        order = service.create_order("C1", "ITEM1")
+        stale = service.orders_snapshot()
+        # Cancelled by the customer after the sweep took its snapshot: nothing left for the sweep to do
+        self.assertTrue(self.scheduler.assignment_service.cancel_order(order.id))
+        service.orders_snapshot = lambda: stale
+
+        self.clock.advance(61)
+        self.assertEqual(self.scheduler.check_timeouts(), 0)
+        self.assertEqual(order.status, OrderStatus.CANCELLED)
+
+    def test_thread_follows_the_virtual_clock(self):
+        service = self.scheduler.order_service
+        service.onboard_customer("C1", "Alice")
+        order = service.create_order("C1", "ITEM1")
+        self.scheduler.start()
+
+        # The thread waits on virtual time: it neither moves the clock nor sweeps on its own
+        time.sleep(0.2)
+        self.assertEqual(self.clock.now(), 1000.0)
+        self.assertEqual(order.status, OrderStatus.CREATED)
+
+        self.clock.advance(61)
+        deadline = time.monotonic() + 5
+        while order.status != OrderStatus.CANCELLED and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(order.status, OrderStatus.CANCELLED)
+        self.assertEqual(self.clock.now(), 1061.0)
+
+        # stop() interrupts the wait without anyone advancing the clock
+        self.scheduler.stop(5)
+        self.assertFalse(self.scheduler.running)
+
+    def test_sleep_blocks_until_advanced(self):
+        woke = threading.Event()
+        sleeper = threading.Thread(target=lambda: (self.clock.sleep(10), woke.set()))
+        sleeper.start()
+        self.clock.advance(5)
+        self.assertFalse(woke.wait(0.1))
+        self.clock.advance(5)
+        self.assertTrue(woke.wait(5))
+        sleeper.join(5)
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from utils import tracing
+from utils.tracing import FileSpanExporter, Tracer, span, traced
+from models import Order
+from repositories.sqlite_repository import SqliteConnectionPool, SqliteOrderRepository
+
+
+class _ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, finished):
+        self.spans.append(finished.to_dict())
+
+    def flush(self):
+        pass
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.exporter = _ListExporter()
+        self.previous = tracing.set_tracer(Tracer(1.0, self.exporter))
+
+    def tearDown(self):
+        tracing.set_tracer(self.previous)
+
+    def test_nested_spans_share_trace(self):
+        @traced("service.op")
+        def op():
+            with span("repo.save", entity="O1"):
+                pass
+
+        with span("controller.create_order") as root:
+            op()
+        names = [s["name"] for s in self.exporter.spans]
+        self.assertEqual(names, ["repo.save", "service.op", "controller.create_order"])
+        by_name = {s["name"]: s for s in self.exporter.spans}
+        self.assertEqual({s["trace_id"] for s in self.exporter.spans}, {root.trace_id})
+        self.assertIsNone(by_name["controller.create_order"]["parent_id"])
+        self.assertEqual(by_name["service.op"]["parent_id"], root.span_id)
+        self.assertEqual(by_name["repo.save"]["parent_id"], by_name["service.op"]["span_id"])
+        self.assertEqual(by_name["repo.save"]["attrs"], {"entity": "O1"})
+        self.assertIsNone(tracing.current_span())
+
+    def test_error_is_recorded(self):
+        with self.assertRaises(ValueError):
+            with span("controller.cancel_order"):
+                raise ValueError("boom")
+        self.assertEqual(self.exporter.spans[0]["attrs"]["error"], "ValueError")
+
+    def test_threads_and_tasks_keep_their_own_stack(self):
+        def worker(name):
+            with span(name):
+                with span(f"{name}.child"):
+                    pass
+
+        threads = [threading.Thread(target=worker, args=(f"t{i}",)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        async def task(name):
+            with span(name):
+                await asyncio.sleep(0)
+                with span(f"{name}.child"):
+                    await asyncio.sleep(0)
+
+        async def run_tasks():
+            await asyncio.gather(*(task(f"a{i}") for i in range(4)))
+        asyncio.run(run_tasks())
+
+        by_id = {s["span_id"]: s for s in self.exporter.spans}
+        children = [s for s in self.exporter.spans if s["name"].endswith(".child")]
+        self.assertEqual(len(children), 8)
+        for child in children:
+            self.assertEqual(by_id[child["parent_id"]]["name"] + ".child", child["name"])
+
+    def test_sampling_is_decided_per_trace(self):
+        tracing.set_tracer(Tracer(0.0, self.exporter))
+        with span("root") as root:
+            self.assertIsNone(root)
+        # A trace that loses the draw records none of its children
+        tracing.set_tracer(Tracer(1e-12, self.exporter))
+        for _ in range(50):
+            with span("root"):
+                with span("child"):
+                    pass
+        self.assertEqual(self.exporter.spans, [])
+
+    def test_sqlite_spans_only_when_enabled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pool = SqliteConnectionPool(os.path.join(tmp, "test.db"))
+            repo = SqliteOrderRepository(pool)
+            repo.save(Order(id="O1", customer_id="C1", item_id="ITEM1"))
+            repo.get_by_id("O1")
+            self.assertEqual([s["name"] for s in self.exporter.spans], ["Sqlite.orders.save", "Sqlite.orders.get_by_id"])
+
+            tracing.set_tracer(Tracer(0.0, self.exporter))
+            with patch("repositories.sqlite_repository.span") as no_span:
+                repo.get_by_id("O1")
+                repo.get_customer_history("C1", 10)
+            no_span.assert_not_called() # Disabled: no context manager is even built
+            pool.close_all()
+
+    def test_file_exporter_and_fold(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces", "spans.jsonl")
+            tracing.set_tracer(Tracer(1.0, FileSpanExporter(path, batch_size=100)))
+            with span("controller.complete_order"):
+                with span("OrderService.transition_state"):
+                    pass
+            self.assertFalse(os.path.exists(path)) # Buffered until flush
+            tracing.flush()
+            spans = tracing.load_spans(path)
+        self.assertEqual(len(spans), 2)
+        folded = tracing.fold(spans)
+        self.assertEqual(set(folded), {"controller.complete_order",
+                                       "controller.complete_order;OrderService.transition_state"})
+        total = sum(s["duration_us"] for s in spans if s["parent_id"] is None)
+        self.assertAlmostEqual(sum(folded.values()), total, delta=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
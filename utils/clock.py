@@ -0,0 +1,77 @@
+import threading
+import time
+
+
+class SystemClock:
+    """Wall-clock time; the default everywhere."""
+    def now(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        """Sleeps until `event` is set or `seconds` pass; True if the event was set."""
+        return event.wait(seconds)
+
+
+class VirtualClock:
+    """
+    Manually driven time for tests and simulation: only advance() and set() move it.
+    sleep() and wait() block until some other thread moves the clock far enough, so background
+    threads (e.g. the timeout scheduler) run in step with the driving thread instead of moving
+    time themselves.
+    """
+    _EVENT_POLL_SECONDS = 0.05 # Real-time bound on noticing a set event while waiting
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._cond = threading.Condition()
+
+    def now(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float):
+        if seconds < 0:
+            raise ValueError("Cannot move a clock backwards.")
+        with self._cond:
+            self._now += seconds
+            self._cond.notify_all()
+
+    def set(self, timestamp: float):
+        with self._cond:
+            if timestamp < self._now:
+                raise ValueError("Cannot move a clock backwards.")
+            self._now = timestamp
+            self._cond.notify_all()
+
+    def sleep(self, seconds: float):
+        with self._cond:
+            deadline = self._now + seconds
+            while self._now < deadline:
+                self._cond.wait()
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        with self._cond:
+            deadline = self._now + seconds
+            while not event.is_set() and self._now < deadline:
+                self._cond.wait(self._EVENT_POLL_SECONDS) # Event.set() does not notify us
+        return event.is_set()
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock):
+    """Installs a process-wide clock; returns the previous one so callers can restore it."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+def now() -> float:
+    return _clock.now()
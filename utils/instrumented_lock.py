@@ -0,0 +1,309 @@
+"""
+Lock contention profiling. make_lock(name) returns a plain threading lock unless LOCK_PROFILING or
+LOCK_DEBUG is set, in which case it returns an InstrumentedLock that records per-lock wait and hold
+time histograms and the call sites that waited longest. With LOCK_DEBUG it also builds the
+"acquired while holding" graph at runtime and reports lock-order inversions (potential deadlocks)
+the first time the reversed order is seen, before the acquire that could block forever.
+
+    LOCK_PROFILING=1 python main.py   # report printed to stderr at exit
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from constants import config
+from utils.logger import logger
+
+# Histogram buckets are powers of two in microseconds: bucket i holds durations in [2^(i-1), 2^i)
+_BUCKETS = 32
+_THIS_FILE = os.path.normcase(__file__)
+
+
+def _bucket(us: float) -> int:
+    return min(int(us).bit_length(), _BUCKETS - 1)
+
+
+def _percentile(hist: List[int], q: float) -> float:
+    """Upper bound (microseconds) of the bucket holding the q-th quantile."""
+    total = sum(hist)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(hist):
+        seen += count
+        if seen >= rank:
+            return float(1 << i) if i else 1.0
+    return float(1 << (_BUCKETS - 1))
+
+
+def _call_site() -> str:
+    # First frame outside this module: the code that asked for the lock
+    frame = sys._getframe(1)
+    while frame and os.path.normcase(frame.f_code.co_filename) == _THIS_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+class LockStats:
+    """Counters for one lock. Updated only by the thread holding that lock, so they need no lock of their own."""
+    def __init__(self, name: str):
+        self.name = name
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait_us = 0.0
+        self.max_wait_us = 0.0
+        self.total_hold_us = 0.0
+        self.max_hold_us = 0.0
+        self.wait_hist = [0] * _BUCKETS
+        self.hold_hist = [0] * _BUCKETS
+        self.sites: Dict[str, List[float]] = {} # call site -> [contended acquisitions, total wait us]
+
+
+class LockOrderInversion(Exception):
+    """Describes two locks acquired in both orders; recorded (and logged), not raised by default."""
+    def __init__(self, first: str, second: str, first_site: str, second_site: str):
+        super().__init__(f"Lock order inversion: {first} -> {second} at {first_site}, "
+                         f"but {second} -> ... -> {first} at {second_site}")
+        self.first, self.second = first, second
+        self.first_site, self.second_site = first_site, second_site
+
+
+class LockProfiler:
+    """Process-wide registry of instrumented locks, their stats and the lock-order graph."""
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super(LockProfiler, cls).__new__(cls)
+            cls._instance.lock = threading.Lock()
+            cls._instance.stats: List[LockStats] = []
+            cls._instance.edges: Dict[str, Dict[str, str]] = {} # held -> {acquired: first call site}
+            cls._instance.inversions: List[LockOrderInversion] = []
+            cls._instance.raise_on_inversion = False
+            cls._instance._reported: Set[Tuple[str, str]] = set()
+            cls._instance._local = threading.local()
+            cls._instance._atexit_registered = False
+        return cls._instance
+
+    def register(self, name: str) -> LockStats:
+        stats = LockStats(name)
+        with self.lock:
+            self.stats.append(stats)
+        return stats
+
+    def dump_at_exit(self):
+        with self.lock:
+            if self._atexit_registered:
+                return
+            self._atexit_registered = True
+        atexit.register(self.dump)
+
+    def held(self) -> List[str]:
+        """Names of the locks the calling thread holds, outermost first."""
+        held = getattr(self._local, "held", None)
+        if held is None:
+            held = self._local.held = []
+        return held
+
+    def check_order(self, name: str):
+        """Records held -> name edges for the calling thread; reports a cycle the first time one appears."""
+        for held in self.held():
+            if held == name or name in self.edges.get(held, ()): # Known edge: the common, lock-free path
+                continue
+            site = _call_site()
+            with self.lock:
+                path = self._path(name, held)
+                self.edges.setdefault(held, {})[name] = site
+                if path is None or (held, name) in self._reported:
+                    continue
+                self._reported.add((held, name))
+                inversion = LockOrderInversion(held, name, site, self.edges[path[0]][path[1]])
+                self.inversions.append(inversion)
+            logger.warning(f"[Locks] {inversion}")
+            if self.raise_on_inversion:
+                raise inversion
+
+    def _path(self, start: str, goal: str) -> Optional[List[str]]:
+        # Caller holds self.lock; depth-first search over the acquisition graph
+        stack, parents = [start], {start: None}
+        while stack:
+            node = stack.pop()
+            if node == goal:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                return path[::-1]
+            for nxt in self.edges.get(node, ()):
+                if nxt not in parents:
+                    parents[nxt] = node
+                    stack.append(nxt)
+        return None
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Per-lock wait/hold summaries (most waited-on first), top contended call sites and inversions."""
+        with self.lock:
+            all_stats = list(self.stats)
+            inversions = list(self.inversions)
+        merged: Dict[str, Dict[str, Any]] = {}
+        sites: Dict[Tuple[str, str], List[float]] = {}
+        for s in all_stats: # Locks created per instance (e.g. one per SQLite table) merge by name
+            m = merged.setdefault(s.name, {"acquisitions": 0, "contended": 0, "total_wait_us": 0.0,
+                                           "max_wait_us": 0.0, "total_hold_us": 0.0, "max_hold_us": 0.0,
+                                           "wait_hist": [0] * _BUCKETS, "hold_hist": [0] * _BUCKETS})
+            m["acquisitions"] += s.acquisitions
+            m["contended"] += s.contended
+            m["total_wait_us"] += s.total_wait_us
+            m["total_hold_us"] += s.total_hold_us
+            m["max_wait_us"] = max(m["max_wait_us"], s.max_wait_us)
+            m["max_hold_us"] = max(m["max_hold_us"], s.max_hold_us)
+            for i in range(_BUCKETS):
+                m["wait_hist"][i] += s.wait_hist[i]
+                m["hold_hist"][i] += s.hold_hist[i]
+            for site, (count, wait_us) in list(s.sites.items()):
+                entry = sites.setdefault((s.name, site), [0, 0.0])
+                entry[0] += count
+                entry[1] += wait_us
+
+        locks = []
+        for name, m in merged.items():
+            locks.append({
+                "name": name, "acquisitions": m["acquisitions"], "contended": m["contended"],
+                "contention_ratio": m["contended"] / m["acquisitions"] if m["acquisitions"] else 0.0,
+                "total_wait_ms": m["total_wait_us"] / 1000, "total_hold_ms": m["total_hold_us"] / 1000,
+                "wait_p50_us": _percentile(m["wait_hist"], 0.5), "wait_p99_us": _percentile(m["wait_hist"], 0.99),
+                "max_wait_us": m["max_wait_us"],
+                "hold_p50_us": _percentile(m["hold_hist"], 0.5), "hold_p99_us": _percentile(m["hold_hist"], 0.99),
+                "max_hold_us": m["max_hold_us"],
+                "wait_histogram": m["wait_hist"], "hold_histogram": m["hold_hist"],
+            })
+        locks.sort(key=lambda l: (-l["total_wait_ms"], l["name"]))
+        top_sites = [{"lock": name, "site": site, "contended": int(count), "total_wait_ms": wait_us / 1000}
+                     for (name, site), (count, wait_us) in sites.items()]
+        top_sites.sort(key=lambda s: -s["total_wait_ms"])
+        return {"locks": locks, "top_sites": top_sites[:top],
+                "inversions": [str(i) for i in inversions]}
+
+    def dump(self, top: int = 10, file=None):
+        """Prints the report as a table (stderr by default)."""
+        file = file or sys.stderr
+        report = self.report(top)
+        locks = [l for l in report["locks"] if l["acquisitions"]]
+        if not locks and not report["inversions"]:
+            return
+        print(f"{'lock':<28}{'acquired':>10}{'contended':>11}{'wait ms':>10}{'wait p99':>10}"
+              f"{'hold p99':>10}{'max hold':>10}", file=file)
+        for l in locks:
+            print(f"{l['name']:<28}{l['acquisitions']:>10}{l['contended']:>11}{l['total_wait_ms']:>10.2f}"
+                  f"{l['wait_p99_us']:>10.0f}{l['hold_p99_us']:>10.0f}{l['max_hold_us']:>10.0f}", file=file)
+        if report["top_sites"]:
+            print("Top contended call sites:", file=file)
+            for s in report["top_sites"]:
+                print(f"  {s['total_wait_ms']:>9.2f} ms  {s['contended']:>6}x  {s['lock']:<24} {s['site']}", file=file)
+        for inversion in report["inversions"]:
+            print(inversion, file=file)
+
+    def reset(self):
+        """Zeroes the counters and forgets the acquisition graph (locks stay registered)."""
+        with self.lock:
+            for s in self.stats:
+                s.__init__(s.name)
+            self.edges.clear()
+            self.inversions.clear()
+            self._reported.clear()
+
+
+class InstrumentedLock:
+    """
+    Drop-in for threading.Lock / threading.RLock (acquire, release, context manager) that feeds
+    LockProfiler. An uncontended acquire costs one non-blocking try plus two clock reads.
+    """
+    def __init__(self, name: str, reentrant: bool = False, check_order: bool = False):
+        self.name = name
+        self.reentrant = reentrant
+        self.check_order = check_order
+        self._lock = threading.Lock()
+        self._owner: Optional[int] = None
+        self._depth = 0
+        self._acquired_at = 0.0
+        self.profiler = LockProfiler()
+        self.stats = self.profiler.register(name)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        me = threading.get_ident()
+        if self._owner == me:
+            if not self.reentrant:
+                if not blocking:
+                    return False
+                raise RuntimeError(f"Lock {self.name} is not reentrant and is already held by this thread (self-deadlock)")
+            self._depth += 1
+            return True
+        if self.check_order:
+            self.profiler.check_order(self.name)
+
+        start = time.perf_counter()
+        contended = not self._lock.acquire(False)
+        if contended:
+            if not blocking or not self._lock.acquire(True, timeout):
+                return False
+        acquired_at = time.perf_counter()
+
+        # We own the lock from here on: stats updates are serialized by it
+        self._owner, self._depth, self._acquired_at = me, 1, acquired_at
+        stats = self.stats
+        stats.acquisitions += 1
+        wait_us = (acquired_at - start) * 1e6
+        stats.wait_hist[_bucket(wait_us)] += 1
+        if contended:
+            stats.contended += 1
+            stats.total_wait_us += wait_us
+            stats.max_wait_us = max(stats.max_wait_us, wait_us)
+            site = stats.sites.setdefault(_call_site(), [0, 0.0])
+            site[0] += 1
+            site[1] += wait_us
+        if self.check_order:
+            self.profiler.held().append(self.name)
+        return True
+
+    def release(self):
+        if self._owner != threading.get_ident():
+            raise RuntimeError(f"Cannot release un-acquired lock {self.name}")
+        self._depth -= 1
+        if self._depth:
+            return
+        hold_us = (time.perf_counter() - self._acquired_at) * 1e6
+        stats = self.stats
+        stats.total_hold_us += hold_us
+        stats.max_hold_us = max(stats.max_hold_us, hold_us)
+        stats.hold_hist[_bucket(hold_us)] += 1
+        if self.check_order:
+            held = self.profiler.held()
+            if self.name in held: # Usually the last entry; locks may be released out of order
+                del held[len(held) - 1 - held[::-1].index(self.name)]
+        self._owner = None
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __repr__(self):
+        return f"<InstrumentedLock {self.name} {'locked' if self.locked() else 'unlocked'}>"
+
+
+def make_lock(name: str, reentrant: bool = False):
+    """A named lock: plain threading.Lock/RLock normally, InstrumentedLock when profiling or debugging locks."""
+    if not (config.LOCK_PROFILING or config.LOCK_DEBUG):
+        return threading.RLock() if reentrant else threading.Lock()
+    LockProfiler().dump_at_exit()
+    return InstrumentedLock(name, reentrant, check_order=config.LOCK_DEBUG)
@@ -1,11 +1,19 @@
 import logging
 import sys
+from utils.tracing import span
+
+
+class TracedStreamHandler(logging.StreamHandler):
+    """StreamHandler whose writes show up as "log" spans, so logging cost is visible in traces."""
+    def emit(self, record: logging.LogRecord):
+        with span("log", level=record.levelname):
+            super().emit(record)
 
 def setup_logger(name: str = "DeliverySystem"):
     logger = logging.getLogger(name)
     if not logger.handlers:
         logger.setLevel(logging.INFO)
-        handler = logging.StreamHandler(sys.stdout)
+        handler = TracedStreamHandler(sys.stdout)
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         handler.setFormatter(formatter)
         logger.addHandler(handler)
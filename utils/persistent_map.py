@@ -0,0 +1,161 @@
+from typing import Any, Hashable, Iterator, Optional, Tuple
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+_EMPTY_NODE: Tuple = (None,) * _WIDTH
+
+
+class _Collision:
+    """Keys whose full 64-bit hashes are equal share one slot."""
+    __slots__ = ("hash", "pairs")
+
+    def __init__(self, key_hash: int, pairs: Tuple[Tuple[Hashable, Any], ...]):
+        self.hash = key_hash
+        self.pairs = pairs
+
+
+def _hash(key: Hashable) -> int:
+    return hash(key) & _HASH_MASK
+
+
+# A node is a tuple of 32 slots; a slot is None, a leaf (hash, key, value), a _Collision,
+# or a child node. Nodes are never mutated once built, so any number of maps can share them.
+def _is_node(slot) -> bool:
+    return type(slot) is tuple and len(slot) == _WIDTH
+
+
+def _set(node: Tuple, shift: int, h: int, key: Hashable, value: Any) -> Tuple[Tuple, bool]:
+    idx = (h >> shift) & _MASK
+    slot = node[idx]
+    added = True
+    if slot is None:
+        new_slot = (h, key, value)
+    elif _is_node(slot):
+        new_slot, added = _set(slot, shift + _BITS, h, key, value)
+    elif type(slot) is _Collision:
+        if slot.hash == h:
+            pairs = tuple(p for p in slot.pairs if p[0] != key)
+            added = len(pairs) == len(slot.pairs)
+            new_slot = _Collision(h, pairs + ((key, value),))
+        else:
+            child = _push_down(slot.hash, slot, shift + _BITS)
+            new_slot, added = _set(child, shift + _BITS, h, key, value)
+    else:
+        slot_hash, slot_key, slot_value = slot
+        if slot_key == key:
+            new_slot, added = (h, key, value), False
+        elif slot_hash == h:
+            new_slot = _Collision(h, ((slot_key, slot_value), (key, value)))
+        else:
+            child = _push_down(slot_hash, slot, shift + _BITS)
+            new_slot, added = _set(child, shift + _BITS, h, key, value)
+    return node[:idx] + (new_slot,) + node[idx + 1:], added
+
+
+def _push_down(h: int, slot, shift: int) -> Tuple:
+    # Move an existing slot one level deeper so a key with a different hash can sit beside it
+    idx = (h >> shift) & _MASK
+    return _EMPTY_NODE[:idx] + (slot,) + _EMPTY_NODE[idx + 1:]
+
+
+def _remove(node: Tuple, shift: int, h: int, key: Hashable) -> Tuple[Optional[Tuple], bool]:
+    idx = (h >> shift) & _MASK
+    slot = node[idx]
+    if slot is None:
+        return node, False
+    if _is_node(slot):
+        new_slot, removed = _remove(slot, shift + _BITS, h, key)
+        if not removed:
+            return node, False
+    elif type(slot) is _Collision:
+        pairs = tuple(p for p in slot.pairs if p[0] != key)
+        if len(pairs) == len(slot.pairs):
+            return node, False
+        new_slot = _Collision(h, pairs) if len(pairs) > 1 else (h, pairs[0][0], pairs[0][1])
+    else:
+        if slot[1] != key:
+            return node, False
+        new_slot = None
+    new_node = node[:idx] + (new_slot,) + node[idx + 1:]
+    if new_node == _EMPTY_NODE:
+        return None, True
+    return new_node, True
+
+
+def _iter(node: Tuple) -> Iterator[Tuple[Hashable, Any]]:
+    for slot in node:
+        if slot is None:
+            continue
+        if _is_node(slot):
+            yield from _iter(slot)
+        elif type(slot) is _Collision:
+            yield from slot.pairs
+        else:
+            yield slot[1], slot[2]
+
+
+class PersistentMap:
+    """
+    Immutable hash map with structural sharing (a hash array mapped trie).
+    set/remove return a new map in O(log32 N) by copying only the path to the changed slot;
+    every older map stays valid and unchanged, so holding one is an O(1) point-in-time snapshot.
+    """
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, root: Tuple = _EMPTY_NODE, size: int = 0):
+        self._root = root
+        self._size = size
+
+    def set(self, key: Hashable, value: Any) -> "PersistentMap":
+        root, added = _set(self._root, 0, _hash(key), key, value)
+        return PersistentMap(root, self._size + (1 if added else 0))
+
+    def remove(self, key: Hashable) -> "PersistentMap":
+        root, removed = _remove(self._root, 0, _hash(key), key)
+        if not removed:
+            return self
+        return PersistentMap(root if root is not None else _EMPTY_NODE, self._size - 1)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        h = _hash(key)
+        node, shift = self._root, 0
+        while True:
+            slot = node[(h >> shift) & _MASK]
+            if slot is None:
+                return default
+            if _is_node(slot):
+                node, shift = slot, shift + _BITS
+                continue
+            if type(slot) is _Collision:
+                for k, v in slot.pairs:
+                    if k == key:
+                        return v
+                return default
+            return slot[2] if slot[1] == key else default
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return (k for k, _ in _iter(self._root))
+
+    def keys(self) -> Iterator[Hashable]:
+        return iter(self)
+
+    def values(self) -> Iterator[Any]:
+        return (v for _, v in _iter(self._root))
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        return _iter(self._root)
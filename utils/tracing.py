@@ -0,0 +1,206 @@
+"""
+Optional request tracing: a span per controller operation with nested spans for the service and
+repository calls it makes. The current span lives in a ContextVar, so nesting follows the caller
+across asyncio tasks; a new thread starts its own traces.
+
+Sampling is decided once per trace (TRACE_SAMPLE_RATE, 0 disables tracing at near-zero cost) and
+finished spans are appended as JSON lines to TRACE_FILE. Fold them for flame-graph tools with:
+
+    python -m utils.tracing data/traces.jsonl > traces.folded
+"""
+import argparse
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from constants.config import TRACE_SAMPLE_RATE, TRACE_FILE
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attrs", "start_time", "_start", "duration_us", "thread")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_us = 0.0
+        self.thread = threading.current_thread().name
+
+    def finish(self):
+        self.duration_us = (time.perf_counter() - self._start) * 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "start": self.start_time, "duration_us": round(self.duration_us, 1),
+            "thread": self.thread, "attrs": self.attrs,
+        }
+
+
+class FileSpanExporter:
+    """Buffers finished spans and appends them to a JSON-lines file; the file is opened on first flush."""
+    def __init__(self, path: str = TRACE_FILE, batch_size: int = 256):
+        self.path = path
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self._buffer: List[Dict[str, Any]] = []
+
+    def export(self, span: Span):
+        with self.lock:
+            self._buffer.append(span.to_dict())
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+            self._write(batch)
+
+    def flush(self):
+        with self.lock:
+            batch, self._buffer = self._buffer, []
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        # Called with the lock held so batches never interleave
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.writelines(json.dumps(record) + "\n" for record in batch)
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, exporter: Optional[FileSpanExporter] = None):
+        self.sample_rate = sample_rate
+        self.exporter = exporter or FileSpanExporter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+
+_NOT_SAMPLED = object() # Marks a trace that lost the sampling draw, so its children skip cheaply
+_current: ContextVar[Any] = ContextVar("current_span", default=None)
+_tracer = Tracer()
+
+
+def configure(sample_rate: Optional[float] = None, exporter: Optional[FileSpanExporter] = None) -> Tracer:
+    """Changes sampling and/or the exporter; returns the previous tracer so callers can restore it."""
+    global _tracer
+    previous = _tracer
+    _tracer = Tracer(sample_rate if sample_rate is not None else previous.sample_rate,
+                     exporter or previous.exporter)
+    return previous
+
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    span_or_marker = _current.get()
+    return span_or_marker if isinstance(span_or_marker, Span) else None
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Opens a span (child of the current one, or a new sampled/unsampled trace); yields it or None."""
+    tracer = _tracer
+    parent = _current.get()
+    if not tracer.enabled or parent is _NOT_SAMPLED:
+        yield None
+        return
+    if parent is None and random.random() >= tracer.sample_rate:
+        token = _current.set(_NOT_SAMPLED)
+        try:
+            yield None
+        finally:
+            _current.reset(token)
+        return
+
+    if parent is None:
+        new_span = Span(name, f"{random.getrandbits(64):016x}", None, attrs)
+    else:
+        new_span = Span(name, parent.trace_id, parent.span_id, attrs)
+    token = _current.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        new_span.finish()
+        tracer.exporter.export(new_span)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span(); the disabled path is a single attribute check."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def flush():
+    _tracer.exporter.flush()
+
+
+# --- Analysis ---
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def fold(spans: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Collapses spans into folded stacks ("a;b;c" -> self time in microseconds), the input format of
+    flamegraph.pl and speedscope. Self time is a span's duration minus its children's.
+    """
+    spans = list(spans)
+    by_id = {s["span_id"]: s for s in spans}
+    child_time: Dict[str, float] = defaultdict(float)
+    for s in spans:
+        if s["parent_id"] in by_id:
+            child_time[s["parent_id"]] += s["duration_us"]
+
+    folded: Dict[str, float] = defaultdict(float)
+    for s in spans:
+        stack, node = [], s
+        while node is not None:
+            stack.append(node["name"])
+            node = by_id.get(node["parent_id"])
+        folded[";".join(reversed(stack))] += max(0.0, s["duration_us"] - child_time[s["span_id"]])
+    return dict(folded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold a span file into flame-graph stacks.")
+    parser.add_argument("path", nargs="?", default=TRACE_FILE)
+    args = parser.parse_args()
+    for stack, self_us in sorted(fold(load_spans(args.path)).items()):
+        print(f"{stack} {int(round(self_us))}")
+
+
+if __name__ == "__main__":
+    main()
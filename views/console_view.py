@@ -27,7 +27,7 @@ class ConsoleView:
         if not driver:
             logger.warning("Driver not found.")
             return
-        logger.info(f"Driver Status: {driver.status.value}, Current Order: {driver.current_order_id}")
+        logger.info(f"Driver Status: {driver.status.value}, Active Orders: {driver.active_order_ids} ({driver.remaining_capacity} free)")
 
     def show_top_drivers(self, drivers: List[Driver]):
         logger.info("--- Top Drivers (by Rating) ---")